@@ -1,9 +1,20 @@
 """
 API routes for agricultural ML predictions
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import FileResponse, Response
+from pydantic import ValidationError
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+import asyncio
+import hashlib
 import logging
+import time
+
+import pandas as pd
+
 from ..schemas.prediction import (
     PredictionInput,
     FertilizerPrediction,
@@ -11,17 +22,97 @@ from ..schemas.prediction import (
     PestAlertPrediction,
     YieldPrediction,
     AllPredictions,
+    BatchPredictionInput,
+    BatchPredictionResponse,
+    SweepInput,
+    SweepResponse,
     HealthResponse,
     ModelStatusResponse
 )
+from ..schemas.jobs import JobResponse, JobResultsResponse
+from ..schemas.optimizer import FertilizerPlanInput, FertilizerPlanResponse
+from ..schemas.profiles import FarmProfileInput, FarmProfileResponse, ProfilePredictionInput
 from ..services.prediction_service import prediction_service
+from ..services.profile_service import profile_service
+from ..services.optimizer_service import FertilizerOptimizer
+from ..services.job_service import (
+    job_service, validate_input_frame, FINISHED_STATES, INPUT_FORMATS, count_input_rows
+)
 from ..core.config import settings
+from ..core.scheduler import scheduler
+from ..core.admission import admission
+from ..core.result_cache import prediction_cache
+from ..core.responses import prediction_response
+from ..core.columnar import frame_columns
+from ..serving.scheduler import INTERACTIVE, BATCH
+from ..serving.singleflight import singleflight
+from ..serving.responses import make_etag, etag_matches, not_modified
+from ..serving.columnar import MEDIA_TYPE as COLUMNAR_MEDIA_TYPE, decode_frame, encode
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+async def _predict_interactive(
+    predict,
+    input_data: PredictionInput,
+    *args,
+    key_args: tuple = (),
+    request: Request = None
+):
+    """
+    Run a prediction at interactive priority, sharing the computation with
+    identical requests already in flight
+    
+    Requests share a computation, and a cached result, when the endpoint,
+    the validated input, the model version and ``key_args`` all match.
+    Partial combined predictions are not cached. Requests shed by admission
+    control, or made while the models are not loaded, are answered from
+    the rules table instead and never cached.
+    
+    Complete model predictions carry a strong ETag derived from the same
+    key, so a client revalidating with ``If-None-Match`` gets a
+    ``304 Not Modified`` until other models are loaded; degraded and
+    partial predictions carry none.
+    
+    Returns:
+        The prediction response, or None if the prediction is unavailable
+    """
+    version = prediction_service.get_model_version()
+    key = singleflight.make_key(predict.__name__, input_data.dict(), version, *key_args)
+    etag = make_etag(key) if version is not None else None
+    if etag is not None and request is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    
+    overloaded = getattr(request.state, "overloaded", None) if request is not None else None
+    reason = prediction_service.fallback_reason(overloaded)
+    if reason is not None:
+        degraded = prediction_service.predict_degraded(predict.__name__, input_data, reason)
+        return prediction_response(degraded) if degraded is not None else None
+    
+    async def compute():
+        prediction = await scheduler.run(predict, input_data, *args, priority=INTERACTIVE)
+        if prediction is None:
+            return None
+        result = prediction.dict()
+        if _is_complete(result):
+            await prediction_cache.aset(key, result)
+        return result
+    
+    result = await prediction_cache.aget(key)
+    if result is None:
+        result = await singleflight.do(key, compute)
+    if result is None:
+        return None
+    return prediction_response(result, etag if _is_complete(result) else None)
+
+
+def _is_complete(prediction: Dict[str, Any]) -> bool:
+    """Whether every model of a prediction answered or is not installed, so it can be cached"""
+    return all(state in ("ok", "unavailable") for state in prediction.get('model_status', {}).values())
+
+
 @router.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """
@@ -34,6 +125,43 @@ async def health_check():
     )
 
 
+@router.get("/metrics", tags=["Health"])
+async def get_metrics():
+    """
+    Inference scheduler, admission control, request coalescing, classifier
+    cascade and degraded mode metrics
+    """
+    return {
+        "scheduler": scheduler.get_metrics(),
+        "admission": admission.get_metrics(),
+        "singleflight": singleflight.get_metrics(),
+        "cascade": prediction_service.get_cascade_metrics(),
+        "fallback": prediction_service.get_fallback_metrics(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@router.get("/cache/stats", tags=["Health"])
+async def get_cache_stats():
+    """
+    Prediction cache hit rates for this worker and shared cache size
+    """
+    return {
+        **await run_in_threadpool(prediction_cache.get_stats),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@router.delete("/cache", tags=["Health"])
+async def clear_cache():
+    """
+    Drop all cached predictions
+    """
+    if not await run_in_threadpool(prediction_cache.clear):
+        return {"message": "Worker cache cleared; the shared cache is busy, retry later"}
+    return {"message": "Prediction cache cleared"}
+
+
 @router.get("/models/status", response_model=ModelStatusResponse, tags=["Models"])
 async def get_model_status():
     """
@@ -56,7 +184,7 @@ async def get_model_status():
 
 
 @router.post("/predict/fertilizer", response_model=FertilizerPrediction, tags=["Predictions"])
-async def predict_fertilizer(input_data: PredictionInput):
+async def predict_fertilizer(input_data: PredictionInput, request: Request):
     """
     Predict NPK fertilizer requirements
     
@@ -64,8 +192,7 @@ async def predict_fertilizer(input_data: PredictionInput):
     based on soil conditions, crop type, weather, and other factors.
     """
     try:
-        prediction = prediction_service.predict_fertilizer(input_data)
-        return prediction
+        return await _predict_interactive(prediction_service.predict_fertilizer, input_data, request=request)
     except RuntimeError as e:
         logger.error(f"Runtime error in fertilizer prediction: {e}")
         raise HTTPException(
@@ -81,7 +208,7 @@ async def predict_fertilizer(input_data: PredictionInput):
 
 
 @router.post("/predict/irrigation", response_model=IrrigationPrediction, tags=["Predictions"])
-async def predict_irrigation(input_data: PredictionInput):
+async def predict_irrigation(input_data: PredictionInput, request: Request):
     """
     Predict irrigation need
     
@@ -89,8 +216,7 @@ async def predict_irrigation(input_data: PredictionInput):
     weather conditions, crop water requirements, and growth stage.
     """
     try:
-        prediction = prediction_service.predict_irrigation(input_data)
-        return prediction
+        return await _predict_interactive(prediction_service.predict_irrigation, input_data, request=request)
     except RuntimeError as e:
         logger.error(f"Runtime error in irrigation prediction: {e}")
         raise HTTPException(
@@ -106,7 +232,7 @@ async def predict_irrigation(input_data: PredictionInput):
 
 
 @router.post("/predict/pest-alert", response_model=PestAlertPrediction, tags=["Predictions"])
-async def predict_pest_alert(input_data: PredictionInput):
+async def predict_pest_alert(input_data: PredictionInput, request: Request):
     """
     Predict pest alert
     
@@ -114,8 +240,7 @@ async def predict_pest_alert(input_data: PredictionInput):
     crop type, growth stage, and environmental factors.
     """
     try:
-        prediction = prediction_service.predict_pest_alert(input_data)
-        return prediction
+        return await _predict_interactive(prediction_service.predict_pest_alert, input_data, request=request)
     except RuntimeError as e:
         logger.error(f"Runtime error in pest alert prediction: {e}")
         raise HTTPException(
@@ -131,7 +256,7 @@ async def predict_pest_alert(input_data: PredictionInput):
 
 
 @router.post("/predict/yield", response_model=YieldPrediction, tags=["Predictions"])
-async def predict_yield(input_data: PredictionInput):
+async def predict_yield(input_data: PredictionInput, request: Request):
     """
     Predict crop yield (optional)
     
@@ -139,7 +264,7 @@ async def predict_yield(input_data: PredictionInput):
     weather, crop management, and other factors.
     """
     try:
-        prediction = prediction_service.predict_yield(input_data)
+        prediction = await _predict_interactive(prediction_service.predict_yield, input_data, request=request)
         
         if prediction is None:
             raise HTTPException(
@@ -165,7 +290,13 @@ async def predict_yield(input_data: PredictionInput):
 
 
 @router.post("/predict/all", response_model=AllPredictions, tags=["Predictions"])
-async def predict_all(input_data: PredictionInput):
+async def predict_all(
+    input_data: PredictionInput,
+    request: Request,
+    timeout_ms: Optional[float] = Query(
+        None, gt=0, le=30000, description="Response deadline in ms (default: PREDICT_ALL_TIMEOUT_MS)"
+    )
+):
     """
     Make all predictions at once
     
@@ -174,10 +305,32 @@ async def predict_all(input_data: PredictionInput):
     - Irrigation need
     - Pest alert status
     - Crop yield (if available)
+    
+    Models run concurrently under per-model and per-request deadlines.
+    Outputs that miss their deadline or fail are omitted and reported in
+    `model_status`, so the response time stays bounded when one model
+    degrades. A model still running a call that missed its deadline is
+    skipped and reported `busy` until that call returns. While the models
+    are not loaded or the service is overloaded, every output comes from
+    the rules table with `degraded` set.
     """
+    timeout = (timeout_ms or settings.predict_all_timeout_ms) / 1000
+    deadline = time.monotonic() + timeout
     try:
-        predictions = prediction_service.predict_all(input_data)
+        predictions = await asyncio.wait_for(
+            _predict_interactive(
+                prediction_service.predict_all, input_data, deadline, key_args=(timeout_ms,), request=request
+            ),
+            # Partial results are returned at the deadline; allow for handing them back
+            timeout=timeout + 0.05
+        )
         return predictions
+    except asyncio.TimeoutError:
+        logger.error("Combined predictions did not start before the deadline")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No prediction finished before the deadline"
+        )
     except RuntimeError as e:
         logger.error(f"Runtime error in combined predictions: {e}")
         raise HTTPException(
@@ -189,4 +342,505 @@ async def predict_all(input_data: PredictionInput):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error during combined predictions"
-        )
\ No newline at end of file
+        )
+
+
+# Predictions available for a registered farm profile
+PROFILE_PREDICTORS = {
+    'fertilizer': prediction_service.predict_fertilizer,
+    'irrigation': prediction_service.predict_irrigation,
+    'pest-alert': prediction_service.predict_pest_alert,
+    'yield': prediction_service.predict_yield,
+    'all': prediction_service.predict_all
+}
+
+
+@router.post("/predict/profile/{output}", tags=["Predictions"])
+async def predict_with_profile(
+    output: str,
+    readings: ProfilePredictionInput,
+    request: Request,
+    timeout_ms: Optional[float] = Query(
+        None, gt=0, le=30000, description="Response deadline in ms for `all` (default: PREDICT_ALL_TIMEOUT_MS)"
+    )
+):
+    """
+    Make a prediction for a registered farm profile
+    
+    `output` is one of `fertilizer`, `irrigation`, `pest-alert`, `yield` or
+    `all`, and the response matches the corresponding `/predict/...`
+    endpoint. Only the daily readings are sent; the farm's static
+    attributes come from its profile, and their categorical encoding is
+    reused across calls.
+    """
+    predict = PROFILE_PREDICTORS.get(output)
+    if predict is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown prediction output, expected one of: {list(PROFILE_PREDICTORS)}"
+        )
+    
+    profile = profile_service.get_profile(readings.profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Farm profile {readings.profile_id} not found"
+        )
+    input_data = readings.to_prediction_input(profile)
+    
+    try:
+        if output == 'all':
+            timeout = (timeout_ms or settings.predict_all_timeout_ms) / 1000
+            deadline = time.monotonic() + timeout
+            prediction = await asyncio.wait_for(
+                _predict_interactive(
+                    predict, input_data, deadline, readings.profile_id,
+                    key_args=(timeout_ms,), request=request
+                ),
+                timeout=timeout + 0.05
+            )
+        else:
+            prediction = await _predict_interactive(predict, input_data, readings.profile_id, request=request)
+        
+        if prediction is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Yield prediction model not available"
+            )
+        
+        return prediction
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        logger.error("Profile predictions did not start before the deadline")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No prediction finished before the deadline"
+        )
+    except RuntimeError as e:
+        logger.error(f"Runtime error in profile prediction: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in profile prediction: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during profile prediction"
+        )
+
+
+async def _parse_json_body(request: Request, model):
+    """Validate a JSON request body against ``model``, failing with a 422 as a body parameter would"""
+    body = await request.body()
+    try:
+        return model.parse_raw(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', *error['loc'])} for error in e.errors()], body=body
+        )
+
+
+# /predict/batch reads its own body, so both accepted formats are documented here;
+# the request items refer to the PredictionInput schema of the other routes
+BATCH_REQUEST_SCHEMA = BatchPredictionInput.schema(ref_template="#/components/schemas/{model}")
+BATCH_REQUEST_SCHEMA.pop("definitions", None)
+BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": BATCH_REQUEST_SCHEMA},
+            COLUMNAR_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+
+async def _predict_batch_columnar(request: Request) -> Response:
+    """
+    Score a columnar batch body, answering in the same format
+    
+    Rows are scored by every loaded model in slices of
+    ``COLUMNAR_SLICE_ROWS`` at batch priority. The response's ETag is
+    derived from the body bytes and the model version. There is no
+    degraded answer in this format, so a shed body is refused with 503.
+    """
+    if getattr(request.state, "overloaded", None) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service overloaded, retry later"
+        )
+    
+    body = await request.body()
+    version = prediction_service.get_model_version()
+    etag = None
+    if version is not None:
+        etag = make_etag(singleflight.make_key("predict_batch_columnar", hashlib.sha256(body).hexdigest(), version))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    try:
+        data = decode_frame(body, settings.columnar_max_rows)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid columnar body: {e}"
+        )
+    
+    missing = [name for name in PredictionInput.__fields__ if name not in data.columns]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Columnar body is missing columns: {missing}"
+        )
+    
+    frame, invalid, reasons = validate_input_frame(data)
+    if invalid.any():
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[{"row": int(row), "error": reasons[row]} for row in invalid.nonzero()[0][:10]]
+        )
+    
+    try:
+        step = settings.columnar_slice_rows
+        slices = [frame.iloc[start:start + step] for start in range(0, len(frame), step)]
+        results = await scheduler.run_sliced(
+            prediction_service.predict_frames, slices, priority=BATCH, slice_size=1
+        )
+        scored = pd.concat(results) if results else pd.DataFrame()
+        return Response(
+            content=encode(frame_columns(scored)),
+            media_type=COLUMNAR_MEDIA_TYPE,
+            headers={"ETag": etag} if etag is not None else None
+        )
+    except RuntimeError as e:
+        logger.error(f"Runtime error in columnar batch predictions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in columnar batch predictions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during batch predictions"
+        )
+
+
+@router.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    tags=["Predictions"],
+    openapi_extra=BATCH_OPENAPI,
+    responses={200: {"content": {COLUMNAR_MEDIA_TYPE: {}}}}
+)
+async def predict_batch(request: Request):
+    """
+    Make all predictions for up to 100 inputs
+    
+    Inputs are scored in slices at batch priority, so single predictions
+    from farmers are served between slices instead of waiting for the
+    whole batch.
+    
+    A body sent as `application/x-columnar` holds up to COLUMNAR_MAX_ROWS
+    rows with one column per input, categorical inputs dictionary-coded,
+    and is answered in the same format with one column per model output.
+    
+    While the models are not loaded or the service is overloaded, JSON
+    inputs are answered from the rules table like `/predict/all`, each
+    with `degraded` set; columnar bodies get 503.
+    """
+    if request.headers.get("content-type", "").startswith(COLUMNAR_MEDIA_TYPE):
+        return await _predict_batch_columnar(request)
+    
+    batch = await _parse_json_body(request, BatchPredictionInput)
+    version = prediction_service.get_model_version()
+    etag = None
+    if version is not None:
+        etag = make_etag(singleflight.make_key(
+            "predict_batch", [input_data.dict() for input_data in batch.predictions], version
+        ))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    try:
+        reason = prediction_service.fallback_reason(getattr(request.state, "overloaded", None))
+        if reason is not None:
+            content = [
+                prediction_service.predict_degraded('predict_all', input_data, reason)
+                for input_data in batch.predictions
+            ]
+            return prediction_response({'predictions': content, 'total_predictions': len(content)})
+        
+        predictions = await scheduler.run_sliced(
+            prediction_service.predict_batch, batch.predictions, priority=BATCH
+        )
+        content = [prediction.dict() for prediction in predictions]
+        return prediction_response(
+            {'predictions': content, 'total_predictions': len(content)},
+            etag if all(_is_complete(prediction) for prediction in content) else None
+        )
+    except RuntimeError as e:
+        logger.error(f"Runtime error in batch predictions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in batch predictions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during batch predictions"
+        )
+
+
+@router.post("/predict/sweep", response_model=SweepResponse, tags=["Predictions"])
+async def predict_sweep(sweep: SweepInput):
+    """
+    What-if predictions over a grid of input values
+    
+    Holds `base` fixed and varies each input listed in `axes` over the given
+    values, e.g. every month, every growth stage and a few candidate crops.
+    The whole Cartesian grid is scored by every model in vectorized passes,
+    and each output is returned as one flat array in row-major order over
+    `shape`. Grids are limited to SWEEP_MAX_POINTS points.
+    """
+    try:
+        slices = prediction_service.sweep_slices(sweep)
+        results = await scheduler.run_sliced(
+            prediction_service.predict_frames, slices, priority=BATCH, slice_size=1
+        )
+        return prediction_service.sweep_response(sweep, results)
+    except RuntimeError as e:
+        logger.error(f"Runtime error in sweep predictions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in sweep predictions: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during sweep predictions"
+        )
+
+
+@router.post("/predict/fertilizer-plan", response_model=FertilizerPlanResponse, tags=["Predictions"])
+async def plan_fertilizer(request: FertilizerPlanInput):
+    """
+    Find the cheapest N/P/K doses predicted to reach a target yield
+    
+    Searches dose combinations up to `max_n`, `max_p` and `max_k` kg/ha,
+    priced at `price_n`, `price_p` and `price_k` per kg, scoring a whole
+    grid of candidates with the yield model per iteration and refining the
+    grid around the best plan. When no plan reaches the target, the plan
+    with the highest predicted yield is returned. The search stops within
+    the evaluation and time budgets; each iteration runs at batch priority.
+    """
+    optimizer = FertilizerOptimizer(request)
+    try:
+        while not optimizer.done:
+            await scheduler.run(optimizer.step, priority=BATCH)
+        return await scheduler.run(optimizer.result, priority=BATCH)
+    except RuntimeError as e:
+        logger.error(f"Runtime error in fertilizer plan: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Unexpected error in fertilizer plan: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during fertilizer plan"
+        )
+
+
+@router.post(
+    "/profiles", response_model=FarmProfileResponse, status_code=status.HTTP_201_CREATED, tags=["Profiles"]
+)
+async def register_profile(profile: FarmProfileInput):
+    """
+    Register the static attributes of a farm
+    
+    Returns a profile id to send with `/predict/profile/{output}` calls in
+    place of crop, state, soil type, variety, farmer type and irrigation
+    system. Registering the same attributes again returns the same id.
+    """
+    try:
+        record = await run_in_threadpool(profile_service.register, profile)
+        return FarmProfileResponse(**record)
+    except Exception as e:
+        logger.error(f"Error registering farm profile: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error while registering farm profile"
+        )
+
+
+@router.get("/profiles/{profile_id}", response_model=FarmProfileResponse, tags=["Profiles"])
+async def get_profile(profile_id: str):
+    """
+    Get a registered farm profile
+    """
+    record = await run_in_threadpool(profile_service.get_record, profile_id)
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Farm profile {profile_id} not found"
+        )
+    return FarmProfileResponse(**record)
+
+
+def _job_response(job: Dict[str, Any]) -> JobResponse:
+    """Build a job status response with its progress fraction"""
+    progress = None
+    if job['total_rows']:
+        progress = min(job['rows_done'] / job['total_rows'], 1.0)
+    elif job['status'] == "completed":
+        progress = 1.0
+    return JobResponse(progress=progress, **{
+        name: job[name] for name in JobResponse.__fields__ if name in job
+    })
+
+
+def _get_job_or_404(job_id: str) -> Dict[str, Any]:
+    job = job_service.store.load(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post("/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED, tags=["Jobs"])
+async def submit_job(request: Request, format: str = None):
+    """
+    Submit a CSV or Parquet dataset for asynchronous scoring
+    
+    Send the file as the request body with `Content-Type: text/csv` or
+    `application/vnd.apache.parquet`, or set `format` to `csv` or `parquet`.
+    Columns are the `PredictionInput` fields. Jobs run on a bounded pool of
+    background worker processes; poll `/jobs/{job_id}` for progress.
+    """
+    try:
+        prediction_service.ensure_models_loaded()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "parquet" if "parquet" in content_type else "csv" if "csv" in content_type else None
+    if format not in INPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/vnd.apache.parquet, or set format to csv or parquet"
+        )
+    
+    job = job_service.store.create(format)
+    input_path = job_service.store.input_path(job)
+    try:
+        with open(input_path, 'wb') as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+        job['total_rows'] = await run_in_threadpool(count_input_rows, input_path, format)
+    except Exception as e:
+        job_service.store.delete(job['job_id'])
+        logger.error(f"Error receiving job input: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Could not read job input: {str(e)}"
+        )
+    
+    job_service.store.save(job)
+    try:
+        job_service.submit(job['job_id'])
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    return _job_response(job)
+
+
+@router.get("/jobs", response_model=List[JobResponse], tags=["Jobs"])
+async def list_jobs():
+    """
+    List all batch jobs, oldest first
+    """
+    return [_job_response(job) for job in job_service.store.list()]
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse, tags=["Jobs"])
+async def get_job(job_id: str):
+    """
+    Get the status, progress and throughput of a batch job
+    """
+    return _job_response(_get_job_or_404(job_id))
+
+
+@router.get("/jobs/{job_id}/results", response_model=JobResultsResponse, tags=["Jobs"])
+async def get_job_results(job_id: str, offset: int = 0, limit: int = 1000):
+    """
+    Get a page of job results in input row order
+    
+    Rows already scored can be read while the job is still running. Rows
+    that failed input validation carry an `error` message.
+    """
+    job = _get_job_or_404(job_id)
+    if offset < 0 or not 1 <= limit <= settings.job_page_limit:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"offset must be >= 0 and limit between 1 and {settings.job_page_limit}"
+        )
+    
+    results = await run_in_threadpool(job_service.store.read_results, job, offset, limit)
+    next_offset = offset + len(results)
+    if job['status'] in FINISHED_STATES and next_offset >= job['rows_done']:
+        next_offset = None
+    
+    return JobResultsResponse(
+        job_id=job_id,
+        status=job['status'],
+        offset=offset,
+        results=results,
+        next_offset=next_offset
+    )
+
+
+@router.get("/jobs/{job_id}/results/file", tags=["Jobs"])
+async def download_job_results(job_id: str):
+    """
+    Download the results CSV of a completed job
+    """
+    job = _get_job_or_404(job_id)
+    if job['status'] != "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job['status']}, results file not ready"
+        )
+    
+    return FileResponse(
+        job_service.store.results_path(job_id),
+        media_type="text/csv",
+        filename=f"{job_id}_results.csv"
+    )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobResponse, tags=["Jobs"])
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job; rows already scored stay readable
+    """
+    job = _get_job_or_404(job_id)
+    if job['status'] in FINISHED_STATES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is already {job['status']}")
+    return _job_response(job_service.cancel(job_id))
+
+
+@router.delete("/jobs/{job_id}", tags=["Jobs"])
+async def delete_job(job_id: str):
+    """
+    Delete a finished job and its files
+    """
+    job = _get_job_or_404(job_id)
+    if job['status'] not in FINISHED_STATES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Cancel the job before deleting it")
+    job_service.store.delete(job_id)
+    return {"message": f"Job {job_id} deleted"}
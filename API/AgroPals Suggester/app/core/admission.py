@@ -0,0 +1,18 @@
+"""
+Admission control of the prediction routes, configured from the settings
+"""
+from .config import settings
+from .scheduler import scheduler
+from ..serving.admission import AdmissionController
+
+# Global admission controller for the prediction routes
+admission = AdmissionController(scheduler, {
+    "enabled": settings.admission_enabled,
+    "max_in_flight": settings.admission_max_in_flight,
+    "max_waiting": settings.admission_max_waiting,
+    "max_wait_seconds": settings.admission_max_wait,
+    "max_queue_depth": settings.admission_max_queue_depth,
+    "max_queue_wait_ms": settings.admission_max_queue_wait_ms,
+    "queue_wait_window_seconds": settings.admission_queue_wait_window,
+    "client_share": settings.admission_client_share
+})
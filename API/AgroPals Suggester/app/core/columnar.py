@@ -0,0 +1,18 @@
+"""
+Columnar batch responses of model outputs
+
+The body format is ``app.serving.columnar``.
+"""
+from typing import Dict
+
+import pandas as pd
+
+from ..serving.columnar import Column
+
+
+def frame_columns(frame: pd.DataFrame, float_dtype: str = '<f4') -> Dict[str, Column]:
+    """Columns of a results frame for ``encode``, with floats as ``float_dtype`` and integers as ``<i4``"""
+    return {
+        name: values.to_numpy(float_dtype if values.dtype.kind == 'f' else '<i4')
+        for name, values in frame.items()
+    }
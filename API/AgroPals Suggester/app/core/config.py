@@ -35,6 +35,81 @@ class Settings(BaseModel):
     n_estimators: int = 100
     max_depth: int = 10
     
+    # Inference Precision Settings
+    inference_dtype: str = "float64"
+    float32_tolerance: float = 1e-4
+    
+    # Response Serialization Settings
+    fast_responses: bool = True
+    
+    # Response Compression Settings
+    compression_enabled: bool = True
+    compression_min_bytes: int = 1024
+    gzip_level: int = 6
+    brotli_quality: int = 4
+    
+    # Columnar Batch Settings
+    columnar_max_rows: int = 100000
+    columnar_slice_rows: int = 1000
+    
+    # Classifier Cascade Settings
+    cascade_enabled: bool = False
+    cascade_first_stage_trees: int = 10
+    cascade_target_agreement: float = 0.999
+    
+    # Degraded Mode Settings
+    fallback_enabled: bool = True
+    fallback_when_overloaded: bool = True
+    fallback_bins: int = 4
+    
+    # Combined Prediction Settings
+    predict_all_timeout_ms: float = 1000.0
+    model_timeout_ms: float = 800.0
+    predict_all_workers: int = 8
+    
+    # What-if Sweep Settings
+    sweep_max_points: int = 5000
+    sweep_slice_rows: int = 1000
+    
+    # Fertilizer Optimizer Settings
+    optimizer_max_evaluations: int = 20000
+    optimizer_time_budget_ms: float = 2000.0
+    optimizer_grid_points: int = 11
+    optimizer_resolution: float = 1.0
+    
+    # Inference Scheduler Settings
+    scheduler_workers: int = 1
+    batch_slice_size: int = 1
+    scheduler_metrics_window: int = 2048
+    
+    # Admission Control Settings
+    admission_enabled: bool = True
+    admission_max_in_flight: int = 16
+    admission_max_waiting: int = 32
+    admission_max_wait: float = 1.0
+    admission_max_queue_depth: int = 64
+    admission_max_queue_wait_ms: float = 1000.0
+    admission_queue_wait_window: float = 5.0
+    admission_client_share: float = 0.0
+    
+    # Prediction Cache Settings
+    cache_memory_entries: int = 1024
+    shared_cache_enabled: bool = False
+    shared_cache_path: str = "cache/predictions.sqlite3"
+    shared_cache_max_mb: float = 256.0
+    
+    # Farm Profile Settings
+    profiles_path: str = "profiles/farm_profiles.sqlite3"
+    profile_cache_entries: int = 10000
+    
+    # Batch Job Settings
+    jobs_dir: str = "jobs"
+    job_workers: int = 1
+    job_chunk_size: int = 20000
+    job_threads: int = 1
+    job_nice: int = 10
+    job_page_limit: int = 10000
+    
     # Logging
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -56,15 +131,88 @@ class Settings(BaseModel):
         
         self.random_state = int(os.getenv("RANDOM_STATE", str(self.random_state)))
         self.test_size = float(os.getenv("TEST_SIZE", str(self.test_size)))
+        self.cv_folds = int(os.getenv("CV_FOLDS", str(self.cv_folds)))
         
         self.n_estimators = int(os.getenv("N_ESTIMATORS", str(self.n_estimators)))
         self.max_depth = int(os.getenv("MAX_DEPTH", str(self.max_depth)))
         
+        self.inference_dtype = os.getenv("INFERENCE_DTYPE", self.inference_dtype)
+        self.float32_tolerance = float(os.getenv("FLOAT32_TOLERANCE", str(self.float32_tolerance)))
+        
+        self.fast_responses = os.getenv("FAST_RESPONSES", "true").lower() == "true"
+        
+        self.compression_enabled = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+        self.compression_min_bytes = int(os.getenv("COMPRESSION_MIN_BYTES", str(self.compression_min_bytes)))
+        self.gzip_level = int(os.getenv("GZIP_LEVEL", str(self.gzip_level)))
+        self.brotli_quality = int(os.getenv("BROTLI_QUALITY", str(self.brotli_quality)))
+        
+        self.columnar_max_rows = int(os.getenv("COLUMNAR_MAX_ROWS", str(self.columnar_max_rows)))
+        self.columnar_slice_rows = int(os.getenv("COLUMNAR_SLICE_ROWS", str(self.columnar_slice_rows)))
+        
+        self.cascade_enabled = os.getenv("CASCADE_ENABLED", "false").lower() == "true"
+        self.cascade_first_stage_trees = int(
+            os.getenv("CASCADE_FIRST_STAGE_TREES", str(self.cascade_first_stage_trees))
+        )
+        self.cascade_target_agreement = float(
+            os.getenv("CASCADE_TARGET_AGREEMENT", str(self.cascade_target_agreement))
+        )
+        
+        self.fallback_enabled = os.getenv("FALLBACK_ENABLED", "true").lower() == "true"
+        self.fallback_when_overloaded = os.getenv("FALLBACK_WHEN_OVERLOADED", "true").lower() == "true"
+        self.fallback_bins = int(os.getenv("FALLBACK_BINS", str(self.fallback_bins)))
+        
+        self.predict_all_timeout_ms = float(os.getenv("PREDICT_ALL_TIMEOUT_MS", str(self.predict_all_timeout_ms)))
+        self.model_timeout_ms = float(os.getenv("MODEL_TIMEOUT_MS", str(self.model_timeout_ms)))
+        self.predict_all_workers = int(os.getenv("PREDICT_ALL_WORKERS", str(self.predict_all_workers)))
+        
+        self.sweep_max_points = int(os.getenv("SWEEP_MAX_POINTS", str(self.sweep_max_points)))
+        self.sweep_slice_rows = int(os.getenv("SWEEP_SLICE_ROWS", str(self.sweep_slice_rows)))
+        
+        self.optimizer_max_evaluations = int(
+            os.getenv("OPTIMIZER_MAX_EVALUATIONS", str(self.optimizer_max_evaluations))
+        )
+        self.optimizer_time_budget_ms = float(
+            os.getenv("OPTIMIZER_TIME_BUDGET_MS", str(self.optimizer_time_budget_ms))
+        )
+        self.optimizer_grid_points = int(os.getenv("OPTIMIZER_GRID_POINTS", str(self.optimizer_grid_points)))
+        self.optimizer_resolution = float(os.getenv("OPTIMIZER_RESOLUTION", str(self.optimizer_resolution)))
+        
+        self.scheduler_workers = int(os.getenv("SCHEDULER_WORKERS", str(self.scheduler_workers)))
+        self.batch_slice_size = int(os.getenv("BATCH_SLICE_SIZE", str(self.batch_slice_size)))
+        
+        self.admission_enabled = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+        self.admission_max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", str(self.admission_max_in_flight)))
+        self.admission_max_waiting = int(os.getenv("ADMISSION_MAX_WAITING", str(self.admission_max_waiting)))
+        self.admission_max_wait = float(os.getenv("ADMISSION_MAX_WAIT", str(self.admission_max_wait)))
+        self.admission_max_queue_depth = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", str(self.admission_max_queue_depth)))
+        self.admission_max_queue_wait_ms = float(
+            os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", str(self.admission_max_queue_wait_ms))
+        )
+        self.admission_queue_wait_window = float(
+            os.getenv("ADMISSION_QUEUE_WAIT_WINDOW", str(self.admission_queue_wait_window))
+        )
+        self.admission_client_share = float(os.getenv("ADMISSION_CLIENT_SHARE", str(self.admission_client_share)))
+        
+        self.cache_memory_entries = int(os.getenv("CACHE_MEMORY_ENTRIES", str(self.cache_memory_entries)))
+        self.shared_cache_enabled = os.getenv("SHARED_CACHE_ENABLED", "false").lower() == "true"
+        self.shared_cache_path = os.getenv("SHARED_CACHE_PATH", self.shared_cache_path)
+        self.shared_cache_max_mb = float(os.getenv("SHARED_CACHE_MAX_MB", str(self.shared_cache_max_mb)))
+        
+        self.profiles_path = os.getenv("PROFILES_PATH", self.profiles_path)
+        self.profile_cache_entries = int(os.getenv("PROFILE_CACHE_ENTRIES", str(self.profile_cache_entries)))
+        
+        self.jobs_dir = os.getenv("JOBS_DIR", self.jobs_dir)
+        self.job_workers = int(os.getenv("JOB_WORKERS", str(self.job_workers)))
+        self.job_chunk_size = int(os.getenv("JOB_CHUNK_SIZE", str(self.job_chunk_size)))
+        self.job_threads = int(os.getenv("JOB_THREADS", str(self.job_threads)))
+        self.job_nice = int(os.getenv("JOB_NICE", str(self.job_nice)))
+        
         self.log_level = os.getenv("LOG_LEVEL", self.log_level)
         
         # Ensure directories exist
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.models_dir, exist_ok=True)
+        os.makedirs(self.jobs_dir, exist_ok=True)
 
 
 # Global settings instance
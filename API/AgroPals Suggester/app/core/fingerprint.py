@@ -0,0 +1,62 @@
+"""
+Content-addressed fingerprints for training inputs
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+
+def file_digest(path: str) -> str:
+    """Compute the SHA-256 digest of a file without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def library_versions() -> Dict[str, str]:
+    """Versions of the libraries that produce the model artifacts"""
+    return {
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'joblib': joblib.__version__
+    }
+
+
+def training_fingerprint(data_path: str, config: Dict[str, Any]) -> str:
+    """
+    Fingerprint a training run from the dataset bytes, the preprocessing and
+    hyperparameter config and the library versions
+    """
+    payload = {
+        'data_sha256': file_digest(data_path),
+        'config': config,
+        'versions': library_versions()
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def load_saved_fingerprint(models_dir: str) -> Optional[str]:
+    """Read the fingerprint recorded in the saved model metadata, if any"""
+    metadata_path = os.path.join(models_dir, 'model_metadata.pkl')
+    if not os.path.exists(metadata_path):
+        return None
+
+    try:
+        metadata = joblib.load(metadata_path)
+    except Exception:
+        return None
+
+    model_names = metadata.get('model_names', [])
+    if not all(os.path.exists(os.path.join(models_dir, f'{name}_model.pkl')) for name in model_names):
+        return None
+
+    return metadata.get('fingerprint')
@@ -0,0 +1,24 @@
+"""
+Prediction responses, encoded once when fast responses are enabled
+"""
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from ..serving.responses import FastJSONResponse
+
+
+def prediction_response(content: Any, etag: Optional[str] = None) -> Any:
+    """
+    Response for a prediction dict, or the dict itself when fast responses
+    are disabled, in which case FastAPI validates it against the route's
+    ``response_model``; a dict sent with an ``etag`` is always wrapped in a
+    response to carry the header
+    """
+    headers = {"ETag": etag} if etag is not None else None
+    if settings.fast_responses:
+        return FastJSONResponse(content, headers=headers)
+    if headers is not None:
+        return JSONResponse(content, headers=headers)
+    return content
@@ -0,0 +1,12 @@
+"""
+Prediction result cache of the API workers, configured from the settings
+"""
+from .config import settings
+from ..serving.result_cache import PredictionCache
+
+# Global prediction cache instance
+prediction_cache = PredictionCache(
+    memory_entries=settings.cache_memory_entries,
+    shared_path=settings.shared_cache_path if settings.shared_cache_enabled else None,
+    shared_max_bytes=int(settings.shared_cache_max_mb * 1024 * 1024)
+)
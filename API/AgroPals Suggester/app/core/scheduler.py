@@ -0,0 +1,12 @@
+"""
+Inference scheduler shared by the prediction endpoints, configured from the settings
+"""
+from .config import settings
+from ..serving.scheduler import InferenceScheduler
+
+# Global scheduler instance
+scheduler = InferenceScheduler(
+    workers=settings.scheduler_workers,
+    slice_size=settings.batch_slice_size,
+    window=settings.scheduler_metrics_window
+)
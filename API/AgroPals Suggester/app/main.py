@@ -7,9 +7,15 @@ from contextlib import asynccontextmanager
 import logging
 import os
 from .core.config import settings
+from .serving.compression import CompressionMiddleware
 from .core.logging import setup_logging
 from .api.routes import router
 from .models.ml_models import ml_models
+from .services.prediction_service import prediction_service
+from .services.job_service import job_service
+from .core.scheduler import scheduler
+from .core.admission import admission
+from .serving.admission import AdmissionControlMiddleware
 
 
 # Setup logging
@@ -36,10 +42,20 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error loading ML models: {e}")
     
+    # Loaded on its own so it is there when the models are not
+    if prediction_service.load_fallback():
+        logger.info("Rule fallback loaded for degraded mode")
+    
+    # Start inference scheduler and batch job workers
+    scheduler.start()
+    job_service.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Agricultural ML API...")
+    job_service.shutdown()
+    scheduler.shutdown()
 
 
 # Create FastAPI app
@@ -66,6 +82,8 @@ app = FastAPI(
     1. Check model status at `/models/status`
     2. Use individual prediction endpoints or `/predict/all` for comprehensive analysis
     3. All endpoints accept the same input format with 16 agricultural parameters
+    4. For daily monitoring, register a farm once at `/profiles` and send only the daily readings to `/predict/profile/{output}`
+    5. When the models are unavailable or the service is overloaded, approximate answers from a per-crop rules table are returned with `degraded: true`
     """,
     docs_url="/docs",
     redoc_url="/redoc",
@@ -73,6 +91,20 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Shed load before it reaches the prediction routes; shed single-input,
+# profile and JSON batch predictions are answered from the rules table
+DEGRADED_PATHS = tuple(
+    f"/api/v1/predict/{output}" for output in ("fertilizer", "irrigation", "pest-alert", "yield", "all", "batch")
+)
+DEGRADED_PREFIXES = ("/api/v1/predict/profile/",)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    controller=admission,
+    path_prefixes=("/api/v1/predict",),
+    degraded_paths=DEGRADED_PATHS if settings.fallback_when_overloaded else (),
+    degraded_prefixes=DEGRADED_PREFIXES if settings.fallback_when_overloaded else ()
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -82,6 +114,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses for clients that accept gzip or brotli
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_min_bytes,
+        gzip_level=settings.gzip_level,
+        brotli_quality=settings.brotli_quality
+    )
+
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
@@ -0,0 +1,26 @@
+"""
+First stage of the forest cascade: a subset of the forest's trees
+
+Calibration and statistics of the cascade are in ``app.serving.cascade``.
+"""
+import numpy as np
+
+
+def forest_subset_proba(model, values: np.ndarray, n_trees: int) -> np.ndarray:
+    """
+    Class probabilities averaged over the first ``n_trees`` trees of a random forest
+
+    Args:
+        model: Fitted random forest classifier
+        values: Feature array as float32, in the model's column order
+        n_trees: Number of trees to average
+
+    Returns:
+        Probabilities with columns in ``model.classes_`` order
+    """
+    trees = model.estimators_[:n_trees]
+    probabilities = trees[0].predict_proba(values, check_input=False)
+    for tree in trees[1:]:
+        probabilities += tree.predict_proba(values, check_input=False)
+    probabilities /= len(trees)
+    return probabilities
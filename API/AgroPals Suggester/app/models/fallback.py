@@ -0,0 +1,150 @@
+"""
+Rule-based fallback predictions from a per-crop rules table
+"""
+import bisect
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Reasons a request is answered by the fallback
+MODEL_UNAVAILABLE = "model_unavailable"
+OVERLOADED = "overloaded"
+
+
+class RuleFallback:
+    """
+    Approximate predictions without the models, from a small rules table
+
+    Every output has a driver: the numerical input most correlated with it
+    in the training data, cut into equal-frequency bins. For each crop and
+    driver bin the table keeps the median of regression targets and the
+    rate of classification targets, with all-crop values for unknown crops
+    and empty bins. A prediction is one dictionary lookup and one bisection
+    per output, so it answers in microseconds and works when the models
+    cannot be loaded.
+    """
+
+    def __init__(
+        self,
+        rules: Dict[str, Dict[str, Any]],
+        quality: Dict[str, float] = None,
+        model_version: Optional[str] = None
+    ):
+        self.rules = rules
+        self.quality = quality or {}
+        self.model_version = model_version
+        self.served = Counter()
+
+    @classmethod
+    def build(
+        cls,
+        data: pd.DataFrame,
+        numerical_columns: List[str],
+        target_columns: Dict[str, str],
+        bins: int = 4,
+        model_version: Optional[str] = None
+    ) -> "RuleFallback":
+        """
+        Build the rules table from training data
+
+        Args:
+            data: Raw training data with ``crop``, the numerical inputs and the targets
+            numerical_columns: Candidate driver inputs
+            target_columns: Target name to ``regression`` or ``classification``;
+                targets missing from ``data`` are skipped
+            bins: Equal-frequency bins per driver
+            model_version: Version of the models trained on the same data
+
+        Returns:
+            Fallback with its training-data accuracy or MAE per output recorded
+        """
+        rules = {}
+        for target, target_type in target_columns.items():
+            if target not in data.columns:
+                continue
+
+            driver = data[numerical_columns].corrwith(data[target]).abs().idxmax()
+            edges = np.unique(data[driver].quantile(np.linspace(0, 1, bins + 1)[1:-1]).to_numpy()).tolist()
+            positions = np.searchsorted(edges, data[driver].to_numpy(), side='right')
+
+            statistic = 'mean' if target_type == 'classification' else 'median'
+            overall = data[target].groupby(positions).agg(statistic).reindex(range(len(edges) + 1))
+            overall = overall.fillna(data[target].agg(statistic))
+            by_crop = data[target].groupby([data['crop'], positions]).agg(statistic).unstack()
+            by_crop = by_crop.reindex(columns=overall.index).fillna(overall)
+
+            rules[target] = {
+                'type': target_type,
+                'driver': driver,
+                'edges': edges,
+                'default': overall.round(4).tolist(),
+                'by_crop': {crop: row.round(4).tolist() for crop, row in by_crop.iterrows()}
+            }
+
+        fallback = cls(rules, model_version=model_version)
+        for target, rule in rules.items():
+            predicted = np.array([
+                fallback._lookup(rule, crop, value)
+                for crop, value in zip(data['crop'], data[rule['driver']])
+            ])
+            if rule['type'] == 'classification':
+                fallback.quality[f'{target}_accuracy'] = float(((predicted >= 0.5) == data[target]).mean())
+            else:
+                fallback.quality[f'{target}_mae'] = float(np.abs(predicted - data[target]).mean())
+
+        logger.info(f"Built rule fallback for {len(rules)} outputs: {fallback.quality}")
+        return fallback
+
+    @staticmethod
+    def _lookup(rule: Dict[str, Any], crop: str, value: float) -> float:
+        row = rule['by_crop'].get(crop, rule['default'])
+        return row[bisect.bisect_right(rule['edges'], value)]
+
+    def predict(self, input_data: Dict[str, Any], reason: str) -> Dict[str, float]:
+        """
+        Approximate value of every output for one input
+
+        Args:
+            input_data: Raw input values
+            reason: Why the fallback is answering, for the served counters
+
+        Returns:
+            Median per regression output and probability per classification output
+        """
+        self.served[reason] += 1
+        crop = input_data['crop']
+        return {
+            target: self._lookup(rule, crop, input_data[rule['driver']])
+            for target, rule in self.rules.items()
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            'drivers': {target: rule['driver'] for target, rule in self.rules.items()},
+            'quality': self.quality,
+            'model_version': self.model_version,
+            'served': dict(self.served)
+        }
+
+    def save(self, filepath: str):
+        """Save the rules table as JSON, replacing any saved one in a single step"""
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'rules': self.rules, 'quality': self.quality, 'model_version': self.model_version}, f)
+        os.replace(tmp_path, filepath)
+        logger.info(f"Rule fallback saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> "RuleFallback":
+        """Load a saved rules table"""
+        with open(filepath) as f:
+            saved = json.load(f)
+        logger.info(f"Rule fallback loaded from {filepath}")
+        return cls(**saved)
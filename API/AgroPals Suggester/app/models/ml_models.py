@@ -3,13 +3,20 @@ ML Models module for loading and making predictions
 """
 import os
 import sys
+import threading
+import time
 import joblib
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, List, Optional, Set
 import logging
 from pathlib import Path
 from ..core.config import settings
+from ..core.fingerprint import load_saved_fingerprint
+from .cascade import forest_subset_proba
+from ..serving.cascade import CascadeStats, top_two_margin
 
 # Add scripts directory to path for imports
 scripts_dir = Path(__file__).parent.parent.parent / "scripts"
@@ -29,7 +36,17 @@ class AgriculturalMLModels:
             'irrigation_needed', 'pest_alert', 'yield'
         ]
         self.models_loaded = False
+        self.model_version = None
+        self.cascades = {}
+        self.cascade_stats = {name: CascadeStats() for name in ['irrigation_needed', 'pest_alert']}
         self._load_attempted = False
+        # Shared by predict_all so the models of one request run concurrently
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.predict_all_workers, thread_name_prefix="predict-all"
+        )
+        # Calls that missed their deadline but still hold an executor thread, per output
+        self._stragglers: Dict[str, Set[Future]] = defaultdict(set)
+        self._stragglers_lock = threading.Lock()
         
     def _ensure_models_loaded(self):
         """Ensure models are loaded before making predictions"""
@@ -93,10 +110,67 @@ class AgriculturalMLModels:
                 logger.warning(f"Model file not found: {model_path}")
         
         self.models_loaded = loaded_count > 0
+        fingerprint = load_saved_fingerprint(models_dir)
+        self.model_version = fingerprint[:12] if fingerprint else None
+        self.cascades = self._load_cascades(models_dir)
         logger.info(f"Successfully loaded {loaded_count}/{len(self.model_names)} models")
         
         return self.models_loaded
     
+    def set_threads(self, n_jobs: int):
+        """
+        Cap the threads each loaded model predicts with
+        
+        Used by scoring processes that already run one per core, where the
+        ``n_jobs=-1`` the models were trained with would oversubscribe them.
+        """
+        for model in self.models.values():
+            if 'n_jobs' in model.get_params():
+                model.set_params(n_jobs=n_jobs)
+    
+    @staticmethod
+    def _load_cascades(models_dir: str) -> Dict[str, Dict[str, Any]]:
+        """Cascade calibrations recorded in the saved model metadata, if any"""
+        try:
+            metadata = joblib.load(os.path.join(models_dir, 'model_metadata.pkl'))
+        except Exception as e:
+            logger.warning(f"Could not read cascade calibration: {e}")
+            return {}
+        return metadata.get('cascades') or {}
+    
+    def _predict_proba(self, model_name: str, X: pd.DataFrame) -> np.ndarray:
+        """
+        Class probabilities, from the cascade first stage where it is confident
+        
+        With ``CASCADE_ENABLED`` and a calibrated model, rows whose margin
+        over the first forest trees reaches the calibrated threshold keep
+        the subset's probabilities and only the rest are scored by the full
+        forest. Otherwise every row is scored by the full forest.
+        """
+        model = self.models[model_name]
+        calibration = self.cascades.get(model_name)
+        if not settings.cascade_enabled or not calibration or calibration['threshold'] is None:
+            return model.predict_proba(X)
+        
+        values = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
+        probabilities = forest_subset_proba(model, values, calibration['first_stage_trees'])
+        escalate = top_two_margin(probabilities) < calibration['threshold']
+        if escalate.any():
+            probabilities[escalate] = model.predict_proba(X[escalate])
+        
+        self.cascade_stats[model_name].record(len(X), int(escalate.sum()))
+        return probabilities
+    
+    def get_cascade_metrics(self) -> Dict[str, Any]:
+        """Cascade calibration and rows answered by each stage, per classifier"""
+        return {
+            'enabled': settings.cascade_enabled,
+            'models': {
+                name: stats.get_metrics(self.cascades.get(name))
+                for name, stats in self.cascade_stats.items()
+            }
+        }
+    
     def get_model_status(self) -> Dict[str, Any]:
         """Get status of all models"""
         # Try to load models if not attempted yet
@@ -117,14 +191,107 @@ class AgriculturalMLModels:
             'models_directory_exists': os.path.exists(settings.models_dir)
         }
     
+    @staticmethod
+    def model_input(X: pd.DataFrame, dtype: str = None) -> pd.DataFrame:
+        """
+        Preprocessed features as one block in the inference precision
+        
+        Scaling runs in double precision and the result is rounded once
+        here. The forests and boosted trees compare features in single
+        precision, so a ``float32`` frame gives the same predictions as a
+        ``float64`` one, and every model reuses it instead of converting
+        the mixed-type frame again.
+        
+        Args:
+            X: Preprocessed features
+            dtype: ``float64`` or ``float32`` (default: ``INFERENCE_DTYPE``)
+        """
+        return X.astype(dtype or settings.inference_dtype, copy=False)
+    
     def _preprocess_input(self, input_data: dict) -> pd.DataFrame:
         """Preprocess input data for prediction"""
         if not self.preprocessor:
             raise RuntimeError("Preprocessor not loaded")
         
-        return self.preprocessor.transform_single_input(input_data)
+        return self.model_input(self.preprocessor.transform_single_input(input_data))
+    
+    def encode_static(self, values: dict) -> Dict[str, int]:
+        """Label-encode static categorical inputs once, for reuse across predictions"""
+        self._ensure_models_loaded()
+        return self.preprocessor.encode_values(values)
+    
+    def preprocess_with_static(self, input_data: dict, encoded_static: Dict[str, int]) -> pd.DataFrame:
+        """Preprocess an input whose static categorical columns were encoded by ``encode_static``"""
+        if not self.preprocessor:
+            raise RuntimeError("Preprocessor not loaded")
+        
+        return self.model_input(self.preprocessor.transform_with_encoded(input_data, encoded_static))
     
-    def predict_fertilizer(self, input_data: dict) -> Dict[str, Any]:
+    def preprocess(self, input_data: dict) -> pd.DataFrame:
+        """Preprocess one input for reuse across ``predict_variants`` calls"""
+        self._ensure_models_loaded()
+        return self._preprocess_input(input_data)
+    
+    def predict_variants(
+        self,
+        input_data: dict,
+        variations: Dict[str, np.ndarray],
+        model_names: List[str],
+        X: pd.DataFrame = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vectorized predictions for copies of one input with numerical inputs varied
+        
+        The input is preprocessed once and only the varied columns are
+        scaled for the whole batch.
+        
+        Args:
+            input_data: Raw input values
+            variations: Equal-length arrays of raw values per numerical input
+            model_names: Models to evaluate; models that are not loaded are omitted
+            X: Preprocessed input, if the caller already has it
+        
+        Returns:
+            Raw model predictions per model name
+        """
+        self._ensure_models_loaded()
+        
+        if X is None:
+            X = self._preprocess_input(input_data)
+        size = len(next(iter(variations.values())))
+        
+        dtype = settings.inference_dtype
+        batch = pd.DataFrame(np.repeat(X.to_numpy(dtype=dtype), size, axis=0), columns=X.columns)
+        for col, values in variations.items():
+            scaler = self.preprocessor.scalers.get(col)
+            if scaler is not None:
+                values = scaler.transform(pd.DataFrame({col: values}))[:, 0]
+            batch[col] = np.asarray(values, dtype=dtype)
+        
+        return {
+            name: self.models[name].predict(batch)
+            for name in model_names if name in self.models
+        }
+    
+    @staticmethod
+    def _ensemble_confidence(model, X: pd.DataFrame, prediction: float) -> Optional[float]:
+        """
+        Confidence from the spread of member predictions in a bagged ensemble
+        
+        Boosted ensembles keep their stage trees in an array and each stage
+        only predicts a residual correction, so they get no confidence.
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if not isinstance(estimators, list):
+            return None
+        
+        values = X.to_numpy()
+        individual_preds = [est.predict(values)[0] for est in estimators]
+        variance = np.var(individual_preds)
+        confidence = max(0.5, 1 - min(variance / prediction, 0.5))
+        return round(confidence, 3)
+    
+    def predict_fertilizer(self, input_data: dict, X: pd.DataFrame = None) -> Dict[str, Any]:
         """Predict NPK fertilizer requirements"""
         self._ensure_models_loaded()
         
@@ -134,8 +301,9 @@ class AgriculturalMLModels:
             if model_name not in self.models:
                 raise RuntimeError(f"Model {model_name} not loaded")
         
-        # Preprocess input
-        X = self._preprocess_input(input_data)
+        # Preprocess input unless the caller already did
+        if X is None:
+            X = self._preprocess_input(input_data)
         
         predictions = {}
         confidences = {}
@@ -148,19 +316,16 @@ class AgriculturalMLModels:
             predictions[f'{nutrient}_fertilizer'] = max(0, round(prediction, 1))
             
             # Calculate confidence (simplified - based on prediction variance)
-            if hasattr(model, 'estimators_'):
-                # For ensemble methods, use prediction variance
-                individual_preds = [est.predict(X)[0] for est in model.estimators_]
-                variance = np.var(individual_preds)
-                confidence = max(0.5, 1 - min(variance / prediction, 0.5))
-                confidences[f'{nutrient}_fertilizer'] = round(confidence, 3)
+            confidence = self._ensemble_confidence(model, X, prediction)
+            if confidence is not None:
+                confidences[f'{nutrient}_fertilizer'] = confidence
         
         return {
             **predictions,
             'confidence': round(np.mean(list(confidences.values())), 3) if confidences else None
         }
     
-    def predict_irrigation(self, input_data: dict) -> Dict[str, Any]:
+    def predict_irrigation(self, input_data: dict, X: pd.DataFrame = None) -> Dict[str, Any]:
         """Predict irrigation need"""
         self._ensure_models_loaded()
         
@@ -169,25 +334,27 @@ class AgriculturalMLModels:
         if model_name not in self.models:
             raise RuntimeError(f"Model {model_name} not loaded")
         
-        # Preprocess input
-        X = self._preprocess_input(input_data)
+        # Preprocess input unless the caller already did
+        if X is None:
+            X = self._preprocess_input(input_data)
         model = self.models[model_name]
         
-        prediction = model.predict(X)[0]
-        
-        result = {
-            'irrigation_needed': int(prediction)
-        }
-        
         # Add probability if available
         if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X)[0]
-            result['probability'] = round(probabilities[1], 3)  # Probability of needing irrigation
-            result['confidence'] = round(max(probabilities), 3)
+            probabilities = self._predict_proba(model_name, X)[0]
+            result = {
+                'irrigation_needed': int(model.classes_[probabilities.argmax()]),
+                'probability': round(probabilities[1], 3),  # Probability of needing irrigation
+                'confidence': round(max(probabilities), 3)
+            }
+        else:
+            result = {
+                'irrigation_needed': int(model.predict(X)[0])
+            }
         
         return result
     
-    def predict_pest_alert(self, input_data: dict) -> Dict[str, Any]:
+    def predict_pest_alert(self, input_data: dict, X: pd.DataFrame = None) -> Dict[str, Any]:
         """Predict pest alert"""
         self._ensure_models_loaded()
         
@@ -196,25 +363,27 @@ class AgriculturalMLModels:
         if model_name not in self.models:
             raise RuntimeError(f"Model {model_name} not loaded")
         
-        # Preprocess input
-        X = self._preprocess_input(input_data)
+        # Preprocess input unless the caller already did
+        if X is None:
+            X = self._preprocess_input(input_data)
         model = self.models[model_name]
         
-        prediction = model.predict(X)[0]
-        
-        result = {
-            'pest_alert': int(prediction)
-        }
-        
         # Add probability if available
         if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X)[0]
-            result['probability'] = round(probabilities[1], 3)  # Probability of pest occurrence
-            result['confidence'] = round(max(probabilities), 3)
+            probabilities = self._predict_proba(model_name, X)[0]
+            result = {
+                'pest_alert': int(model.classes_[probabilities.argmax()]),
+                'probability': round(probabilities[1], 3),  # Probability of pest occurrence
+                'confidence': round(max(probabilities), 3)
+            }
+        else:
+            result = {
+                'pest_alert': int(model.predict(X)[0])
+            }
         
         return result
     
-    def predict_yield(self, input_data: dict) -> Optional[Dict[str, Any]]:
+    def predict_yield(self, input_data: dict, X: pd.DataFrame = None) -> Optional[Dict[str, Any]]:
         """Predict crop yield"""
         self._ensure_models_loaded()
         
@@ -224,8 +393,9 @@ class AgriculturalMLModels:
             logger.warning(f"Model {model_name} not available")
             return None
         
-        # Preprocess input
-        X = self._preprocess_input(input_data)
+        # Preprocess input unless the caller already did
+        if X is None:
+            X = self._preprocess_input(input_data)
         model = self.models[model_name]
         
         prediction = model.predict(X)[0]
@@ -235,54 +405,146 @@ class AgriculturalMLModels:
         }
         
         # Calculate confidence for yield prediction
-        if hasattr(model, 'estimators_'):
-            individual_preds = [est.predict(X)[0] for est in model.estimators_]
-            variance = np.var(individual_preds)
-            confidence = max(0.5, 1 - min(variance / prediction, 0.5))
-            result['confidence'] = round(confidence, 3)
+        confidence = self._ensemble_confidence(model, X, prediction)
+        if confidence is not None:
+            result['confidence'] = confidence
         
         return result
     
-    def predict_all(self, input_data: dict) -> Dict[str, Any]:
-        """Make all predictions at once"""
+    def predict_frame(self, data: pd.DataFrame, dtype: str = None) -> pd.DataFrame:
+        """
+        Make vectorized predictions with every loaded model for a frame of inputs
+        
+        Returns a frame indexed like ``data`` with one column per model output;
+        outputs of models that are not loaded are omitted. ``dtype``
+        overrides ``INFERENCE_DTYPE`` for the preprocessed features.
+        """
         self._ensure_models_loaded()
         
-        results = {}
+        X = self.model_input(self.preprocessor.transform_frame(data), dtype)
+        results = pd.DataFrame(index=data.index)
         
-        try:
-            # Fertilizer predictions
-            fertilizer_result = self.predict_fertilizer(input_data)
-            results['fertilizer'] = fertilizer_result
-        except Exception as e:
-            logger.error(f"Error in fertilizer prediction: {e}")
-            results['fertilizer'] = {'error': str(e)}
+        for nutrient in ['n', 'p', 'k']:
+            model_name = f'{nutrient}_fertilizer'
+            if model_name in self.models:
+                results[model_name] = np.maximum(0, self.models[model_name].predict(X)).round(1)
         
-        try:
-            # Irrigation prediction
-            irrigation_result = self.predict_irrigation(input_data)
-            results['irrigation'] = irrigation_result
-        except Exception as e:
-            logger.error(f"Error in irrigation prediction: {e}")
-            results['irrigation'] = {'error': str(e)}
+        for model_name in ['irrigation_needed', 'pest_alert']:
+            if model_name in self.models:
+                model = self.models[model_name]
+                probabilities = self._predict_proba(model_name, X)
+                results[model_name] = model.classes_[probabilities.argmax(axis=1)].astype(int)
+                results[f'{model_name}_probability'] = probabilities[:, 1].round(3)
         
-        try:
-            # Pest alert prediction
-            pest_result = self.predict_pest_alert(input_data)
-            results['pest_alert'] = pest_result
-        except Exception as e:
-            logger.error(f"Error in pest alert prediction: {e}")
-            results['pest_alert'] = {'error': str(e)}
+        if 'yield' in self.models:
+            results['yield_prediction'] = np.maximum(0, self.models['yield'].predict(X)).round(2)
         
-        try:
-            # Yield prediction (optional)
-            yield_result = self.predict_yield(input_data)
-            if yield_result:
-                results['yield_prediction'] = yield_result
-        except Exception as e:
-            logger.error(f"Error in yield prediction: {e}")
-            results['yield_prediction'] = {'error': str(e)}
+        return results
+    
+    def predict_all(
+        self,
+        input_data: dict,
+        deadline: float = None,
+        model_timeouts_ms: Dict[str, float] = None,
+        X: pd.DataFrame = None
+    ) -> Dict[str, Any]:
+        """
+        Make all predictions at once
+        
+        The input is preprocessed once and the models run concurrently. Each
+        model has its own time budget and the whole call a deadline; outputs
+        not ready in time are left out, and ``model_status`` reports each
+        output as ``ok``, ``timeout``, ``busy``, ``error`` or ``unavailable``.
+        
+        A call that misses its deadline cannot be stopped and keeps its
+        executor thread until it returns. Until then its output is not
+        submitted again and is reported ``busy``, so one slow or hung model
+        holds at most the threads it already had and the other outputs keep
+        being answered.
+        
+        Args:
+            input_data: Raw input values
+            deadline: ``time.monotonic()`` value by which to return (default:
+                now plus the configured request timeout)
+            model_timeouts_ms: Per-output time budgets overriding the
+                configured model timeout
+            X: Preprocessed input, if the caller already has it
+        """
+        self._ensure_models_loaded()
+        
+        start = time.monotonic()
+        if deadline is None:
+            deadline = start + settings.predict_all_timeout_ms / 1000
+        model_timeouts_ms = model_timeouts_ms or {}
+        
+        if X is None:
+            X = self._preprocess_input(input_data)
+        
+        predictors = {
+            'fertilizer': self.predict_fertilizer,
+            'irrigation': self.predict_irrigation,
+            'pest_alert': self.predict_pest_alert,
+            'yield_prediction': self.predict_yield
+        }
+        results = {}
+        model_status = {}
+        model_latency_ms = {}
+        futures = {}
+        for name, predictor in predictors.items():
+            if self._is_busy(name):
+                model_status[name] = 'busy'
+            else:
+                futures[name] = self.executor.submit(self._timed_call, predictor, input_data, X)
         
+        for name, future in futures.items():
+            timeout_ms = model_timeouts_ms.get(name, settings.model_timeout_ms)
+            model_deadline = min(deadline, start + timeout_ms / 1000)
+            try:
+                result, elapsed_ms = future.result(timeout=max(model_deadline - time.monotonic(), 0))
+            except FuturesTimeoutError:
+                if not future.cancel():
+                    self._add_straggler(name, future)
+                logger.warning(f"{name} prediction missed its deadline")
+                model_status[name] = 'timeout'
+                continue
+            except Exception as e:
+                logger.error(f"Error in {name} prediction: {e}")
+                model_status[name] = 'error'
+                continue
+            
+            model_latency_ms[name] = elapsed_ms
+            if result is None:
+                model_status[name] = 'unavailable'
+            else:
+                results[name] = result
+                model_status[name] = 'ok'
+        
+        results['model_status'] = {name: model_status[name] for name in predictors}
+        results['model_latency_ms'] = model_latency_ms
         return results
+    
+    def _is_busy(self, name: str) -> bool:
+        """Whether a call for an output that missed its deadline is still running"""
+        with self._stragglers_lock:
+            return bool(self._stragglers[name])
+    
+    def _add_straggler(self, name: str, future: Future):
+        """Track a running call that missed its deadline until it returns"""
+        with self._stragglers_lock:
+            self._stragglers[name].add(future)
+        # Runs at once if the call finished in the meantime
+        future.add_done_callback(lambda done: self._drop_straggler(name, done))
+    
+    def _drop_straggler(self, name: str, future: Future):
+        with self._stragglers_lock:
+            self._stragglers[name].discard(future)
+    
+    @staticmethod
+    def _timed_call(predictor, input_data: dict, X: pd.DataFrame):
+        """Run one predictor and measure its latency"""
+        start = time.perf_counter()
+        result = predictor(input_data, X)
+        return result, round((time.perf_counter() - start) * 1000, 2)
 
 
 # Global instance - will now load lazily
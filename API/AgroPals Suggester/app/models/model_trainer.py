@@ -15,6 +15,9 @@ import os
 import logging
 from typing import Dict, Any, Tuple, Optional
 import warnings
+
+from .cascade import forest_subset_proba
+from ..serving.cascade import calibrate_cascade
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
@@ -23,11 +26,15 @@ logger = logging.getLogger(__name__)
 class AgriculturalModelTrainer:
     """Trains and evaluates ML models for agricultural predictions"""
     
-    def __init__(self, random_state: int = 42, n_estimators: int = 100, max_depth: int = 10):
+    def __init__(self, random_state: int = 42, n_estimators: int = 100, max_depth: int = 10,
+                 cascade_trees: int = 10, cascade_target_agreement: float = 0.999):
         self.random_state = random_state
         self.n_estimators = n_estimators
         self.max_depth = max_depth
+        self.cascade_trees = cascade_trees
+        self.cascade_target_agreement = cascade_target_agreement
         self.models = {}
+        self.cascades = {}
         self.model_configs = {
             'n_fertilizer': {
                 'type': 'regression',
@@ -94,7 +101,7 @@ class AgriculturalModelTrainer:
     
     def train_regression_model(self, X_train: pd.DataFrame, y_train: pd.Series,
                               X_test: pd.DataFrame, y_test: pd.Series,
-                              model_name: str) -> Dict[str, Any]:
+                              model_name: str, cv: Any = 5) -> Dict[str, Any]:
         """Train and evaluate a regression model"""
         logger.info(f"Training regression model: {model_name}")
         
@@ -119,7 +126,7 @@ class AgriculturalModelTrainer:
         }
         
         # Cross-validation
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5, 
+        cv_scores = cross_val_score(model, X_train, y_train, cv=cv, 
                                    scoring='neg_root_mean_squared_error', n_jobs=-1)
         metrics['cv_rmse_mean'] = -cv_scores.mean()
         metrics['cv_rmse_std'] = cv_scores.std()
@@ -137,7 +144,7 @@ class AgriculturalModelTrainer:
     
     def train_classification_model(self, X_train: pd.DataFrame, y_train: pd.Series,
                                  X_test: pd.DataFrame, y_test: pd.Series,
-                                 model_name: str) -> Dict[str, Any]:
+                                 model_name: str, cv: Any = 5) -> Dict[str, Any]:
         """Train and evaluate a classification model"""
         logger.info(f"Training classification model: {model_name}")
         
@@ -162,7 +169,7 @@ class AgriculturalModelTrainer:
         }
         
         # Cross-validation
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5, 
+        cv_scores = cross_val_score(model, X_train, y_train, cv=cv, 
                                    scoring='accuracy', n_jobs=-1)
         metrics['cv_accuracy_mean'] = cv_scores.mean()
         metrics['cv_accuracy_std'] = cv_scores.std()
@@ -171,6 +178,10 @@ class AgriculturalModelTrainer:
         metrics['classification_report'] = classification_report(y_test, y_pred_test)
         metrics['confusion_matrix'] = confusion_matrix(y_test, y_pred_test).tolist()
         
+        if isinstance(model, RandomForestClassifier):
+            self.cascades[model_name] = self.calibrate_cascade(model, X_test, y_test)
+            metrics['cascade'] = self.cascades[model_name]
+        
         logger.info(f"{model_name} - Test Accuracy: {metrics['test_accuracy']:.3f}, F1: {metrics['test_f1']:.3f}")
         
         return {
@@ -183,12 +194,27 @@ class AgriculturalModelTrainer:
             }
         }
     
+    def calibrate_cascade(self, model: RandomForestClassifier, X_test: pd.DataFrame,
+                          y_test: pd.Series) -> Dict[str, Any]:
+        """Calibrate the margin threshold of a forest-subset first stage on the test split"""
+        n_trees = min(self.cascade_trees, len(model.estimators_))
+        values = np.ascontiguousarray(np.asarray(X_test, dtype=np.float32))
+        calibration = calibrate_cascade(
+            forest_subset_proba(model, values, n_trees),
+            model.predict_proba(X_test),
+            np.searchsorted(model.classes_, np.asarray(y_test)),
+            self.cascade_target_agreement
+        )
+        calibration['first_stage_trees'] = n_trees
+        return calibration
+    
     def train_all_models(self, data_splits: Dict[str, Any]) -> Dict[str, Any]:
         """Train all models using the provided data splits"""
         logger.info("Starting training of all models")
         
         X_train = data_splits['X_train']
         X_test = data_splits['X_test']
+        cv = data_splits.get('cv_folds', 5)
         
         results = {}
         
@@ -206,11 +232,11 @@ class AgriculturalModelTrainer:
             try:
                 if config['type'] == 'regression':
                     result = self.train_regression_model(
-                        X_train, y_train, X_test, y_test, model_name
+                        X_train, y_train, X_test, y_test, model_name, cv=cv
                     )
                 else:  # classification
                     result = self.train_classification_model(
-                        X_train, y_train, X_test, y_test, model_name
+                        X_train, y_train, X_test, y_test, model_name, cv=cv
                     )
                 
                 self.models[model_name] = result['model']
@@ -223,7 +249,8 @@ class AgriculturalModelTrainer:
         logger.info(f"Completed training {len(self.models)} models")
         return results
     
-    def save_models(self, save_dir: str):
+    def save_models(self, save_dir: str, fingerprint: Optional[str] = None,
+                    split_indices: Optional[Dict[str, np.ndarray]] = None):
         """Save trained models to disk"""
         os.makedirs(save_dir, exist_ok=True)
         
@@ -236,7 +263,10 @@ class AgriculturalModelTrainer:
         metadata = {
             'model_names': list(self.models.keys()),
             'model_configs': self.model_configs,
-            'random_state': self.random_state
+            'random_state': self.random_state,
+            'fingerprint': fingerprint,
+            'split_indices': split_indices,
+            'cascades': self.cascades
         }
         
         metadata_path = os.path.join(save_dir, 'model_metadata.pkl')
@@ -335,6 +365,13 @@ class AgriculturalModelTrainer:
                 report.append(f"  Test Recall:    {metrics['test_recall']:.4f}")
                 report.append(f"  Test F1:        {metrics['test_f1']:.4f}")
                 report.append(f"  CV Accuracy:    {metrics['cv_accuracy_mean']:.4f} ± {metrics['cv_accuracy_std']:.4f}")
+                cascade = metrics.get('cascade')
+                if cascade:
+                    report.append(
+                        f"  Cascade ({cascade['first_stage_trees']} trees): "
+                        f"escalation rate {cascade['escalation_rate']:.4f}, "
+                        f"accuracy delta {cascade['accuracy_delta']:+.4f}"
+                    )
             
             report.append("")
         
@@ -0,0 +1,30 @@
+"""
+Pydantic schemas for batch job requests and responses
+"""
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class JobResponse(BaseModel):
+    """Batch job status response"""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    total_rows: Optional[int] = Field(None, description="Rows in the submitted dataset")
+    rows_done: int = Field(..., description="Rows scored so far")
+    rows_failed: int = Field(..., description="Rows rejected by input validation")
+    progress: Optional[float] = Field(None, ge=0, le=1, description="Fraction of rows scored (0-1)")
+    rows_per_second: Optional[float] = Field(None, description="Scoring throughput")
+    model_version: Optional[str] = Field(None, description="Version of the models scoring the job")
+    error: Optional[str] = Field(None, description="Failure reason")
+    created_at: str = Field(..., description="Submission timestamp")
+    started_at: Optional[str] = Field(None, description="Start timestamp")
+    finished_at: Optional[str] = Field(None, description="Completion timestamp")
+
+
+class JobResultsResponse(BaseModel):
+    """Page of batch job results"""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="Job status")
+    offset: int = Field(..., description="Row offset of this page")
+    results: List[Dict[str, Any]] = Field(..., description="Scored rows in input order")
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, if more rows are available")
@@ -0,0 +1,51 @@
+"""
+Pydantic schemas for the fertilizer dose optimizer
+"""
+from typing import Optional
+from pydantic import BaseModel, Field
+
+from .prediction import PredictionInput, FertilizerPrediction
+
+
+class FertilizerPlanInput(BaseModel):
+    """Fertilizer plan request for one field"""
+    field: PredictionInput = Field(..., description="Current field conditions")
+    target_yield: float = Field(..., gt=0, description="Yield to reach (tons/ha)", example=4.0)
+    price_n: float = Field(1.0, ge=0, description="Cost per kg of nitrogen")
+    price_p: float = Field(1.0, ge=0, description="Cost per kg of phosphorus")
+    price_k: float = Field(1.0, ge=0, description="Cost per kg of potassium")
+    max_n: float = Field(150.0, ge=0, description="Largest nitrogen dose to consider (kg/ha)")
+    max_p: float = Field(100.0, ge=0, description="Largest phosphorus dose to consider (kg/ha)")
+    max_k: float = Field(150.0, ge=0, description="Largest potassium dose to consider (kg/ha)")
+    max_evaluations: Optional[int] = Field(
+        None, gt=0, description="Candidate plans to evaluate at most (default: OPTIMIZER_MAX_EVALUATIONS)"
+    )
+    time_budget_ms: Optional[float] = Field(
+        None, gt=0, description="Search time budget in ms (default: OPTIMIZER_TIME_BUDGET_MS)"
+    )
+
+
+class FertilizerPlan(BaseModel):
+    """Nutrient doses with their cost and predicted yield"""
+    n_dose: float = Field(..., description="Nitrogen to apply (kg/ha)")
+    p_dose: float = Field(..., description="Phosphorus to apply (kg/ha)")
+    k_dose: float = Field(..., description="Potassium to apply (kg/ha)")
+    cost: float = Field(..., description="Cost of the doses at the given prices")
+    predicted_yield: float = Field(..., description="Predicted yield with the doses applied (tons/ha)")
+
+
+class FertilizerPlanResponse(BaseModel):
+    """Cheapest plan found, with the search statistics"""
+    target_yield: float = Field(..., description="Requested yield (tons/ha)")
+    target_reached: bool = Field(..., description="Whether the plan reaches the target; if not, the plan maximizes yield")
+    plan: FertilizerPlan = Field(..., description="Best plan found")
+    recommended_plan: FertilizerPlan = Field(..., description="Doses recommended by the fertilizer models, for comparison")
+    baseline_yield: float = Field(..., description="Predicted yield without fertilizer (tons/ha)")
+    remaining_need: FertilizerPrediction = Field(
+        ..., description="Fertilizer the models still recommend once the plan is applied"
+    )
+    iterations: int = Field(..., description="Search iterations run")
+    evaluations: int = Field(..., description="Candidate plans evaluated")
+    elapsed_ms: float = Field(..., description="Search time")
+    stop_reason: str = Field(..., description="converged, evaluation_budget or time_budget")
+    model_version: Optional[str] = Field(None, description="Version of the models used")
@@ -1,8 +1,22 @@
 """
 Pydantic schemas for request and response validation
 """
-from typing import Optional
-from pydantic import BaseModel, Field, validator
+from typing import Any, Dict, List, Optional, Union
+from pydantic import BaseModel, Field, ValidationError, validator
+
+from ..core.config import settings
+
+
+VALID_CROPS = [
+    'rice', 'maize', 'chickpea', 'kidneybeans', 'pigeonpeas', 
+    'mothbeans', 'mungbean', 'blackgram', 'lentil', 'pomegranate',
+    'banana', 'mango', 'grapes', 'watermelon', 'muskmelon', 
+    'apple', 'orange', 'papaya', 'coconut', 'cotton', 'jute', 'coffee'
+]
+VALID_GROWTH_STAGES = ['germination', 'vegetative', 'flowering', 'harvest']
+VALID_SOIL_TYPES = ['clay', 'loam', 'sandy_loam', 'clay_loam', 'sandy', 'silt']
+VALID_FARMER_TYPES = ['progressive', 'moderate', 'conservative', 'resource_poor']
+VALID_IRRIGATION_SYSTEMS = ['flood', 'sprinkler', 'drip', 'furrow']
 
 
 class PredictionInput(BaseModel):
@@ -27,42 +41,32 @@ class PredictionInput(BaseModel):
 
     @validator('crop')
     def validate_crop(cls, v):
-        valid_crops = [
-            'rice', 'maize', 'chickpea', 'kidneybeans', 'pigeonpeas', 
-            'mothbeans', 'mungbean', 'blackgram', 'lentil', 'pomegranate',
-            'banana', 'mango', 'grapes', 'watermelon', 'muskmelon', 
-            'apple', 'orange', 'papaya', 'coconut', 'cotton', 'jute', 'coffee'
-        ]
-        if v.lower() not in valid_crops:
-            raise ValueError(f'Crop must be one of: {valid_crops}')
+        if v.lower() not in VALID_CROPS:
+            raise ValueError(f'Crop must be one of: {VALID_CROPS}')
         return v.lower()
 
     @validator('growth_stage')
     def validate_growth_stage(cls, v):
-        valid_stages = ['germination', 'vegetative', 'flowering', 'harvest']
-        if v.lower() not in valid_stages:
-            raise ValueError(f'Growth stage must be one of: {valid_stages}')
+        if v.lower() not in VALID_GROWTH_STAGES:
+            raise ValueError(f'Growth stage must be one of: {VALID_GROWTH_STAGES}')
         return v.lower()
 
     @validator('soil_type')
     def validate_soil_type(cls, v):
-        valid_types = ['clay', 'loam', 'sandy_loam', 'clay_loam', 'sandy', 'silt']
-        if v.lower() not in valid_types:
-            raise ValueError(f'Soil type must be one of: {valid_types}')
+        if v.lower() not in VALID_SOIL_TYPES:
+            raise ValueError(f'Soil type must be one of: {VALID_SOIL_TYPES}')
         return v.lower()
 
     @validator('farmer_type')
     def validate_farmer_type(cls, v):
-        valid_types = ['progressive', 'moderate', 'conservative', 'resource_poor']
-        if v.lower() not in valid_types:
-            raise ValueError(f'Farmer type must be one of: {valid_types}')
+        if v.lower() not in VALID_FARMER_TYPES:
+            raise ValueError(f'Farmer type must be one of: {VALID_FARMER_TYPES}')
         return v.lower()
 
     @validator('irrigation_system')
     def validate_irrigation_system(cls, v):
-        valid_systems = ['flood', 'sprinkler', 'drip', 'furrow']
-        if v.lower() not in valid_systems:
-            raise ValueError(f'Irrigation system must be one of: {valid_systems}')
+        if v.lower() not in VALID_IRRIGATION_SYSTEMS:
+            raise ValueError(f'Irrigation system must be one of: {VALID_IRRIGATION_SYSTEMS}')
         return v.lower()
 
     class Config:
@@ -94,6 +98,7 @@ class FertilizerPrediction(BaseModel):
     p_fertilizer: float = Field(..., description="Phosphorus fertilizer (kg/ha)")
     k_fertilizer: float = Field(..., description="Potassium fertilizer (kg/ha)")
     confidence: Optional[float] = Field(None, description="Prediction confidence")
+    degraded: bool = Field(False, description="Approximate answer from the rules table, not the models")
 
 
 class IrrigationPrediction(BaseModel):
@@ -101,6 +106,7 @@ class IrrigationPrediction(BaseModel):
     irrigation_needed: int = Field(..., description="Irrigation needed (0/1)")
     probability: Optional[float] = Field(None, description="Probability of needing irrigation")
     confidence: Optional[float] = Field(None, description="Prediction confidence")
+    degraded: bool = Field(False, description="Approximate answer from the rules table, not the models")
 
 
 class PestAlertPrediction(BaseModel):
@@ -108,20 +114,100 @@ class PestAlertPrediction(BaseModel):
     pest_alert: int = Field(..., description="Pest alert (0/1)")
     probability: Optional[float] = Field(None, description="Probability of pest occurrence")
     confidence: Optional[float] = Field(None, description="Prediction confidence")
+    degraded: bool = Field(False, description="Approximate answer from the rules table, not the models")
 
 
 class YieldPrediction(BaseModel):
     """Yield prediction response"""
     yield_prediction: float = Field(..., description="Predicted crop yield (tons/ha)")
     confidence: Optional[float] = Field(None, description="Prediction confidence")
+    degraded: bool = Field(False, description="Approximate answer from the rules table, not the models")
 
 
 class AllPredictions(BaseModel):
     """Combined predictions response"""
-    fertilizer: FertilizerPrediction
-    irrigation: IrrigationPrediction
-    pest_alert: PestAlertPrediction
+    fertilizer: Optional[FertilizerPrediction] = None
+    irrigation: Optional[IrrigationPrediction] = None
+    pest_alert: Optional[PestAlertPrediction] = None
     yield_prediction: Optional[YieldPrediction] = None
+    model_status: Dict[str, str] = Field(
+        ..., description="Per-output status: ok, timeout, busy, error, unavailable or degraded"
+    )
+    model_latency_ms: Dict[str, float] = Field(
+        default_factory=dict, description="Per-output model latency (ms) for outputs that finished"
+    )
+    degraded: bool = Field(False, description="Approximate answer from the rules table, not the models")
+
+
+class BatchPredictionInput(BaseModel):
+    """Batch prediction request"""
+    predictions: List[PredictionInput] = Field(
+        ..., min_items=1, max_items=100, description="Inputs to predict for (max 100)"
+    )
+
+
+class BatchPredictionResponse(BaseModel):
+    """Batch prediction response"""
+    predictions: List[AllPredictions] = Field(..., description="Combined predictions in input order")
+    total_predictions: int = Field(..., description="Number of predictions")
+
+
+class SweepInput(BaseModel):
+    """What-if sweep over a grid of input values"""
+    base: PredictionInput = Field(..., description="Input values held fixed")
+    axes: Dict[str, List[Union[float, str]]] = Field(
+        ...,
+        description="Input fields to vary and the values to try; the grid varies the last axis fastest",
+        example={"month": [1, 4, 7, 10], "growth_stage": ["vegetative", "flowering"], "crop": ["rice", "maize"]}
+    )
+
+    @validator('axes')
+    def validate_axes(cls, axes, values):
+        base = values.get('base')
+        if base is None:
+            return axes
+        if not axes:
+            raise ValueError('At least one axis is required')
+        
+        size = 1
+        for name, axis_values in axes.items():
+            if name not in PredictionInput.__fields__:
+                raise ValueError(f'Unknown axis {name}, expected one of: {list(PredictionInput.__fields__)}')
+            if not axis_values:
+                raise ValueError(f'Axis {name} has no values')
+            size *= len(axis_values)
+        if size > settings.sweep_max_points:
+            raise ValueError(f'Sweep grid has {size} points, the limit is {settings.sweep_max_points}')
+        
+        # Apply the PredictionInput rules to every axis value, keeping the normalized values
+        base_values = base.dict()
+        normalized = {}
+        for name, axis_values in axes.items():
+            normalized[name] = []
+            for value in axis_values:
+                try:
+                    point = PredictionInput(**{**base_values, name: value})
+                except ValidationError as e:
+                    raise ValueError(f'Invalid value {value!r} for axis {name}: {e.errors()[0]["msg"]}')
+                normalized[name].append(getattr(point, name))
+        return normalized
+
+
+class SweepAxis(BaseModel):
+    """One varied input of a sweep"""
+    name: str = Field(..., description="Input field")
+    values: List[Any] = Field(..., description="Values along this axis")
+
+
+class SweepResponse(BaseModel):
+    """What-if sweep results as flattened arrays over the grid"""
+    axes: List[SweepAxis] = Field(..., description="Varied inputs in grid order")
+    shape: List[int] = Field(..., description="Grid size along each axis")
+    total_points: int = Field(..., description="Number of grid points scored")
+    outputs: Dict[str, List[Any]] = Field(
+        ..., description="Per-output values for every grid point in row-major order (last axis fastest)"
+    )
+    model_version: Optional[str] = Field(None, description="Version of the models that scored the grid")
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,55 @@
+"""
+Pydantic schemas for farm profiles and profile-based predictions
+"""
+import copy
+from typing import Any, Dict, Tuple
+from pydantic import BaseModel, Field, create_model, validator
+
+from .prediction import PredictionInput
+
+# PredictionInput fields stored with a farm profile; the rest are daily readings
+FARM_FIELDS = ('crop', 'state', 'soil_type', 'variety', 'farmer_type', 'irrigation_system')
+READING_FIELDS = tuple(name for name in PredictionInput.__fields__ if name not in FARM_FIELDS)
+
+
+def _input_fields(names: Tuple[str, ...]) -> Dict[str, Any]:
+    """
+    ``create_model`` arguments for a subset of the ``PredictionInput`` fields
+
+    The fields keep their bounds, descriptions and validators, so profile
+    requests are validated exactly like full prediction inputs.
+    """
+    fields, validators = {}, {}
+    for name in names:
+        field = PredictionInput.__fields__[name]
+        fields[name] = (PredictionInput.__annotations__[name], copy.copy(field.field_info))
+        for validator_name, v in field.class_validators.items():
+            validators[validator_name] = validator(
+                name, pre=v.pre, each_item=v.each_item, always=v.always, allow_reuse=True
+            )(v.func)
+    return {'__validators__': validators, **fields}
+
+
+class FarmProfileInput(create_model('FarmProfileFields', **_input_fields(FARM_FIELDS))):
+    """Static attributes of a farm, registered once"""
+
+
+class FarmProfileResponse(BaseModel):
+    """Registered farm profile"""
+    profile_id: str = Field(..., description="Profile identifier to send with predictions")
+    profile: Dict[str, Any] = Field(..., description="Static farm attributes")
+    created_at: str = Field(..., description="Registration timestamp")
+
+
+class ProfilePredictionInput(create_model('ProfileReadingFields', **_input_fields(READING_FIELDS))):
+    """Daily readings for a registered farm profile"""
+
+    profile_id: str = Field(..., description="Registered farm profile", example="3f2a9c1d5e7b8a60")
+
+    def to_prediction_input(self, profile: Dict[str, Any]) -> PredictionInput:
+        """Full prediction input from the stored profile and these readings"""
+        # Both halves were validated with the PredictionInput fields they are built from
+        return PredictionInput.construct(**profile, **self.dict(exclude={'profile_id'}))
+
+
+PROFILE_FIELDS = list(FarmProfileInput.__fields__)
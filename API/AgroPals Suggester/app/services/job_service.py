@@ -0,0 +1,438 @@
+"""
+File-backed asynchronous batch scoring jobs
+"""
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from ..core.config import settings
+from ..models.ml_models import AgriculturalMLModels
+from ..schemas.prediction import (
+    PredictionInput,
+    VALID_CROPS,
+    VALID_GROWTH_STAGES,
+    VALID_SOIL_TYPES,
+    VALID_FARMER_TYPES,
+    VALID_IRRIGATION_SYSTEMS
+)
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+INPUT_FORMATS = ("csv", "parquet")
+
+# Categorical inputs restricted to a fixed set of values
+CATEGORY_VALUES = {
+    'crop': VALID_CROPS,
+    'growth_stage': VALID_GROWTH_STAGES,
+    'soil_type': VALID_SOIL_TYPES,
+    'farmer_type': VALID_FARMER_TYPES,
+    'irrigation_system': VALID_IRRIGATION_SYSTEMS
+}
+
+
+def validate_input_frame(data: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray, List[str]]:
+    """
+    Apply the ``PredictionInput`` rules to a frame of raw inputs
+
+    Args:
+        data: Frame with the ``PredictionInput`` columns
+
+    Returns:
+        Tuple of (normalized frame, invalid row mask, error message per row,
+        empty for valid rows)
+    """
+    frame = data.reindex(columns=list(PredictionInput.__fields__)).copy()
+    invalid = np.zeros(len(frame), dtype=bool)
+    reasons = [[] for _ in range(len(frame))]
+
+    def reject(mask: np.ndarray, message: str):
+        nonlocal invalid
+        for i in np.flatnonzero(mask):
+            reasons[i].append(message)
+        invalid |= mask
+
+    for name, field in PredictionInput.__fields__.items():
+        if field.outer_type_ is str:
+            missing = frame[name].isna().to_numpy()
+            frame[name] = frame[name].astype(str).str.strip().str.lower()
+            reject(missing, f"{name} is missing")
+            if name in CATEGORY_VALUES:
+                unknown = ~missing & ~frame[name].isin(CATEGORY_VALUES[name]).to_numpy()
+                reject(unknown, f"{name} must be one of: {CATEGORY_VALUES[name]}")
+        else:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce")
+            values = frame[name].to_numpy(dtype=float)
+            missing = np.isnan(values)
+            reject(missing, f"{name} is missing or not a number")
+            low, high = field.field_info.ge, field.field_info.le
+            reject(~missing & ((values < low) | (values > high)), f"{name} must be between {low} and {high}")
+
+    return frame, invalid, ["; ".join(reason) for reason in reasons]
+
+
+class JobStore:
+    """
+    Job state kept on the local filesystem, one directory per job
+
+    Each job directory holds ``job.json`` with the job state, the uploaded
+    ``input.csv`` or ``input.parquet``, the ``results.csv`` written so far,
+    a ``cancel`` marker file once cancellation is requested, and a ``lock``
+    file held by the process running the job. The state file is replaced
+    atomically, so readers never see a partial write.
+    """
+
+    def __init__(self, root: str = None):
+        self.root = Path(root or settings.jobs_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def input_path(self, job: Dict[str, Any]) -> Path:
+        return self.job_dir(job['job_id']) / f"input.{job['input_format']}"
+
+    def results_path(self, job_id: str) -> Path:
+        return self.job_dir(job_id) / "results.csv"
+
+    def create(self, input_format: str) -> Dict[str, Any]:
+        """Create a queued job directory and return its state"""
+        job_id = uuid.uuid4().hex
+        self.job_dir(job_id).mkdir()
+        job = {
+            'job_id': job_id,
+            'status': QUEUED,
+            'input_format': input_format,
+            'total_rows': None,
+            'rows_done': 0,
+            'rows_failed': 0,
+            'output_bytes': 0,
+            'rows_per_second': None,
+            'model_version': None,
+            'error': None,
+            'created_at': datetime.utcnow().isoformat(),
+            'started_at': None,
+            'finished_at': None
+        }
+        self.save(job)
+        return job
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        path = self.job_dir(job_id) / "job.json"
+        # Job ids are generated hex strings; anything else cannot name a job
+        if not job_id.isalnum() or not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def save(self, job: Dict[str, Any]):
+        path = self.job_dir(job['job_id']) / "job.json"
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(job))
+        os.replace(tmp_path, path)
+
+    def list(self) -> List[Dict[str, Any]]:
+        jobs = [self.load(path.name) for path in self.root.iterdir() if path.is_dir()]
+        return sorted((job for job in jobs if job), key=lambda job: job['created_at'])
+
+    def claim(self, job_id: str) -> Optional[IO]:
+        """
+        Take the job's lock, held until the returned file is closed
+
+        The lock is released when its holder exits, so a job left behind by
+        a crashed process can be claimed again. Without ``fcntl`` the lock
+        is not enforced and only one process may run jobs.
+
+        Returns:
+            The open lock file, or None if another live process holds it
+        """
+        lock = open(self.job_dir(job_id) / "lock", 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                return None
+        return lock
+
+    def claimed(self, job_id: str) -> bool:
+        """Whether another live process holds the job's lock"""
+        lock = self.claim(job_id)
+        if lock is None:
+            return True
+        lock.close()
+        return False
+
+    def request_cancel(self, job_id: str):
+        (self.job_dir(job_id) / "cancel").touch()
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return (self.job_dir(job_id) / "cancel").exists()
+
+    def delete(self, job_id: str):
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def read_results(self, job: Dict[str, Any], offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Read a page of results, limited to rows covered by the last checkpoint"""
+        limit = min(limit, job['rows_done'] - offset)
+        if limit <= 0:
+            return []
+
+        page = pd.read_csv(
+            self.results_path(job['job_id']),
+            skiprows=range(1, offset + 1),
+            nrows=limit,
+            dtype={'irrigation_needed': 'Int64', 'pest_alert': 'Int64', 'error': str}
+        )
+        return page.astype(object).where(page.notna(), None).to_dict('records')
+
+
+def _init_worker():
+    """Lower the CPU priority of a job worker process"""
+    for name in ("data_preprocessor", "scripts.data_preprocessor"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    if hasattr(os, "nice"):
+        os.nice(settings.job_nice)
+
+
+def score_job_chunk(models: AgriculturalMLModels, chunk: pd.DataFrame) -> pd.DataFrame:
+    """Validate and score one chunk of job input, keeping invalid rows with an error"""
+    frame, invalid, reasons = validate_input_frame(chunk)
+
+    valid = ~invalid
+    results = models.predict_frame(frame[valid]) if valid.any() else pd.DataFrame(index=frame.index[:0])
+    results = results.reindex(frame.index)
+    results.insert(0, 'row', chunk.index)
+    results['error'] = [reason or None for reason in reasons]
+
+    for name in ('irrigation_needed', 'pest_alert'):
+        if name in results:
+            results[name] = results[name].astype('Int64')
+
+    return results
+
+
+def run_job(root: str, job_id: str) -> str:
+    """
+    Score a job's input in a worker process, checkpointing after every chunk
+
+    The saved models are loaded when the job starts, so jobs pick up
+    retrained models. A job that was interrupted part way through resumes
+    from its last checkpoint. Cancellation is checked between chunks.
+
+    The job is claimed first, so when several API processes resume the
+    same unfinished jobs, only one of them runs each job and the others
+    return at once.
+
+    Returns:
+        Final job status
+    """
+    store = JobStore(root)
+    lock = store.claim(job_id)
+    if lock is None:
+        logger.info(f"Job {job_id} is running in another process")
+        return RUNNING
+
+    with lock:
+        job = store.load(job_id)
+        if job['status'] in FINISHED_STATES:
+            return job['status']
+        return _score_job(store, job)
+
+
+def _score_job(store: JobStore, job: Dict[str, Any]) -> str:
+    """Score a claimed job, saving its state after every chunk and when it ends"""
+    job_id = job['job_id']
+
+    try:
+        if store.cancel_requested(job_id):
+            job.update(status=CANCELLED, finished_at=datetime.utcnow().isoformat())
+            return CANCELLED
+
+        models = AgriculturalMLModels()
+        if not models.load_models():
+            raise RuntimeError("ML models could not be loaded")
+        # Keep batch scoring from taking every core away from interactive requests
+        models.set_threads(settings.job_threads)
+
+        job.update(
+            status=RUNNING,
+            started_at=job['started_at'] or datetime.utcnow().isoformat(),
+            model_version=models.model_version
+        )
+        store.save(job)
+
+        with open(store.results_path(job_id), 'ab') as out:
+            # Drop any partial write after the last checkpoint
+            out.truncate(job['output_bytes'])
+            out.seek(job['output_bytes'])
+
+            start = time.perf_counter()
+            rows_scored = 0
+            chunks = iter_input_chunks(
+                str(store.input_path(job)), settings.job_chunk_size, skip_rows=job['rows_done']
+            )
+            for chunk in chunks:
+                if store.cancel_requested(job_id):
+                    job.update(status=CANCELLED, finished_at=datetime.utcnow().isoformat())
+                    return CANCELLED
+
+                results = score_job_chunk(models, chunk)
+                out.write(results.to_csv(index=False, header=(job['output_bytes'] == 0)).encode())
+                out.flush()
+                os.fsync(out.fileno())
+
+                rows_scored += len(results)
+                job['rows_done'] += len(results)
+                job['rows_failed'] += int(results['error'].notna().sum())
+                job['output_bytes'] = out.tell()
+                job['rows_per_second'] = rows_scored / (time.perf_counter() - start)
+                store.save(job)
+
+        job.update(status=COMPLETED, total_rows=job['rows_done'], finished_at=datetime.utcnow().isoformat())
+        return COMPLETED
+
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        job.update(status=FAILED, error=str(e), finished_at=datetime.utcnow().isoformat())
+        return FAILED
+
+    finally:
+        store.save(job)
+
+
+def count_input_rows(path: Path, input_format: str) -> int:
+    """Count data rows in an uploaded job input without parsing it"""
+    if input_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet input requires pyarrow (pip install pyarrow)")
+        return pq.ParquetFile(path).metadata.num_rows
+
+    lines = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        while block := f.read(1 << 20):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def iter_input_chunks(input_path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV or Parquet file in chunks, indexed by input row number
+
+    Args:
+        input_path: Input ``.csv`` or ``.parquet`` file
+        chunk_size: Rows per chunk
+        skip_rows: Leading data rows to skip, used when resuming
+    """
+    start = skip_rows
+
+    if Path(input_path).suffix == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet input requires pyarrow (pip install pyarrow)")
+
+        seen = 0
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            seen += batch.num_rows
+            if seen <= skip_rows:
+                continue
+            chunk = batch.to_pandas()
+            chunk.index = range(seen - len(chunk), seen)
+            yield chunk
+    else:
+        reader = pd.read_csv(input_path, chunksize=chunk_size, skiprows=range(1, skip_rows + 1))
+        for chunk in reader:
+            chunk.index = range(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+
+
+class JobService:
+    """
+    Runs batch jobs on a bounded pool of worker processes
+
+    Scoring happens in separate, lower-priority processes with a capped
+    thread count, so long jobs do not compete with the API process for the
+    GIL or slow down interactive predictions.
+    """
+
+    def __init__(self):
+        self.store = JobStore()
+        self.pool = None
+        self.futures: Dict[str, Future] = {}
+
+    def start(self):
+        """Start the worker pool and resume jobs left unfinished by a restart"""
+        self.pool = ProcessPoolExecutor(
+            max_workers=settings.job_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        for job in self.store.list():
+            # With several API workers, each resumes the same jobs; run_job lets only one through
+            if job['status'] not in FINISHED_STATES and not self.store.claimed(job['job_id']):
+                logger.info(f"Resuming job {job['job_id']} from row {job['rows_done']}")
+                self.submit(job['job_id'])
+
+    def shutdown(self):
+        """Stop the pool; running jobs resume from their checkpoint on next start"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def submit(self, job_id: str):
+        """Queue a job whose input has been written"""
+        if self.pool is None:
+            raise RuntimeError("Job workers are not running")
+        future = self.pool.submit(run_job, str(self.store.root), job_id)
+        self.futures[job_id] = future
+        future.add_done_callback(lambda _: self.futures.pop(job_id, None))
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued or running job"""
+        self.store.request_cancel(job_id)
+        future = self.futures.get(job_id)
+        if future is not None and future.cancel():
+            # Never started here; another process may still be running it
+            lock = self.store.claim(job_id)
+            if lock is not None:
+                with lock:
+                    job = self.store.load(job_id)
+                    if job['status'] not in FINISHED_STATES:
+                        job.update(status=CANCELLED, finished_at=datetime.utcnow().isoformat())
+                        self.store.save(job)
+        return self.store.load(job_id)
+
+
+# Global job service instance
+job_service = JobService()
@@ -0,0 +1,200 @@
+"""
+Fertilizer dose optimizer on batched yield and fertilizer model evaluation
+"""
+import logging
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..models.ml_models import AgriculturalMLModels, ml_models
+from ..schemas.prediction import PredictionInput, FertilizerPrediction
+from ..schemas.optimizer import FertilizerPlanInput, FertilizerPlan, FertilizerPlanResponse
+
+logger = logging.getLogger(__name__)
+
+NUTRIENTS = ('n', 'p', 'k')
+
+# Stop reasons
+CONVERGED = "converged"
+EVALUATION_BUDGET = "evaluation_budget"
+TIME_BUDGET = "time_budget"
+
+
+class FertilizerOptimizer:
+    """
+    Coarse-to-fine grid search for the cheapest N/P/K doses reaching a target yield
+
+    Applied doses are added to the field's soil nutrient levels, one to one
+    and capped at the valid input range. Every iteration scores a full grid
+    of candidate doses with the yield model in one batch, then narrows the
+    grid to the cells around the best candidate so far: the cheapest one
+    reaching the target or, while none does, the one with the highest
+    yield. The search runs one iteration per ``step`` call so callers can
+    yield to other work between iterations, and stops once the grid
+    spacing reaches the configured resolution or a budget is spent.
+    """
+
+    def __init__(self, request: FertilizerPlanInput, models: AgriculturalMLModels = None):
+        self.request = request
+        self.models = models or ml_models
+        self.input = request.field.dict()
+        self.prices = np.array([request.price_n, request.price_p, request.price_k])
+
+        soil_limits = np.array([PredictionInput.__fields__[f'soil_{n}'].field_info.le for n in NUTRIENTS])
+        soil_levels = np.array([self.input[f'soil_{n}'] for n in NUTRIENTS])
+        self.low = np.zeros(len(NUTRIENTS))
+        self.high = np.minimum([request.max_n, request.max_p, request.max_k], soil_limits - soil_levels)
+        self.high = np.maximum(self.high, 0)
+        self.soil_levels = soil_levels
+        self.upper_limit = self.high.copy()
+
+        self.max_evaluations = min(
+            request.max_evaluations or settings.optimizer_max_evaluations, settings.optimizer_max_evaluations
+        )
+        self.time_budget = min(
+            request.time_budget_ms or settings.optimizer_time_budget_ms, settings.optimizer_time_budget_ms
+        ) / 1000
+
+        self.X = None
+        self.best_doses: Optional[np.ndarray] = None
+        self.best_yield = -np.inf
+        self.seed_doses: Optional[np.ndarray] = None
+        self.seed_yield = None
+        self.baseline_yield = None
+        self.iterations = 0
+        self.evaluations = 0
+        self.stop_reason: Optional[str] = None
+        self.started = time.monotonic()
+
+    @property
+    def done(self) -> bool:
+        return self.stop_reason is not None
+
+    def _evaluate(self, doses: np.ndarray) -> np.ndarray:
+        """Predicted yield for each row of N/P/K doses"""
+        variations = {
+            f'soil_{nutrient}': self.soil_levels[i] + doses[:, i]
+            for i, nutrient in enumerate(NUTRIENTS)
+        }
+        predictions = self.models.predict_variants(self.input, variations, ['yield'], X=self.X)
+        if 'yield' not in predictions:
+            raise RuntimeError("Yield model not loaded")
+        self.evaluations += len(doses)
+        return predictions['yield']
+
+    def _cost(self, doses: np.ndarray) -> np.ndarray:
+        return doses @ self.prices
+
+    def _consider(self, doses: np.ndarray, yields: np.ndarray):
+        """Keep the best of the current best and a batch of evaluated candidates"""
+        target = self.request.target_yield
+        costs = self._cost(doses)
+        feasible = yields >= target
+        if feasible.any():
+            index = np.flatnonzero(feasible)[costs[feasible].argmin()]
+        else:
+            # Highest yield, cheapest among equals
+            index = np.lexsort((costs, -yields))[0]
+
+        candidate, candidate_yield = doses[index], yields[index]
+        if self.best_doses is None:
+            better = True
+        elif (candidate_yield >= target) != (self.best_yield >= target):
+            better = candidate_yield >= target
+        elif candidate_yield >= target:
+            better = costs[index] < self._cost(self.best_doses[None])[0]
+        else:
+            better = candidate_yield > self.best_yield
+        if better:
+            self.best_doses, self.best_yield = candidate, candidate_yield
+
+    def _grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate doses spanning the current search box, within the remaining evaluation budget
+        
+        Returns:
+            Tuple of (candidate doses, one row per candidate; grid spacing per nutrient)
+        """
+        active = self.high > self.low
+        remaining = self.max_evaluations - self.evaluations
+        points = settings.optimizer_grid_points
+        while points > 2 and points ** active.sum() > remaining:
+            points -= 1
+        axes = [
+            np.linspace(self.low[i], self.high[i], points) if active[i] else np.array([self.low[i]])
+            for i in range(len(NUTRIENTS))
+        ]
+        candidates = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, len(NUTRIENTS))
+        return candidates, (self.high - self.low) / (points - 1)
+
+    def step(self):
+        """Run one search iteration"""
+        if self.done:
+            return
+
+        if self.X is None:
+            # Seed with no fertilizer and with the fertilizer models' own recommendation
+            self.X = self.models.preprocess(self.input)
+            recommended = self.models.predict_fertilizer(self.input, self.X)
+            self.seed_doses = np.minimum(
+                [recommended[f'{nutrient}_fertilizer'] for nutrient in NUTRIENTS], self.upper_limit
+            )
+            seeds = np.stack([np.zeros(len(NUTRIENTS)), self.seed_doses])
+            self.baseline_yield, self.seed_yield = self._evaluate(seeds)
+            self._consider(seeds, np.array([self.baseline_yield, self.seed_yield]))
+
+        candidates, spacing = self._grid()
+        if self.evaluations + len(candidates) > self.max_evaluations:
+            self.stop_reason = EVALUATION_BUDGET
+            return
+        self._consider(candidates, self._evaluate(candidates))
+        self.iterations += 1
+
+        # Narrow the box to the grid cells around the best candidate
+        self.low = np.maximum(self.best_doses - spacing, 0)
+        self.high = np.minimum(self.best_doses + spacing, self.upper_limit)
+
+        if (spacing <= settings.optimizer_resolution).all():
+            self.stop_reason = CONVERGED
+        elif time.monotonic() - self.started >= self.time_budget:
+            self.stop_reason = TIME_BUDGET
+        elif self.evaluations >= self.max_evaluations:
+            self.stop_reason = EVALUATION_BUDGET
+
+    def _plan(self, doses: np.ndarray, predicted_yield: float) -> FertilizerPlan:
+        doses = doses.round(1)
+        return FertilizerPlan(
+            n_dose=doses[0],
+            p_dose=doses[1],
+            k_dose=doses[2],
+            cost=round(float(self._cost(doses[None])[0]), 2),
+            predicted_yield=round(float(predicted_yield), 2)
+        )
+
+    def result(self) -> FertilizerPlanResponse:
+        """Best plan found, with the fertilizer still recommended after applying it"""
+        applied = dict(self.input)
+        for i, nutrient in enumerate(NUTRIENTS):
+            applied[f'soil_{nutrient}'] = float(self.soil_levels[i] + self.best_doses[i])
+        remaining = self.models.predict_fertilizer(applied)
+
+        return FertilizerPlanResponse(
+            target_yield=self.request.target_yield,
+            target_reached=bool(self.best_yield >= self.request.target_yield),
+            plan=self._plan(self.best_doses, self.best_yield),
+            recommended_plan=self._plan(self.seed_doses, self.seed_yield),
+            baseline_yield=round(float(self.baseline_yield), 2),
+            remaining_need=FertilizerPrediction(
+                n_fertilizer=remaining['n_fertilizer'],
+                p_fertilizer=remaining['p_fertilizer'],
+                k_fertilizer=remaining['k_fertilizer'],
+                confidence=remaining.get('confidence')
+            ),
+            iterations=self.iterations,
+            evaluations=self.evaluations,
+            elapsed_ms=round((time.monotonic() - self.started) * 1000, 1),
+            stop_reason=self.stop_reason or CONVERGED,
+            model_version=self.models.model_version
+        )
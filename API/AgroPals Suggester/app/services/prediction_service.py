@@ -2,36 +2,166 @@
 Prediction service layer for agricultural ML models
 """
 import logging
-from typing import Dict, Any, Optional
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import settings
 from ..models.ml_models import ml_models
+from ..models.fallback import RuleFallback, MODEL_UNAVAILABLE, OVERLOADED
+from .profile_service import profile_service
 from ..schemas.prediction import (
     PredictionInput, 
     FertilizerPrediction,
     IrrigationPrediction, 
     PestAlertPrediction,
     YieldPrediction,
-    AllPredictions
+    AllPredictions,
+    SweepInput,
+    SweepAxis,
+    SweepResponse
 )
 
 logger = logging.getLogger(__name__)
 
+# Service methods and the section of ``AllPredictions`` each one returns
+DEGRADED_SECTIONS = {
+    'predict_fertilizer': 'fertilizer',
+    'predict_irrigation': 'irrigation',
+    'predict_pest_alert': 'pest_alert',
+    'predict_yield': 'yield_prediction'
+}
+
 
 class PredictionService:
     """Service layer for handling predictions"""
     
     def __init__(self):
         self.models = ml_models
+        self.fallback: Optional[RuleFallback] = None
+    
+    def load_fallback(self) -> bool:
+        """
+        Load the rules table saved with the models
+        
+        Loaded apart from the models, so degraded answers are available
+        when the models fail to load.
+        """
+        path = os.path.join(settings.models_dir, "fallback_rules.json")
+        if not settings.fallback_enabled:
+            return False
+        if not os.path.exists(path):
+            logger.warning(f"No rule fallback at {path} - degraded mode disabled")
+            return False
+        try:
+            self.fallback = RuleFallback.load(path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load rule fallback: {e}")
+            return False
+    
+    def get_fallback_metrics(self) -> Optional[Dict[str, Any]]:
+        """Rules table quality and degraded answers served"""
+        return self.fallback.get_metrics() if self.fallback is not None else None
+    
+    def fallback_reason(self, overloaded: Optional[str]) -> Optional[str]:
+        """
+        Why a request must be answered from the rules table, or None to use the models
+        
+        Args:
+            overloaded: Shed reason set by admission control, if the request was shed
+        """
+        if overloaded is not None:
+            if self.fallback is None:
+                raise RuntimeError("Service overloaded, retry later")
+            return OVERLOADED
+        if not self.models.models_loaded and self.fallback is not None:
+            return MODEL_UNAVAILABLE
+        return None
+    
+    def predict_degraded(self, name: str, input_data: PredictionInput, reason: str) -> Optional[Dict[str, Any]]:
+        """
+        Approximate prediction from the rules table, flagged as ``degraded``
+        
+        Args:
+            name: Name of the service method being answered, e.g. ``predict_irrigation``
+            input_data: Validated input
+            reason: Why the models are not used
+        
+        Returns:
+            The method's response as a dict, or None for yield if the
+            rules table has no yield rule
+        """
+        values = self.fallback.predict(input_data.dict(), reason)
+        
+        sections = {}
+        if {'n_fertilizer', 'p_fertilizer', 'k_fertilizer'} <= values.keys():
+            sections['fertilizer'] = FertilizerPrediction(
+                n_fertilizer=values['n_fertilizer'],
+                p_fertilizer=values['p_fertilizer'],
+                k_fertilizer=values['k_fertilizer'],
+                degraded=True
+            )
+        if 'irrigation_needed' in values:
+            probability = values['irrigation_needed']
+            sections['irrigation'] = IrrigationPrediction(
+                irrigation_needed=int(probability >= 0.5),
+                probability=probability,
+                confidence=max(probability, 1 - probability),
+                degraded=True
+            )
+        if 'pest_alert' in values:
+            probability = values['pest_alert']
+            sections['pest_alert'] = PestAlertPrediction(
+                pest_alert=int(probability >= 0.5),
+                probability=probability,
+                confidence=max(probability, 1 - probability),
+                degraded=True
+            )
+        if 'yield' in values:
+            sections['yield_prediction'] = YieldPrediction(yield_prediction=values['yield'], degraded=True)
+        
+        if name == 'predict_all':
+            return AllPredictions(
+                **sections,
+                model_status={
+                    section: 'degraded' if section in sections else 'unavailable'
+                    for section in DEGRADED_SECTIONS.values()
+                },
+                degraded=True
+            ).dict()
+        
+        section = sections.get(DEGRADED_SECTIONS[name])
+        if section is None and name != 'predict_yield':
+            raise RuntimeError(f"No degraded answer for {DEGRADED_SECTIONS[name]}")
+        return section.dict() if section is not None else None
     
     def get_model_status(self) -> Dict[str, Any]:
         """Get status of all ML models"""
         return self.models.get_model_status()
     
+    def get_model_version(self) -> Optional[str]:
+        """Version of the loaded models, from their training fingerprint"""
+        return self.models.model_version
+    
+    def get_cascade_metrics(self) -> Dict[str, Any]:
+        """Classifier cascade calibration and escalation counts"""
+        return self.models.get_cascade_metrics()
+    
+    def _features(self, input_dict: dict, profile_id: Optional[str]):
+        """Preprocessed input for a registered farm profile, or None to preprocess in the model"""
+        if profile_id is None:
+            return None
+        return profile_service.features(profile_id, input_dict)
+    
     def ensure_models_loaded(self):
         """Ensure models are loaded, raise exception if not"""
         if not self.models.models_loaded:
             raise RuntimeError("ML models are not loaded. Please check model training and loading.")
     
-    def predict_fertilizer(self, input_data: PredictionInput) -> FertilizerPrediction:
+    def predict_fertilizer(self, input_data: PredictionInput, profile_id: str = None) -> FertilizerPrediction:
         """Predict fertilizer requirements"""
         self.ensure_models_loaded()
         
@@ -40,7 +170,7 @@ class PredictionService:
             input_dict = input_data.dict()
             
             # Make prediction
-            result = self.models.predict_fertilizer(input_dict)
+            result = self.models.predict_fertilizer(input_dict, self._features(input_dict, profile_id))
             
             return FertilizerPrediction(
                 n_fertilizer=result['n_fertilizer'],
@@ -53,7 +183,7 @@ class PredictionService:
             logger.error(f"Error in fertilizer prediction: {e}")
             raise RuntimeError(f"Fertilizer prediction failed: {str(e)}")
     
-    def predict_irrigation(self, input_data: PredictionInput) -> IrrigationPrediction:
+    def predict_irrigation(self, input_data: PredictionInput, profile_id: str = None) -> IrrigationPrediction:
         """Predict irrigation need"""
         self.ensure_models_loaded()
         
@@ -62,7 +192,7 @@ class PredictionService:
             input_dict = input_data.dict()
             
             # Make prediction
-            result = self.models.predict_irrigation(input_dict)
+            result = self.models.predict_irrigation(input_dict, self._features(input_dict, profile_id))
             
             return IrrigationPrediction(
                 irrigation_needed=result['irrigation_needed'],
@@ -74,7 +204,7 @@ class PredictionService:
             logger.error(f"Error in irrigation prediction: {e}")
             raise RuntimeError(f"Irrigation prediction failed: {str(e)}")
     
-    def predict_pest_alert(self, input_data: PredictionInput) -> PestAlertPrediction:
+    def predict_pest_alert(self, input_data: PredictionInput, profile_id: str = None) -> PestAlertPrediction:
         """Predict pest alert"""
         self.ensure_models_loaded()
         
@@ -83,7 +213,7 @@ class PredictionService:
             input_dict = input_data.dict()
             
             # Make prediction
-            result = self.models.predict_pest_alert(input_dict)
+            result = self.models.predict_pest_alert(input_dict, self._features(input_dict, profile_id))
             
             return PestAlertPrediction(
                 pest_alert=result['pest_alert'],
@@ -95,7 +225,7 @@ class PredictionService:
             logger.error(f"Error in pest alert prediction: {e}")
             raise RuntimeError(f"Pest alert prediction failed: {str(e)}")
     
-    def predict_yield(self, input_data: PredictionInput) -> Optional[YieldPrediction]:
+    def predict_yield(self, input_data: PredictionInput, profile_id: str = None) -> Optional[YieldPrediction]:
         """Predict crop yield (optional model)"""
         self.ensure_models_loaded()
         
@@ -104,7 +234,7 @@ class PredictionService:
             input_dict = input_data.dict()
             
             # Make prediction
-            result = self.models.predict_yield(input_dict)
+            result = self.models.predict_yield(input_dict, self._features(input_dict, profile_id))
             
             if result is None:
                 return None
@@ -118,28 +248,88 @@ class PredictionService:
             logger.error(f"Error in yield prediction: {e}")
             return None
     
-    def predict_all(self, input_data: PredictionInput) -> AllPredictions:
-        """Make all predictions at once"""
+    def predict_all(
+        self,
+        input_data: PredictionInput,
+        deadline: float = None,
+        profile_id: str = None
+    ) -> AllPredictions:
+        """
+        Make all predictions at once
+        
+        Returns the predictions that finished before the deadline, with each
+        output's status in ``model_status``.
+        """
         self.ensure_models_loaded()
         
         try:
-            # Get individual predictions
-            fertilizer = self.predict_fertilizer(input_data)
-            irrigation = self.predict_irrigation(input_data)
-            pest_alert = self.predict_pest_alert(input_data)
-            yield_pred = self.predict_yield(input_data)
-            
-            return AllPredictions(
-                fertilizer=fertilizer,
-                irrigation=irrigation,
-                pest_alert=pest_alert,
-                yield_prediction=yield_pred
+            input_dict = input_data.dict()
+            result = self.models.predict_all(
+                input_dict, deadline=deadline, X=self._features(input_dict, profile_id)
             )
-            
         except Exception as e:
             logger.error(f"Error in combined predictions: {e}")
             raise RuntimeError(f"Combined prediction failed: {str(e)}")
+        
+        if 'ok' not in result['model_status'].values():
+            raise RuntimeError(f"No prediction finished in time: {result['model_status']}")
+        
+        sections = {
+            'fertilizer': FertilizerPrediction,
+            'irrigation': IrrigationPrediction,
+            'pest_alert': PestAlertPrediction,
+            'yield_prediction': YieldPrediction
+        }
+        return AllPredictions(
+            **{name: schema(**result[name]) for name, schema in sections.items() if name in result},
+            model_status=result['model_status'],
+            model_latency_ms=result['model_latency_ms']
+        )
+    
+    def predict_batch(self, inputs: List[PredictionInput]) -> List[AllPredictions]:
+        """Make all predictions for each input"""
+        return [self.predict_all(input_data) for input_data in inputs]
 
+    
+    def sweep_slices(self, sweep: SweepInput) -> List[pd.DataFrame]:
+        """
+        Build the sweep grid as input frames of at most ``sweep_slice_rows`` rows
+        
+        Grid points are in row-major order over the axes, so the last axis
+        varies fastest.
+        """
+        names = list(sweep.axes)
+        shape = [len(values) for values in sweep.axes.values()]
+        index = np.indices(shape).reshape(len(shape), -1)
+        total = index.shape[1]
+        
+        base = sweep.base.dict()
+        columns = {}
+        for name in PredictionInput.__fields__:
+            if name in sweep.axes:
+                columns[name] = np.asarray(sweep.axes[name])[index[names.index(name)]]
+            else:
+                columns[name] = np.full(total, base[name])
+        grid = pd.DataFrame(columns)
+        
+        step = settings.sweep_slice_rows
+        return [grid.iloc[start:start + step] for start in range(0, total, step)]
+    
+    def predict_frames(self, frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """Score input frames with every loaded model"""
+        self.ensure_models_loaded()
+        return [self.models.predict_frame(frame) for frame in frames]
+    
+    def sweep_response(self, sweep: SweepInput, results: List[pd.DataFrame]) -> SweepResponse:
+        """Assemble scored sweep slices into flattened per-output arrays"""
+        scored = pd.concat(results)
+        return SweepResponse(
+            axes=[SweepAxis(name=name, values=values) for name, values in sweep.axes.items()],
+            shape=[len(values) for values in sweep.axes.values()],
+            total_points=len(scored),
+            outputs={name: scored[name].tolist() for name in scored.columns},
+            model_version=self.get_model_version()
+        )
 
 # Global service instance
 prediction_service = PredictionService()
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Farm profiles holding the static half of prediction inputs
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from ..core.config import settings
+from ..models.ml_models import ml_models
+from ..schemas.profiles import FarmProfileInput, PROFILE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+
+class FarmProfileStore:
+    """
+    Farm profiles kept in a SQLite file shared by all workers
+
+    Profile ids are derived from the profile contents, so registering the
+    same farm twice returns the same id on any worker, and a stored profile
+    never changes.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = Path(path or settings.profiles_path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection opened once per process"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "profile_id TEXT PRIMARY KEY, profile TEXT NOT NULL, created_at TEXT NOT NULL)"
+            )
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_id(profile: Dict[str, Any]) -> str:
+        normalized = json.dumps(profile, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+    def add(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a profile unless it exists, and return its record"""
+        profile_id = self.make_id(profile)
+        with self.lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR IGNORE INTO profiles (profile_id, profile, created_at) VALUES (?, ?, ?)",
+                (profile_id, json.dumps(profile), datetime.utcnow().isoformat())
+            )
+        return self.get(profile_id)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self._connection().execute(
+                "SELECT profile, created_at FROM profiles WHERE profile_id = ?", (profile_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'profile_id': profile_id, 'profile': json.loads(row[0]), 'created_at': row[1]}
+
+
+class ProfileService:
+    """
+    Registers farm profiles and keeps their categorical encodings
+
+    Profiles and their label-encoded static columns are held in memory
+    once used, so a prediction for a known farm only encodes and scales
+    its daily readings. Encodings are tied to the model version and are
+    recomputed after the models are retrained.
+    """
+
+    def __init__(self, store: FarmProfileStore = None):
+        self.store = store or FarmProfileStore()
+        self.models = ml_models
+        self.max_entries = settings.profile_cache_entries
+        self.profiles: OrderedDict = OrderedDict()
+        self.encodings: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _remember(self, cache: OrderedDict, key: str, value: Any):
+        with self.lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+
+    def register(self, profile: FarmProfileInput) -> Dict[str, Any]:
+        """Register a farm profile, returning the existing record for a known farm"""
+        record = self.store.add(profile.dict())
+        self._remember(self.profiles, record['profile_id'], record['profile'])
+        return record
+
+    def get_record(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(profile_id)
+
+    def get_profile(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        """Static attributes of a registered profile, or None if unknown"""
+        profile = self.profiles.get(profile_id)
+        if profile is None:
+            record = self.store.get(profile_id)
+            if record is None:
+                return None
+            profile = record['profile']
+            self._remember(self.profiles, profile_id, profile)
+        return profile
+
+    def features(self, profile_id: str, input_data: dict) -> pd.DataFrame:
+        """Preprocessed model input, reusing the profile's encoded static columns"""
+        version = self.models.model_version
+        cached = self.encodings.get(profile_id)
+        if cached is None or cached[0] != version:
+            static = {name: input_data[name] for name in PROFILE_FIELDS}
+            cached = (version, self.models.encode_static(static))
+            self._remember(self.encodings, profile_id, cached)
+        return self.models.preprocess_with_static(input_data, cached[1])
+
+
+# Global profile service instance
+profile_service = ProfileService()
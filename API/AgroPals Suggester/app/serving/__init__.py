@@ -0,0 +1,11 @@
+"""
+Serving components shared by the prediction APIs
+
+Admission control, the inference scheduler, request coalescing, the result
+cache, response encoding and compression, columnar bodies and the cascade
+statistics hold no service configuration; each service builds its
+instances from its own settings. The services are built from their own
+directories, so each keeps a copy of this package, written by
+``API/sync_serving.py``. Edit the package in ``API/serving`` and re-run the
+script; ``--check`` fails if a copy differs.
+"""
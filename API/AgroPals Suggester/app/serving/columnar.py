@@ -0,0 +1,131 @@
+"""
+Columnar binary bodies for bulk scoring
+
+Layout, with every integer and value little-endian:
+
+    4 bytes    magic ``b"COL1"``
+    4 bytes    uint32 length ``H`` of the header
+    H bytes    UTF-8 JSON header
+    padding    zero bytes up to the next multiple of 8
+    columns    each column's values in header order, each followed by zero
+               padding up to the next multiple of 8 bytes
+
+The header is ``{"rows": n, "columns": [{"name": ..., "dtype": ...}, ...]}``
+with ``dtype`` one of ``<f4``, ``<f8``, ``<i4`` or ``|u1``. A column with a
+``categories`` list holds ``<i4`` codes into it, -1 for a missing value.
+Columns start on 8-byte boundaries, so a reader maps each one onto an
+array without copying it.
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+MEDIA_TYPE = "application/x-columnar"
+MAGIC = b"COL1"
+DTYPES = ("<f4", "<f8", "<i4", "|u1")
+ALIGNMENT = 8
+
+Column = Union[np.ndarray, Tuple[np.ndarray, List[str]]]
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % ALIGNMENT)
+
+
+def encode(columns: Dict[str, Column]) -> bytes:
+    """
+    Encode equal-length columns as a columnar body
+
+    Args:
+        columns: Values by column name; a ``(codes, categories)`` pair is a
+            dictionary-coded string column. Booleans are sent as ``|u1``
+            and other values must have one of the supported dtypes.
+
+    Returns:
+        Body bytes
+    """
+    specs, arrays = [], []
+    for name, values in columns.items():
+        spec = {'name': name}
+        if isinstance(values, tuple):
+            values, categories = values
+            spec['categories'] = [str(category) for category in categories]
+            values = np.asarray(values).astype('<i4', copy=False)
+        else:
+            values = np.asarray(values)
+            values = values.astype('|u1' if values.dtype == bool else values.dtype.newbyteorder('<'), copy=False)
+        spec['dtype'] = values.dtype.str
+        if spec['dtype'] not in DTYPES:
+            raise ValueError(f"Column {name} has unsupported dtype {values.dtype}, expected one of {DTYPES}")
+        specs.append(spec)
+        arrays.append(values)
+
+    rows = {len(values) for values in arrays}
+    if len(rows) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(rows)}")
+
+    header = json.dumps({'rows': rows.pop() if rows else 0, 'columns': specs}, separators=(',', ':')).encode('utf-8')
+    parts = [MAGIC, struct.pack('<I', len(header)), header, _padding(len(MAGIC) + 4 + len(header))]
+    for values in arrays:
+        parts += [values.tobytes(), _padding(values.nbytes)]
+    return b"".join(parts)
+
+
+def decode(body: bytes, max_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Decode a columnar body
+
+    Numeric columns are read-only arrays over ``body``; dictionary-coded
+    columns are returned as ``pd.Categorical`` over their codes.
+
+    Args:
+        body: Body bytes
+        max_rows: Largest accepted row count
+
+    Returns:
+        Column values by name, in header order
+
+    Raises:
+        ValueError: If the body is malformed or has more than ``max_rows`` rows
+    """
+    if len(body) < 8 or body[:4] != MAGIC:
+        raise ValueError(f"Body does not start with {MAGIC!r}")
+    (header_length,) = struct.unpack_from('<I', body, 4)
+    try:
+        header = json.loads(body[8:8 + header_length])
+        rows, specs = int(header['rows']), header['columns']
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid header: {e}")
+    if rows < 0 or (max_rows is not None and rows > max_rows):
+        raise ValueError(f"Row count must be between 0 and {max_rows}, got {rows}")
+
+    offset = 8 + header_length
+    offset += -offset % ALIGNMENT
+    columns = {}
+    for spec in specs:
+        name, dtype = spec.get('name'), spec.get('dtype')
+        if not isinstance(name, str) or name in columns:
+            raise ValueError(f"Invalid or duplicate column name: {name!r}")
+        if dtype not in DTYPES or ('categories' in spec and dtype != '<i4'):
+            raise ValueError(f"Column {name} has unsupported dtype {dtype!r}")
+        size = np.dtype(dtype).itemsize * rows
+        if offset + size > len(body):
+            raise ValueError(f"Body ends inside column {name}")
+
+        values = np.frombuffer(body, dtype=dtype, count=rows, offset=offset)
+        if 'categories' in spec:
+            values = pd.Categorical.from_codes(values, categories=spec['categories'])
+        columns[name] = values
+        offset += size + (-size % ALIGNMENT)
+
+    if offset != len(body):
+        raise ValueError(f"Body has {len(body) - offset} bytes after its last column")
+    return columns
+
+
+def decode_frame(body: bytes, max_rows: Optional[int] = None) -> pd.DataFrame:
+    """Decode a columnar body into a DataFrame over its columns"""
+    return pd.DataFrame(decode(body, max_rows), copy=False)
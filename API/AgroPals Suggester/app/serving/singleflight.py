@@ -0,0 +1,70 @@
+"""
+Coalescing of identical in-flight prediction requests
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time and shares its result
+
+    Requests that arrive while an identical computation is in flight wait
+    for that computation instead of starting their own. Unlike a result
+    cache nothing is kept once the computation finishes, so it also covers
+    the burst of identical first requests that would all miss a cache.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.computations = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(namespace: str, payload: Dict[str, Any], model_version: Optional[str], *extra: Any) -> str:
+        """Key from the endpoint, the validated input and the model version"""
+        normalized = json.dumps(
+            [namespace, payload, model_version, extra], sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result of ``compute()``, sharing it with identical concurrent calls
+
+        The computation runs in its own task, so a caller that disconnects
+        does not cancel it for the others waiting on the same key.
+        """
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.computations += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception retrieved when every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Computations run and computations saved by coalescing"""
+        calls = self.computations + self.coalesced
+        return {
+            'calls': calls,
+            'computations': self.computations,
+            'saved_computations': self.coalesced,
+            'saved_ratio': round(self.coalesced / calls, 4) if calls else 0.0,
+            'in_flight': len(self.in_flight)
+        }
+
+
+# Global singleflight instance for the prediction endpoints
+singleflight = SingleFlight()
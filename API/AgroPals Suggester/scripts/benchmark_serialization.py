@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of combined prediction response serialization
+"""
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.serving.responses import FastJSONResponse, orjson
+from app.schemas.prediction import AllPredictions
+
+MODELS = ('fertilizer', 'irrigation', 'pest_alert', 'yield_prediction')
+
+
+def make_predictions(n: int, seed: int = 42) -> List[AllPredictions]:
+    """Combined predictions shaped like PredictionService.predict_all output"""
+    rng = np.random.default_rng(seed)
+    predictions = []
+    for _ in range(n):
+        npk = rng.uniform(0, 200, 3).round(2).tolist()
+        probability = float(rng.uniform())
+        predictions.append(AllPredictions(
+            fertilizer={'n_fertilizer': npk[0], 'p_fertilizer': npk[1], 'k_fertilizer': npk[2]},
+            irrigation={'irrigation_needed': int(probability > 0.5), 'probability': probability},
+            pest_alert={'pest_alert': int(probability > 0.7), 'probability': probability},
+            yield_prediction={'yield_prediction': round(float(rng.uniform(1, 8)), 2)},
+            model_status={name: 'ok' for name in MODELS},
+            model_latency_ms={name: round(float(rng.uniform(1, 20)), 2) for name in MODELS}
+        ))
+    return predictions
+
+
+def time_stage(stage: Callable, repeats: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        stage()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def run_benchmark(batch_size: int, repeats: int) -> Dict[str, float]:
+    """
+    Time each stage of a /predict/batch response
+
+    The validated path converts the predictions to plain data through a
+    JSON round trip, then FastAPI re-validates them against the response
+    model, runs ``jsonable_encoder`` and encodes the result with the json
+    module. The fast path converts them with ``.dict()`` and encodes once.
+    """
+    predictions = make_predictions(batch_size)
+    content = {'predictions': [p.dict() for p in predictions], 'total_predictions': batch_size}
+    validated = [AllPredictions.validate(item) for item in content['predictions']]
+    serialized = jsonable_encoder({'predictions': validated, 'total_predictions': batch_size})
+
+    stages = {
+        'json_round_trip': lambda: [json.loads(p.json()) for p in predictions],
+        'revalidate': lambda: [AllPredictions.validate(item) for item in content['predictions']],
+        'serialize': lambda: jsonable_encoder({'predictions': validated, 'total_predictions': batch_size}),
+        'json_encode': lambda: JSONResponse(serialized).body,
+        'to_dict': lambda: [p.dict() for p in predictions],
+        'fast_encode': lambda: FastJSONResponse(content).body
+    }
+    timings = {name: time_stage(stage, repeats) for name, stage in stages.items()}
+    timings['validated_total'] = sum(
+        timings[name] for name in ('json_round_trip', 'revalidate', 'serialize', 'json_encode')
+    )
+    timings['fast_total'] = timings['to_dict'] + timings['fast_encode']
+    timings['bytes'] = len(FastJSONResponse(content).body)
+    return timings
+
+
+def main():
+    """Run the benchmark for each requested batch size"""
+    parser = argparse.ArgumentParser(description="Benchmark combined prediction response serialization stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100], help="Predictions per response (default: 1 100)")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed calls per stage (default: 200)")
+    args = parser.parse_args()
+
+    print(f"Fast encoder: {'orjson ' + orjson.__version__ if orjson is not None else 'json (orjson not installed)'}")
+    columns = [
+        'json_round_trip', 'revalidate', 'serialize', 'json_encode', 'validated_total',
+        'to_dict', 'fast_encode', 'fast_total'
+    ]
+    print(f"{'rows':>6} " + " ".join(f"{name:>15}" for name in columns) + f" {'bytes':>8}")
+    for batch_size in args.sizes:
+        timings = run_benchmark(batch_size, args.repeats)
+        print(f"{batch_size:>6} " + " ".join(f"{timings[name]:>13.1f}us" for name in columns) + f" {timings['bytes']:>8,}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
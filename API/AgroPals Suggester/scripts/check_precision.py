@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Check that float32 inference matches float64 inference on the training data
+"""
+import os
+import sys
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIERS = ('irrigation_needed', 'pest_alert')
+
+
+def model_outputs(models, X: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Unrounded output of every loaded model: probabilities for classifiers, values for regressors"""
+    return {
+        name: model.predict_proba(X) if name in CLASSIFIERS else model.predict(X)
+        for name, model in models.models.items()
+    }
+
+
+def precision_parity(models, data: pd.DataFrame, tolerance: float) -> Dict[str, Any]:
+    """
+    Compare float32 and float64 inference on every row of ``data``
+
+    Args:
+        models: Loaded ``AgriculturalMLModels``
+        data: Rows with the ``PredictionInput`` columns
+        tolerance: Largest accepted absolute difference of a probability or
+            regression output
+
+    Returns:
+        Report with label mismatches and the largest difference per model,
+        the feature size and scoring time in each precision, and ``passed``
+    """
+    features = models.preprocessor.transform_frame(data)
+    report = {'rows': len(data), 'tolerance': tolerance, 'models': {}}
+
+    outputs = {}
+    for dtype in ('float64', 'float32'):
+        X = models.model_input(features, dtype)
+        start = time.perf_counter()
+        outputs[dtype] = model_outputs(models, X)
+        report[f'{dtype}_seconds'] = time.perf_counter() - start
+        report[f'{dtype}_feature_mb'] = X.memory_usage(index=False).sum() / 2 ** 20
+
+    passed = True
+    for name, output64 in outputs['float64'].items():
+        output32 = outputs['float32'][name]
+        difference = float(np.abs(output64.astype(np.float64) - output32.astype(np.float64)).max())
+        result = {'max_difference': difference}
+        if name in CLASSIFIERS:
+            result['label_mismatches'] = int((output64.argmax(axis=1) != output32.argmax(axis=1)).sum())
+        result['passed'] = difference <= tolerance and result.get('label_mismatches', 0) == 0
+        passed = passed and result['passed']
+        report['models'][name] = result
+
+    report['passed'] = passed
+    return report
+
+
+def main():
+    """Command line entry point; exits with status 1 if the check fails"""
+    setup_logging()
+
+    parser = argparse.ArgumentParser(description="Check float32 inference against float64 on the training data")
+    parser.add_argument(
+        "--data", default=os.path.join(settings.data_dir, settings.data_file),
+        help="CSV with the PredictionInput columns (default: the training data)"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=settings.float32_tolerance,
+        help="Largest accepted probability or output difference"
+    )
+    args = parser.parse_args()
+
+    from app.models.ml_models import ml_models
+    if not ml_models.load_models():
+        logger.error("ML models could not be loaded")
+        return False
+
+    report = precision_parity(ml_models, pd.read_csv(args.data), args.tolerance)
+    print(json.dumps(report, indent=2))
+    if not report['passed']:
+        logger.error("float32 inference does not match float64 within tolerance")
+    return report['passed']
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -4,7 +4,7 @@ Data preprocessing utilities for agricultural ML models
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder, StandardScaler, RobustScaler
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, StratifiedKFold, KFold
 from typing import Tuple, Dict, Any
 import joblib
 import os
@@ -172,8 +172,12 @@ class AgriculturalDataPreprocessor:
         return X, y
     
     def split_data(self, X: pd.DataFrame, y: Dict[str, pd.Series], 
-                   test_size: float = 0.2) -> Dict[str, Any]:
-        """Split data into train/test sets"""
+                   test_size: float = 0.2, cv_folds: int = 5) -> Dict[str, Any]:
+        """Split data into train/test sets
+        
+        Row indices are drawn once and shared by the features, every target and
+        the cross-validation folds, so all splits line up by construction.
+        """
         splits = {}
         
         # Use the first target for stratification if it's classification
@@ -183,25 +187,53 @@ class AgriculturalDataPreprocessor:
                 stratify_target = y[target_name]
                 break
         
-        # Split features
-        X_train, X_test = train_test_split(
-            X, test_size=test_size, random_state=self.random_state,
+        # Draw train/test row positions once
+        positions = np.arange(len(X))
+        train_idx, test_idx = train_test_split(
+            positions, test_size=test_size, random_state=self.random_state,
             stratify=stratify_target
         )
+        n_train = len(train_idx)
+        
+        # Gather rows once in train-then-test order so every split is a slice
+        order = np.concatenate([train_idx, test_idx])
+        X_ordered = X.take(order)
         
-        splits['X_train'] = X_train
-        splits['X_test'] = X_test
+        splits['X_train'] = X_ordered.iloc[:n_train]
+        splits['X_test'] = X_ordered.iloc[n_train:]
         
-        # Split each target
-        for target_name, target_values in y.items():
-            y_train, y_test = train_test_split(
-                target_values, test_size=test_size, random_state=self.random_state,
-                stratify=stratify_target
+        if y:
+            y_ordered = pd.DataFrame(y).take(order)
+            for target_name in y:
+                splits[f'y_train_{target_name}'] = y_ordered[target_name].iloc[:n_train]
+                splits[f'y_test_{target_name}'] = y_ordered[target_name].iloc[n_train:]
+        
+        # Cross-validation folds over the training rows, shared by all models
+        if stratify_target is not None:
+            fold_splitter = StratifiedKFold(
+                n_splits=cv_folds, shuffle=True, random_state=self.random_state
             )
-            splits[f'y_train_{target_name}'] = y_train
-            splits[f'y_test_{target_name}'] = y_test
+            fold_iter = fold_splitter.split(train_idx, stratify_target.iloc[train_idx])
+        else:
+            fold_splitter = KFold(
+                n_splits=cv_folds, shuffle=True, random_state=self.random_state
+            )
+            fold_iter = fold_splitter.split(train_idx)
+        
+        cv_fold = np.empty(n_train, dtype=np.int8)
+        cv_splits = []
+        for fold, (fold_train, fold_val) in enumerate(fold_iter):
+            cv_fold[fold_val] = fold
+            cv_splits.append((fold_train, fold_val))
+        
+        splits['cv_folds'] = cv_splits
+        splits['split_indices'] = {
+            'train_index': X.index.to_numpy()[train_idx],
+            'test_index': X.index.to_numpy()[test_idx],
+            'cv_fold': cv_fold
+        }
         
-        logger.info(f"Data split - Train: {X_train.shape[0]}, Test: {X_test.shape[0]}")
+        logger.info(f"Data split - Train: {n_train}, Test: {len(test_idx)}, CV folds: {cv_folds}")
         
         return splits
     
@@ -267,6 +299,10 @@ class AgriculturalDataPreprocessor:
         # Convert to DataFrame
         df = pd.DataFrame([input_data])
         
+        return self.transform_frame(df)
+    
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Transform a frame of raw inputs for prediction"""
         # Apply preprocessing (without fitting)
         df_encoded = self.encode_categorical_features(df, fit=False)
         df_scaled = self.scale_numerical_features(df_encoded, fit=False)
@@ -277,4 +313,28 @@ class AgriculturalDataPreprocessor:
         else:
             df_final = df_scaled
         
-        return df_final
\ No newline at end of file
+        return df_final
+    
+    def encode_values(self, values: dict) -> Dict[str, int]:
+        """Label-encode single categorical values, -1 for unseen categories"""
+        encoded = {}
+        for col, value in values.items():
+            if col in self.label_encoders:
+                le = self.label_encoders[col]
+                value = str(value)
+                encoded[col] = int(le.transform([value])[0]) if value in le.classes_ else -1
+        return encoded
+    
+    def transform_with_encoded(self, input_data: dict, encoded: Dict[str, int]) -> pd.DataFrame:
+        """Transform a single input whose ``encoded`` categorical columns are already label-encoded"""
+        df = pd.DataFrame([{col: value for col, value in input_data.items() if col not in encoded}])
+        
+        # Only the remaining categorical columns need encoding
+        df_encoded = self.encode_categorical_features(df, fit=False)
+        df_scaled = self.scale_numerical_features(df_encoded, fit=False)
+        for col, value in encoded.items():
+            df_scaled[col] = value
+        
+        if self.feature_columns:
+            return df_scaled[self.feature_columns]
+        return df_scaled
@@ -4,8 +4,10 @@ Setup script for Agricultural ML API
 """
 import os
 import sys
+import re
 import subprocess
 import logging
+from importlib import metadata
 from pathlib import Path
 
 # Add parent directory to path
@@ -106,8 +108,39 @@ def create_gitkeep_files():
             print(f"Created: {gitkeep_file}")
 
 
+def missing_requirements():
+    """
+    Lines of requirements.txt the running interpreter's environment does not satisfy
+
+    Pinned requirements (``name==version``) must be installed at that
+    version; any other requirement only has to be installed.
+    """
+    missing = []
+    with open("requirements.txt") as f:
+        for line in f:
+            requirement = line.split("#", 1)[0].split(";", 1)[0].strip()
+            if not requirement or requirement.startswith("-"):
+                continue
+            name = re.split(r"[\[<>=!~ ]", requirement, 1)[0]
+            pinned = requirement.split("==", 1)[1].strip() if "==" in requirement else None
+            try:
+                installed = metadata.version(name)
+            except metadata.PackageNotFoundError:
+                missing.append(requirement)
+                continue
+            if pinned is not None and installed != pinned:
+                missing.append(requirement)
+    return missing
+
+
 def install_dependencies():
     """Install Python dependencies"""
+    missing = missing_requirements()
+    if not missing:
+        print(f"Dependencies already installed in {sys.prefix}, skipping")
+        return True
+    print(f"Missing or outdated: {', '.join(missing)}")
+    
     try:
         print("Installing dependencies...")
         subprocess.check_call([
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Seeded synthetic agricultural dataset generator for load and scale testing
+"""
+import os
+import sys
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.schemas.prediction import (
+    PredictionInput,
+    VALID_CROPS,
+    VALID_GROWTH_STAGES,
+    VALID_SOIL_TYPES,
+    VALID_FARMER_TYPES,
+    VALID_IRRIGATION_SYSTEMS
+)
+
+logger = logging.getLogger(__name__)
+
+# State -> (temperature offset in °C, rainfall factor)
+STATE_CLIMATE = {
+    'punjab': (-2.0, 0.6), 'haryana': (-1.5, 0.5), 'rajasthan': (2.0, 0.3),
+    'uttar_pradesh': (0.5, 0.9), 'bihar': (0.5, 1.1), 'west_bengal': (0.5, 1.5),
+    'odisha': (1.0, 1.4), 'assam': (-1.0, 2.0), 'madhya_pradesh': (1.0, 1.0),
+    'gujarat': (1.5, 0.6), 'maharashtra': (1.0, 1.0), 'andhra_pradesh': (2.0, 0.9),
+    'tamil_nadu': (2.5, 0.8), 'karnataka': (0.5, 1.1), 'kerala': (1.0, 2.2)
+}
+
+# Crop -> (base yield t/ha, N need, P need, K need in kg/ha, water need 0-1)
+CROP_PROFILES = {
+    'rice': (4.0, 120, 60, 60, 0.9), 'maize': (5.0, 150, 70, 60, 0.6),
+    'chickpea': (1.2, 25, 60, 40, 0.3), 'kidneybeans': (1.5, 30, 60, 50, 0.4),
+    'pigeonpeas': (1.0, 25, 50, 30, 0.3), 'mothbeans': (0.6, 20, 40, 20, 0.2),
+    'mungbean': (0.9, 20, 40, 20, 0.3), 'blackgram': (0.9, 20, 40, 20, 0.3),
+    'lentil': (1.1, 20, 40, 20, 0.3), 'pomegranate': (12.0, 100, 50, 100, 0.5),
+    'banana': (35.0, 200, 60, 300, 0.8), 'mango': (10.0, 100, 50, 100, 0.5),
+    'grapes': (20.0, 120, 80, 150, 0.6), 'watermelon': (25.0, 100, 60, 100, 0.6),
+    'muskmelon': (18.0, 100, 60, 100, 0.6), 'apple': (15.0, 70, 35, 70, 0.5),
+    'orange': (15.0, 120, 60, 120, 0.6), 'papaya': (40.0, 200, 200, 250, 0.7),
+    'coconut': (10.0, 100, 40, 200, 0.7), 'cotton': (2.0, 120, 60, 60, 0.6),
+    'jute': (2.5, 60, 30, 30, 0.8), 'coffee': (1.0, 120, 50, 120, 0.6)
+}
+
+CROP_VARIETIES = {
+    'rice': ['basmati', 'ir64', 'swarna', 'sona_masuri'],
+    'maize': ['hybrid', 'sweet_corn', 'local'],
+    'cotton': ['bt_cotton', 'desi', 'hybrid'],
+    'mango': ['alphonso', 'dasheri', 'langra'],
+    'banana': ['cavendish', 'robusta', 'nendran']
+}
+DEFAULT_VARIETIES = ['local', 'improved', 'hybrid']
+
+# Soil type -> (base pH, water holding moisture offset in %)
+SOIL_PROPERTIES = {
+    'clay': (7.3, 12.0), 'clay_loam': (7.0, 8.0), 'loam': (6.6, 4.0),
+    'silt': (6.8, 6.0), 'sandy_loam': (6.2, -4.0), 'sandy': (5.9, -10.0)
+}
+
+IRRIGATION_MOISTURE = {'flood': 12.0, 'furrow': 8.0, 'sprinkler': 6.0, 'drip': 10.0}
+FARMER_YIELD_FACTOR = {'progressive': 1.15, 'moderate': 1.0, 'conservative': 0.9, 'resource_poor': 0.75}
+STAGE_PEST_RISK = {'germination': -0.5, 'vegetative': 0.2, 'flowering': 0.8, 'harvest': -0.2}
+
+TARGET_COLUMNS = ['n_fertilizer', 'p_fertilizer', 'k_fertilizer', 'irrigation_needed', 'pest_alert', 'yield']
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-x))
+
+
+def _field_bounds(name: str) -> tuple:
+    """Get the (min, max) bounds of a PredictionInput field"""
+    field_info = PredictionInput.__fields__[name].field_info
+    return field_info.ge, field_info.le
+
+
+def generate_chunk(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generate one chunk of rows with every PredictionInput field and all targets
+
+    Args:
+        n_rows: Number of rows to generate
+        rng: Random generator
+
+    Returns:
+        DataFrame in the agricultural_data.csv layout
+    """
+    def choose(levels):
+        levels = np.asarray(levels, dtype=object)
+        return levels, rng.integers(0, len(levels), n_rows)
+
+    crops, crop_idx = choose(VALID_CROPS)
+    stages, stage_idx = choose(VALID_GROWTH_STAGES)
+    states, state_idx = choose(list(STATE_CLIMATE))
+    soils, soil_idx = choose(VALID_SOIL_TYPES)
+    farmers, farmer_idx = choose(VALID_FARMER_TYPES)
+    systems, system_idx = choose(VALID_IRRIGATION_SYSTEMS)
+    month = rng.integers(1, 13, n_rows)
+
+    crop = crops[crop_idx]
+    profile = np.array([CROP_PROFILES[c] for c in VALID_CROPS])[crop_idx]
+    base_yield, n_need, p_need, k_need, water_need = profile.T
+
+    variety = np.empty(n_rows, dtype=object)
+    for c in np.unique(crop):
+        mask = crop == c
+        options = np.asarray(CROP_VARIETIES.get(c, DEFAULT_VARIETIES), dtype=object)
+        variety[mask] = options[rng.integers(0, len(options), mask.sum())]
+
+    # Weather: seasonal temperature, monsoon rainfall, humidity following rain
+    climate = np.array([STATE_CLIMATE[s] for s in STATE_CLIMATE])[state_idx]
+    temp_offset, rain_factor = climate.T
+    temperature = 25 + 8 * np.sin(2 * np.pi * (month - 4) / 12) + temp_offset + rng.normal(0, 3, n_rows)
+    monsoon = (month >= 6) & (month <= 9)
+    rainfall = rng.gamma(2.0, np.where(monsoon, 60.0, 8.0) * rain_factor)
+    humidity = 45 + 0.12 * rainfall - 0.3 * (temperature - 25) + rng.normal(0, 8, n_rows)
+
+    # Soil: pH and moisture follow soil type, moisture follows rain and irrigation
+    soil = np.array([SOIL_PROPERTIES[s] for s in VALID_SOIL_TYPES])[soil_idx]
+    base_ph, water_holding = soil.T
+    irrigation_moisture = np.array([IRRIGATION_MOISTURE[s] for s in VALID_IRRIGATION_SYSTEMS])[system_idx]
+    soil_ph = base_ph + rng.normal(0, 0.6, n_rows)
+    soil_moisture = 25 + 0.15 * rainfall + water_holding + irrigation_moisture + rng.normal(0, 8, n_rows)
+    farmer_factor = np.array([FARMER_YIELD_FACTOR[f] for f in VALID_FARMER_TYPES])[farmer_idx]
+    soil_n = rng.gamma(6.0, 20.0 * farmer_factor)
+    soil_p = rng.gamma(5.0, 8.0 * farmer_factor)
+    soil_k = rng.gamma(6.0, 30.0 * farmer_factor)
+
+    data = pd.DataFrame({
+        'crop': crop,
+        'growth_stage': stages[stage_idx],
+        'soil_ph': soil_ph,
+        'soil_n': soil_n,
+        'soil_p': soil_p,
+        'soil_k': soil_k,
+        'soil_moisture': soil_moisture,
+        'temperature': temperature,
+        'rainfall': rainfall,
+        'humidity': humidity,
+        'state': states[state_idx],
+        'month': month,
+        'soil_type': soils[soil_idx],
+        'variety': variety,
+        'farmer_type': farmers[farmer_idx],
+        'irrigation_system': systems[system_idx]
+    })
+
+    # Keep every row valid for PredictionInput
+    for col in ['soil_ph', 'soil_n', 'soil_p', 'soil_k', 'soil_moisture', 'temperature', 'rainfall', 'humidity']:
+        low, high = _field_bounds(col)
+        data[col] = data[col].clip(low, high).round(2)
+
+    # Targets
+    data['n_fertilizer'] = np.maximum(0, n_need - 0.5 * data['soil_n'] + rng.normal(0, 15, n_rows)).round(1)
+    data['p_fertilizer'] = np.maximum(0, p_need - 0.6 * data['soil_p'] + rng.normal(0, 8, n_rows)).round(1)
+    data['k_fertilizer'] = np.maximum(0, k_need - 0.3 * data['soil_k'] + rng.normal(0, 20, n_rows)).round(1)
+
+    water_deficit = 70 * water_need - data['soil_moisture'] - 0.1 * data['rainfall'] + 0.5 * (data['temperature'] - 25)
+    data['irrigation_needed'] = (rng.random(n_rows) < _sigmoid(0.15 * water_deficit)).astype(int)
+
+    stage_risk = np.array([STAGE_PEST_RISK[s] for s in VALID_GROWTH_STAGES])[stage_idx]
+    pest_score = 0.08 * (data['humidity'] - 70) + 0.1 * (data['temperature'] - 28) + stage_risk
+    data['pest_alert'] = (rng.random(n_rows) < _sigmoid(pest_score)).astype(int)
+
+    nutrient_supply = np.minimum(1.0, (data['soil_n'] + data['soil_p'] + data['soil_k']) / (n_need + p_need + k_need + 1) / 1.5)
+    moisture_fit = 1 - np.minimum(0.5, np.abs(data['soil_moisture'] - 60 * water_need - 20) / 100)
+    data['yield'] = (
+        base_yield * (0.5 + 0.5 * nutrient_supply) * moisture_fit * farmer_factor * rng.normal(1, 0.08, n_rows)
+    ).clip(0).round(2)
+
+    return data
+
+
+def generate_chunks(n_rows: int, chunk_size: int = 100_000, seed: int = 42) -> Iterator[pd.DataFrame]:
+    """
+    Generate a dataset as a stream of chunks
+
+    Args:
+        n_rows: Total number of rows
+        chunk_size: Rows per chunk
+        seed: Random seed; the same seed and chunk size give the same data
+
+    Yields:
+        DataFrame chunks
+    """
+    seeds = np.random.SeedSequence(seed).spawn((n_rows + chunk_size - 1) // chunk_size)
+    for chunk_seed, start in zip(seeds, range(0, n_rows, chunk_size)):
+        yield generate_chunk(min(chunk_size, n_rows - start), np.random.default_rng(chunk_seed))
+
+
+def generate_dataset(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate a dataset in memory"""
+    return pd.concat(generate_chunks(n_rows, seed=seed), ignore_index=True)
+
+
+def write_dataset(chunks: Iterator[pd.DataFrame], output_path: str) -> int:
+    """
+    Stream chunks to a CSV or Parquet file, chosen by file extension
+
+    Args:
+        chunks: DataFrame chunks to write
+        output_path: Destination ``.csv`` or ``.parquet`` file
+
+    Returns:
+        Number of rows written
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+
+    if path.suffix == '.parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                total += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif path.suffix == '.csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            total += len(chunk)
+    else:
+        raise ValueError(f"Unsupported output format: {path.suffix} (use .csv or .parquet)")
+
+    return total
+
+
+def main():
+    """Command line entry point"""
+    logging.basicConfig(level=logging.INFO, format=settings.log_format)
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic agricultural dataset")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows (default: 100000)")
+    parser.add_argument(
+        "--output",
+        default=os.path.join(settings.data_dir, settings.data_file),
+        help="Output .csv or .parquet file (default: the training data file)"
+    )
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows generated per chunk")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total = write_dataset(generate_chunks(args.rows, args.chunk_size, args.seed), args.output)
+    logger.info(f"Wrote {total} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -4,6 +4,7 @@ Training script for Agricultural ML models
 """
 import os
 import sys
+import argparse
 import logging
 from pathlib import Path
 
@@ -12,11 +13,31 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from data_preprocessor import AgriculturalDataPreprocessor
 from app.models.model_trainer import AgriculturalModelTrainer
+from app.models.fallback import RuleFallback
 from app.core.config import settings
+from app.core.fingerprint import training_fingerprint, load_saved_fingerprint
 from app.core.logging import setup_logging
 
 
-def main():
+def get_training_config(preprocessor: AgriculturalDataPreprocessor) -> dict:
+    """Preprocessing and hyperparameter settings that determine the trained artifacts"""
+    return {
+        'random_state': settings.random_state,
+        'test_size': settings.test_size,
+        'cv_folds': settings.cv_folds,
+        'n_estimators': settings.n_estimators,
+        'max_depth': settings.max_depth,
+        'cascade_first_stage_trees': settings.cascade_first_stage_trees,
+        'cascade_target_agreement': settings.cascade_target_agreement,
+        'fallback_bins': settings.fallback_bins,
+        'scaling_method': 'robust',
+        'categorical_columns': preprocessor._get_categorical_columns(),
+        'numerical_columns': preprocessor._get_numerical_columns(),
+        'target_columns': preprocessor.target_columns
+    }
+
+
+def main(force: bool = False):
     """Main training function"""
     # Setup logging
     logger = setup_logging()
@@ -37,6 +58,12 @@ def main():
         logger.info("Initializing data preprocessor...")
         preprocessor = AgriculturalDataPreprocessor(random_state=settings.random_state)
         
+        # Skip training when the saved artifacts were built from identical inputs
+        fingerprint = training_fingerprint(data_file, get_training_config(preprocessor))
+        if not force and load_saved_fingerprint(models_dir) == fingerprint:
+            logger.info(f"Training inputs unchanged (fingerprint {fingerprint[:12]}), reusing saved models")
+            return True
+        
         # Load and validate data
         logger.info("Loading and validating data...")
         df = preprocessor.load_and_validate_data(data_file)
@@ -48,7 +75,9 @@ def main():
         
         # Split data
         logger.info("Splitting data into train/test sets...")
-        data_splits = preprocessor.split_data(X, y, test_size=settings.test_size)
+        data_splits = preprocessor.split_data(
+            X, y, test_size=settings.test_size, cv_folds=settings.cv_folds
+        )
         
         # Save preprocessor
         logger.info("Saving preprocessor...")
@@ -59,7 +88,9 @@ def main():
         trainer = AgriculturalModelTrainer(
             random_state=settings.random_state,
             n_estimators=settings.n_estimators,
-            max_depth=settings.max_depth
+            max_depth=settings.max_depth,
+            cascade_trees=settings.cascade_first_stage_trees,
+            cascade_target_agreement=settings.cascade_target_agreement
         )
         
         # Train all models
@@ -68,7 +99,22 @@ def main():
         
         # Save trained models
         logger.info("Saving trained models...")
-        trainer.save_models(models_dir)
+        trainer.save_models(
+            models_dir,
+            fingerprint=fingerprint,
+            split_indices=data_splits['split_indices']
+        )
+        
+        # Build the degraded-mode rules table from the raw data
+        logger.info("Building rule fallback...")
+        fallback = RuleFallback.build(
+            df,
+            preprocessor._get_numerical_columns(),
+            preprocessor.target_columns,
+            bins=settings.fallback_bins,
+            model_version=fingerprint[:12]
+        )
+        fallback.save(os.path.join(models_dir, "fallback_rules.json"))
         
         # Generate and display training report
         report = trainer.generate_training_report(results)
@@ -93,5 +139,13 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Train Agricultural ML models")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retrain even if the saved models match the current data and config"
+    )
+    args = parser.parse_args()
+    
+    success = main(force=args.force)
     sys.exit(0 if success else 1)
\ No newline at end of file
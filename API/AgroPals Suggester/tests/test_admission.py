@@ -0,0 +1,69 @@
+"""
+Tests for admission control recovering once the load drops
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.serving.admission import AdmissionController, Rejected, QUEUE_WAIT
+from app.serving.scheduler import InferenceScheduler, INTERACTIVE
+
+WINDOW = 0.3
+
+CONFIG = {
+    "enabled": True,
+    "max_in_flight": 4,
+    "max_waiting": 4,
+    "max_wait_seconds": 0.1,
+    "max_queue_depth": 64,
+    "max_queue_wait_ms": 500.0,
+    "queue_wait_window_seconds": WINDOW,
+    "client_share": 0.0
+}
+
+
+def record_waits(scheduler: InferenceScheduler, seconds: float, count: int = 100):
+    """Record interactive queue waits as if calls had just left the queue"""
+    now = time.monotonic()
+    scheduler.stats[INTERACTIVE]['waits'].extend((now, seconds) for _ in range(count))
+
+
+def test_recent_wait_ignores_samples_outside_window():
+    scheduler = InferenceScheduler(workers=1)
+    record_waits(scheduler, 2.0)
+
+    assert scheduler.recent_wait(INTERACTIVE, 95, WINDOW) == pytest.approx(2.0)
+    time.sleep(WINDOW * 2)
+    assert scheduler.recent_wait(INTERACTIVE, 95, WINDOW) == 0.0
+    # Without a window every retained sample still counts, as in /metrics
+    assert scheduler.recent_wait(INTERACTIVE, 95) == pytest.approx(2.0)
+
+
+def test_shedding_stops_after_load_drops():
+    scheduler = InferenceScheduler(workers=1)
+    controller = AdmissionController(scheduler, CONFIG)
+    record_waits(scheduler, 2.0)
+
+    async def attempt() -> bool:
+        try:
+            await controller.acquire("client")
+        except Rejected as e:
+            assert e.reason == QUEUE_WAIT
+            return False
+        controller.release("client")
+        return True
+
+    async def scenario():
+        shed = [await attempt() for _ in range(3)]
+        # Shed requests add no new waits; the old ones age out of the window
+        await asyncio.sleep(WINDOW * 2)
+        admitted = [await attempt() for _ in range(3)]
+        return shed, admitted
+
+    shed, admitted = asyncio.run(scenario())
+
+    assert shed == [False, False, False]
+    assert admitted == [True, True, True]
+    assert controller.shed[QUEUE_WAIT] == 3
+    assert controller.admitted == 3
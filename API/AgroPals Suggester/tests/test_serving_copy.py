@@ -0,0 +1,20 @@
+"""
+Tests that app/serving is an unchanged copy of the shared API/serving package
+"""
+import filecmp
+from pathlib import Path
+
+import pytest
+
+SERVICE_COPY = Path(__file__).resolve().parent.parent / "app" / "serving"
+SHARED = Path(__file__).resolve().parents[2] / "serving"
+
+
+@pytest.mark.skipif(not SHARED.is_dir(), reason="shared serving package is not in this tree")
+def test_serving_copy_matches_shared_package():
+    shared = sorted(path.name for path in SHARED.glob("*.py"))
+    copied = sorted(path.name for path in SERVICE_COPY.glob("*.py"))
+
+    assert copied == shared, "run python API/sync_serving.py"
+    changed = [name for name in shared if not filecmp.cmp(SHARED / name, SERVICE_COPY / name, shallow=False)]
+    assert not changed, f"{changed} differ from API/serving, run python API/sync_serving.py"
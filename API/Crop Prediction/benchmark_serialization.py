@@ -0,0 +1,103 @@
+"""
+Per-stage benchmark of prediction response serialization
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from responses import with_top_k
+from serving.responses import FastJSONResponse, orjson
+from schemas import BatchPredictionResponse, CropPredictionResponse
+from synthetic_data import CROP_PROFILES
+
+
+def make_results(n: int, seed: int = 42) -> List[Dict]:
+    """Prediction results shaped like ModelTrainer.batch_predict output"""
+    rng = np.random.default_rng(seed)
+    crops = list(CROP_PROFILES)
+    results = []
+    for probabilities in rng.dirichlet(np.full(len(crops), 0.1), n):
+        best = int(probabilities.argmax())
+        results.append({
+            'predicted_crop': crops[best],
+            'confidence': float(probabilities[best]),
+            'all_probabilities': dict(zip(crops, probabilities.tolist())),
+            'degraded': False
+        })
+    return results
+
+
+def time_stage(stage: Callable, repeats: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        stage()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def run_benchmark(batch_size: int, repeats: int, top_k: int) -> Dict[str, float]:
+    """
+    Time each stage of a /predict/batch response
+
+    The validated path builds the response objects, then FastAPI dumps
+    them, re-validates the dump against the response model, serializes it
+    and encodes it with the json module. The fast path encodes the result
+    dicts once.
+    """
+    results = make_results(batch_size)
+    content = {'predictions': results, 'total_predictions': len(results)}
+    adapter = TypeAdapter(BatchPredictionResponse)
+
+    response = BatchPredictionResponse(
+        predictions=[CropPredictionResponse(**result) for result in results],
+        total_predictions=len(results)
+    )
+    validated = adapter.validate_python(response.model_dump())
+    serialized = adapter.dump_python(validated, mode="json")
+    top_k_content = {'predictions': [with_top_k(r, top_k) for r in results], 'total_predictions': len(results)}
+
+    stages = {
+        'build_models': lambda: BatchPredictionResponse(
+            predictions=[CropPredictionResponse(**result) for result in results],
+            total_predictions=len(results)
+        ),
+        'revalidate': lambda: adapter.validate_python(response.model_dump()),
+        'serialize': lambda: adapter.dump_python(validated, mode="json"),
+        'json_encode': lambda: JSONResponse(serialized).body,
+        'fast_encode': lambda: FastJSONResponse(content).body,
+        'fast_top_k': lambda: FastJSONResponse(
+            {'predictions': [with_top_k(r, top_k) for r in results], 'total_predictions': len(results)}
+        ).body
+    }
+    timings = {name: time_stage(stage, repeats) for name, stage in stages.items()}
+    timings['validated_total'] = sum(timings[name] for name in ('build_models', 'revalidate', 'serialize', 'json_encode'))
+    timings['full_bytes'] = len(JSONResponse(serialized).body)
+    timings['top_k_bytes'] = len(FastJSONResponse(top_k_content).body)
+    return timings
+
+
+def main():
+    """Run the benchmark for each requested batch size"""
+    parser = argparse.ArgumentParser(description="Benchmark prediction response serialization stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100], help="Predictions per response (default: 1 100)")
+    parser.add_argument("--repeats", type=int, default=200, help="Timed calls per stage (default: 200)")
+    parser.add_argument("--top-k", type=int, default=3, help="Probabilities kept by the top-k stage (default: 3)")
+    args = parser.parse_args()
+
+    print(f"Fast encoder: {'orjson ' + orjson.__version__ if orjson is not None else 'json (orjson not installed)'}")
+    columns = ['build_models', 'revalidate', 'serialize', 'json_encode', 'validated_total', 'fast_encode', 'fast_top_k']
+    print(f"{'rows':>6} " + " ".join(f"{name:>15}" for name in columns) + f" {'bytes':>8} {'top-k bytes':>12}")
+    for batch_size in args.sizes:
+        timings = run_benchmark(batch_size, args.repeats, args.top_k)
+        print(
+            f"{batch_size:>6} " + " ".join(f"{timings[name]:>13.1f}us" for name in columns)
+            + f" {timings['full_bytes']:>8,} {timings['top_k_bytes']:>12,}"
+        )
+
+
+if __name__ == "__main__":
+    main()
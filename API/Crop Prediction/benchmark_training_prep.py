@@ -0,0 +1,71 @@
+"""
+Scaling benchmark for training-time data preparation
+"""
+import argparse
+import time
+import tracemalloc
+import logging
+
+from data_processing import DataProcessor
+from synthetic_data import generate_dataset
+from config import MODEL_CONFIG
+
+
+def run_benchmark(n_rows: int, chunk_size: int = None) -> dict:
+    """Time training preparation and track its peak memory above the input frame"""
+    data = generate_dataset(n_rows)
+    processor = DataProcessor()
+    kwargs = {'chunk_size': chunk_size} if chunk_size else {}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = processor.prepare_training_data(
+        data,
+        test_size=MODEL_CONFIG['test_size'],
+        random_state=MODEL_CONFIG['random_state'],
+        **kwargs
+    )
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'rows': n_rows,
+        'seconds': elapsed,
+        'rows_per_second': n_rows / elapsed,
+        'peak_mb': peak / 2 ** 20,
+        'output_mb': (X_train.nbytes + X_test.nbytes) / 2 ** 20
+    }
+
+
+def main():
+    """Run the benchmark for each requested size"""
+    parser = argparse.ArgumentParser(description="Benchmark training data preparation")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 1_000_000, 10_000_000],
+        help="Row counts to benchmark (default: 10k 1M 10M)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="Rows engineered at a time (default: PROCESSING_CONFIG chunk size)"
+    )
+    args = parser.parse_args()
+
+    logging.getLogger("data_processing").setLevel(logging.WARNING)
+
+    print(f"{'rows':>12} {'seconds':>10} {'rows/s':>14} {'peak MB':>10} {'output MB':>10}")
+    for n_rows in args.sizes:
+        result = run_benchmark(n_rows, args.chunk_size)
+        print(
+            f"{result['rows']:>12,} {result['seconds']:>10.3f} {result['rows_per_second']:>14,.0f} "
+            f"{result['peak_mb']:>10.1f} {result['output_mb']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
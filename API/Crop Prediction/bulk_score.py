@@ -0,0 +1,168 @@
+"""
+Offline multi-process bulk scoring for the crop recommendation model
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from jobs import iter_input_chunks, score_job_chunk
+from model_training import ModelTrainer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Model loaded once per worker process
+_worker_trainer: Optional[ModelTrainer] = None
+
+
+def _init_worker():
+    """Load the model once in each worker process, scoring with one thread"""
+    global _worker_trainer
+    logging.getLogger("data_processing").setLevel(logging.WARNING)
+    _worker_trainer = ModelTrainer()
+    _worker_trainer.load_model()
+    # One worker per core already; model threads on top would oversubscribe them
+    _worker_trainer.model.set_params(n_jobs=1)
+
+
+def score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Validate and score one chunk in a worker process, keeping invalid rows with an error"""
+    return score_job_chunk(_worker_trainer, chunk)
+
+
+class Checkpoint:
+    """Progress file that lets an interrupted run resume where it stopped"""
+
+    def __init__(self, output_path: str):
+        self.path = Path(f"{output_path}.progress")
+
+    def load(self) -> Optional[dict]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text())
+
+    def save(self, state: dict):
+        tmp_path = self.path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+
+def bulk_score(
+    input_path: str,
+    output_path: str,
+    chunk_size: int = 50_000,
+    workers: int = os.cpu_count() or 1,
+    resume: bool = False
+) -> dict:
+    """
+    Score a file with a process pool and write results in input order
+
+    Args:
+        input_path: Input ``.csv`` or ``.parquet`` file with the feature columns
+        output_path: Output CSV file
+        chunk_size: Rows per chunk sent to a worker
+        workers: Number of worker processes
+        resume: Continue a previous interrupted run for the same input
+
+    Returns:
+        Run summary with row counts and throughput
+    """
+    checkpoint = Checkpoint(output_path)
+    state = checkpoint.load() if resume else None
+
+    if state is not None:
+        if state['input'] != str(input_path) or state['chunk_size'] != chunk_size:
+            raise ValueError("Checkpoint was written for a different input or chunk size")
+        logger.info(f"Resuming after {state['rows_done']} rows")
+        # Drop any partial write after the last checkpoint
+        with open(output_path, 'r+b') as f:
+            f.truncate(state['output_bytes'])
+    else:
+        state = {'input': str(input_path), 'chunk_size': chunk_size, 'rows_done': 0, 'output_bytes': 0}
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        open(output_path, 'wb').close()
+
+    start = time.perf_counter()
+    rows_scored = 0
+    rows_failed = 0
+    last_report = start
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+            open(output_path, 'ab') as out:
+        pending = deque()
+        chunks = iter_input_chunks(input_path, chunk_size, skip_rows=state['rows_done'])
+
+        def submit_next() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            pending.append(pool.submit(score_chunk, chunk))
+            return True
+
+        # Keep a bounded number of chunks in flight
+        for _ in range(workers * 2):
+            if not submit_next():
+                break
+
+        while pending:
+            result = pending.popleft().result()
+            submit_next()
+
+            out.write(result.to_csv(index=False, header=(state['output_bytes'] == 0)).encode())
+            out.flush()
+            os.fsync(out.fileno())
+
+            rows_scored += len(result)
+            rows_failed += int(result['error'].notna().sum())
+            state['rows_done'] += len(result)
+            state['output_bytes'] = out.tell()
+            checkpoint.save(state)
+
+            now = time.perf_counter()
+            if now - last_report >= 10:
+                logger.info(f"{state['rows_done']} rows scored, {rows_scored / (now - start):,.0f} rows/s")
+                last_report = now
+
+    elapsed = time.perf_counter() - start
+    checkpoint.clear()
+
+    summary = {
+        'rows_scored': rows_scored,
+        'rows_failed': rows_failed,
+        'total_rows': state['rows_done'],
+        'seconds': elapsed,
+        'rows_per_second': rows_scored / elapsed if elapsed > 0 else 0.0
+    }
+    logger.info(
+        f"Scored {rows_scored} rows in {elapsed:.1f}s "
+        f"({summary['rows_per_second']:,.0f} rows/s, {rows_failed} invalid) -> {output_path}"
+    )
+    return summary
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Bulk score a CSV or Parquet file with the crop model")
+    parser.add_argument("input", help="Input .csv or .parquet file with N, P, K, temperature, humidity, ph, rainfall")
+    parser.add_argument("output", help="Output CSV file")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Rows per chunk (default: 50000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--resume", action="store_true", help="Resume an interrupted run")
+    args = parser.parse_args()
+
+    bulk_score(args.input, args.output, args.chunk_size, args.workers, args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Columnar batch responses of crop predictions
+
+The body format is ``serving.columnar``.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from serving.columnar import Column
+
+
+def prediction_columns(
+    class_names: List[str],
+    probabilities: np.ndarray,
+    degraded: bool,
+    top_k: Optional[int] = None
+) -> Dict[str, Column]:
+    """
+    Columns of a columnar batch response
+
+    Every response has ``predicted_crop``, ``confidence`` and ``degraded``.
+    Without ``top_k`` there is an ``all_probabilities.<crop>`` column per
+    crop; with it, ``top_<i>_crop`` and ``top_<i>_probability`` columns for
+    the ``k`` most likely crops, most likely first.
+
+    Args:
+        class_names: Crop of each probability column
+        probabilities: Array of shape (n, crops)
+        degraded: Whether the rule fallback answered
+        top_k: Number of most likely crops to keep
+
+    Returns:
+        Column values by name, for ``encode``
+    """
+    rows = np.arange(len(probabilities))
+    predicted = probabilities.argmax(axis=1)
+    columns = {
+        'predicted_crop': (predicted, class_names),
+        'confidence': probabilities[rows, predicted].astype('<f4'),
+        'degraded': np.full(len(probabilities), degraded)
+    }
+    if top_k is None:
+        for index, crop in enumerate(class_names):
+            columns[f'all_probabilities.{crop}'] = probabilities[:, index].astype('<f4')
+        return columns
+
+    order = np.argsort(-probabilities, axis=1, kind='stable')[:, :top_k]
+    for rank in range(order.shape[1]):
+        columns[f'top_{rank + 1}_crop'] = (order[:, rank], class_names)
+        columns[f'top_{rank + 1}_probability'] = probabilities[rows, order[:, rank]].astype('<f4')
+    return columns
@@ -8,10 +8,21 @@ from pathlib import Path
 BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "data"
 MODELS_DIR = BASE_DIR / "models"
+JOBS_DIR = Path(os.getenv("JOBS_DIR", BASE_DIR / "jobs"))
+
+# Training data: data/ in the service if it holds a copy, else the repository's dataset
+TRAINING_DATA_PATH = Path(os.getenv("TRAINING_DATA_PATH", next(
+    (
+        path for path in (DATA_DIR / "Crop_recommendation.csv", BASE_DIR.parent.parent / "data" / "Crop_recommendation.csv")
+        if path.exists()
+    ),
+    DATA_DIR / "Crop_recommendation.csv"
+)))
 
 # Create directories if they don't exist
 DATA_DIR.mkdir(exist_ok=True)
 MODELS_DIR.mkdir(exist_ok=True)
+JOBS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Model Setting
 MODEL_CONFIG = {
@@ -23,9 +34,100 @@ MODEL_CONFIG = {
         "n_estimators":100,
         "learning_rate":0.1,
         "max_depth":6
+    },
+    "incremental": {
+        "mode": "continue",      # "continue" boosting or refit on a "window"
+        "n_rounds": 10,          # Extra boosting rounds per continue update
+        "window_size": 5000,     # Most recent rows used by a window refit
+        "holdout_fraction": 0.2  # New rows kept out of a candidate update to evaluate it and calibrate the cascade
     }
 }
 
+# Data processing settings
+PROCESSING_CONFIG = {
+    "chunk_size": int(os.getenv("FEATURE_CHUNK_SIZE", "500000")),   # Rows engineered at a time
+    "inference_dtype": os.getenv("INFERENCE_DTYPE", "float64"),      # float32 engineers and scales features in single precision
+    "float32_tolerance": float(os.getenv("FLOAT32_TOLERANCE", "1e-4"))  # Largest probability difference accepted by precision_parity.py
+}
+
+# Batch and bulk scoring settings
+BATCH_CONFIG = {
+    "stream_chunk_size": int(os.getenv("STREAM_CHUNK_SIZE", "1000")),  # Rows scored per streamed chunk
+    "columnar_max_rows": int(os.getenv("COLUMNAR_MAX_ROWS", "100000")),  # Rows per columnar /predict/batch body
+    "job_workers": int(os.getenv("JOB_WORKERS", "1")),              # Batch jobs running at once
+    "job_chunk_size": int(os.getenv("JOB_CHUNK_SIZE", "50000")),    # Rows scored per job checkpoint
+    "job_threads": int(os.getenv("JOB_THREADS", "1")),              # Model threads per job worker
+    "job_nice": int(os.getenv("JOB_NICE", "10")),                   # CPU priority drop for job workers
+    "job_page_limit": 10000                                         # Maximum rows per results page
+}
+
+# Inference scheduler settings
+SCHEDULER_CONFIG = {
+    "workers": int(os.getenv("SCHEDULER_WORKERS", "1")),         # Inference threads shared by all endpoints
+    "slice_size": int(os.getenv("BATCH_SLICE_SIZE", "16")),      # Batch rows scored between interactive requests
+    "metrics_window": 2048                                       # Recent queue waits kept per priority
+}
+
+# Admission control settings for the prediction routes
+ADMISSION_CONFIG = {
+    "enabled": os.getenv("ADMISSION_ENABLED", "true").lower() == "true",
+    "max_in_flight": int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32")),          # Prediction requests running at once
+    "max_waiting": int(os.getenv("ADMISSION_MAX_WAITING", "64")),              # Requests waiting for a slot
+    "max_wait_seconds": float(os.getenv("ADMISSION_MAX_WAIT", "1.0")),         # Longest wait for a slot
+    "max_queue_depth": int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "256")),     # Inference queue depth that sheds load
+    "max_queue_wait_ms": float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", "500")),  # Interactive p95 queue wait that sheds load
+    "queue_wait_window_seconds": float(os.getenv("ADMISSION_QUEUE_WAIT_WINDOW", "5")),  # Age of the waits that p95 covers
+    "client_share": float(os.getenv("ADMISSION_CLIENT_SHARE", "0"))            # Max fraction of slots per client, 0 disables
+}
+
+# Prediction result cache settings
+CACHE_CONFIG = {
+    "memory_entries": int(os.getenv("CACHE_MEMORY_ENTRIES", "1024")),             # Results kept per worker, 0 disables
+    "shared_enabled": os.getenv("SHARED_CACHE_ENABLED", "false").lower() == "true",  # SQLite tier shared by all workers
+    "shared_path": Path(os.getenv("SHARED_CACHE_PATH", BASE_DIR / "cache" / "predictions.sqlite3")),
+    "shared_max_mb": float(os.getenv("SHARED_CACHE_MAX_MB", "256"))                # Shared tier size before eviction
+}
+
+# Prediction response settings
+RESPONSE_CONFIG = {
+    "fast": os.getenv("FAST_RESPONSES", "true").lower() == "true",  # Encode /predict results once, without re-validation
+    "max_top_k": 22,                                                 # Largest top_k accepted by /predict and /predict/batch
+    "compression": os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",  # gzip/brotli for clients that accept it
+    "compression_min_bytes": int(os.getenv("COMPRESSION_MIN_BYTES", "1024")),  # Smaller bodies are sent as they are
+    "gzip_level": int(os.getenv("GZIP_LEVEL", "6")),
+    "brotli_quality": int(os.getenv("BROTLI_QUALITY", "4"))
+}
+
+# Model cascade settings: a truncated first stage answers confident rows
+CASCADE_CONFIG = {
+    "enabled": os.getenv("CASCADE_ENABLED", "false").lower() == "true",
+    "first_stage_rounds": int(os.getenv("CASCADE_FIRST_STAGE_ROUNDS", "10")),       # Boosting rounds used by the first stage
+    "target_agreement": float(os.getenv("CASCADE_TARGET_AGREEMENT", "0.999"))      # First-stage agreement with the full model on held-out rows
+}
+
+# Rule-based fallback served when the model is unavailable or overloaded
+FALLBACK_CONFIG = {
+    "enabled": os.getenv("FALLBACK_ENABLED", "true").lower() == "true",
+    "when_overloaded": os.getenv("FALLBACK_WHEN_OVERLOADED", "true").lower() == "true",  # Answer shed /predict requests instead of 503
+    "quantiles": (0.1, 0.9)                                                                # Per-crop feature range bounds
+}
+
+# Distilled student model for on-device inference
+DISTILL_CONFIG = {
+    "output_path": Path(os.getenv("STUDENT_MODEL_PATH", MODELS_DIR / "student_model.json")),  # Exported student served at /model/student
+    "max_depth": 12,             # Student tree depth
+    "transfer_rows": 50000,      # Synthetic rows labelled by the teacher, on top of the training data
+    "transfer_seed": 7           # Seed of the synthetic transfer rows
+}
+
+# Nearest historical samples index settings
+NEIGHBORS_CONFIG = {
+    "data_path": Path(os.getenv("NEIGHBORS_DATA_PATH", TRAINING_DATA_PATH)),  # Samples indexed when no saved index matches
+    "leaf_size": int(os.getenv("NEIGHBORS_LEAF_SIZE", "40")),     # KD-tree leaf size
+    "max_k": 100,                                                 # Most neighbors per query
+    "max_queries": 1000                                           # Most queries per request
+}
+
 # API setting
 API_CONFIG = {
     "title": "Crop Recommendation API",
@@ -10,9 +10,15 @@ from sklearn.model_selection import train_test_split
 import joblib
 import logging
 
+from config import PROCESSING_CONFIG
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rainfall level bin edges in mm
+RAINFALL_BINS = np.array([0, 50, 100, 200, 400], dtype=float)
+
+
 class DataProcessor:
     """Handle Data processing and feature engineering"""
     
@@ -22,95 +28,174 @@ class DataProcessor:
         self.feature_columns = [
             'N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall'
         ]
+        self.engineered_columns = [
+            'NPK', 'THI', 'rainfall_level', 'ph_category',
+            'temp_rain_interaction', 'ph_rain_interaction'
+        ]
         self.crop_labels = {}
         
-    def feature_engineer(self, data: pd.DataFrame) -> pd.DataFrame:
+    def engineer_features(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Compute the full feature matrix from raw feature values
+        
+        Args:
+            raw: Array of shape (n, 7) in ``feature_columns`` order
+            
+        Returns:
+            Array of shape (n, 13) with raw then engineered features
+        """
+        n_raw = len(self.feature_columns)
+        out = np.empty((raw.shape[0], n_raw + len(self.engineered_columns)))
+        out[:, :n_raw] = raw
+        
+        col = {name: raw[:, i] for i, name in enumerate(self.feature_columns)}
+        npk, thi, rain_level, ph_cat, temp_rain, ph_rain = (
+            out[:, n_raw + i] for i in range(len(self.engineered_columns))
+        )
+        
+        # create composite features 
+        np.add(col['N'], col['P'], out=npk)
+        npk += col['K']
+        npk /= 3
+        np.multiply(col['temperature'], col['humidity'], out=thi)
+        thi /= 100
+        
+        # Rainfall level categorization: (0, 50], (50, 100], (100, 200], (200, 400]
+        # -> Low, Medium, High, Very High; anything outside is NaN
+        rain_level[:] = np.searchsorted(RAINFALL_BINS, col['rainfall'], side='left') - 1
+        rain_level[(rain_level < 0) | (rain_level >= len(RAINFALL_BINS) - 1)] = np.nan
+        
+        # pH category: Acidic (< 5.5), Neutral (<= 7.5), Alkaline
+        ph_cat[:] = np.where(col['ph'] < 5.5, 0, np.where(col['ph'] <= 7.5, 1, 2))
+        
+        # Interaction features 
+        np.multiply(col['temperature'], col['rainfall'], out=temp_rain)
+        np.multiply(col['ph'], col['rainfall'], out=ph_rain)
+        
+        return out
+    
+    def feature_engineer(self, data: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """ 
         Apply feature engineering to the dataset
         
         Args:
             data: Input DataFrame with raw features
+            inplace: Add the engineered columns to ``data`` instead of a copy
             
         Returns:
             DataFrame with engineered features
         """
         logger.info("Applying feature engineering")
-        data = data.copy()
-        
-        # create composite features 
-        data['NPK'] = (data['N'] + data['P'] + data['K']) / 3
-        data['THI'] = data['temperature'] * data['humidity'] / 100
-        
-        # Rainfall level categorization
-        data['rainfall_level'] = pd.cut(
-            data['rainfall'],
-            bins=[0, 50, 100, 200, 400],
-            labels=[0, 1, 2, 3]  # Low, Medium, High, Very High
-        ).astype(float)
-        
-        # pH category
-        def ph_category(p):
-            if p < 5.5:
-                return 0  # Acidic
-            elif p <= 7.5:
-                return 1  # Neutral
-            else:
-                return 2  # Alkaline
+        if not inplace:
+            data = data.copy()
         
-        data['ph_category'] = data['ph'].apply(ph_category)
+        features = self.engineer_features(data[self.feature_columns].to_numpy(dtype=float))
         
-        # Interaction features 
-        data['temp_rain_interaction'] = data['temperature'] * data['rainfall']
-        data['ph_rain_interaction'] = data['ph'] * data['rainfall']
+        n_raw = len(self.feature_columns)
+        for i, name in enumerate(self.engineered_columns):
+            data[name] = features[:, n_raw + i]
         
         return data
     
+    def build_feature_matrix(
+        self,
+        data: pd.DataFrame,
+        chunk_size: int = PROCESSING_CONFIG['chunk_size'],
+        row_order: np.ndarray = None,
+        scale: bool = False,
+        dtype=np.float64
+    ) -> np.ndarray:
+        """
+        Build the model feature matrix chunk by chunk
+        
+        Only one chunk of raw values and engineered features is held in
+        addition to the output matrix. NaN values are replaced with 0.
+        Each chunk is computed in double precision and rounded once when it
+        is stored, so a ``float32`` matrix holds the same values the model
+        would get by converting a ``float64`` one.
+        
+        Args:
+            data: DataFrame with raw feature columns
+            chunk_size: Number of rows engineered at a time
+            row_order: Optional output position for each input row
+            scale: Scale each chunk with the fitted scaler before storing it
+            dtype: Precision of the output matrix
+            
+        Returns:
+            Feature matrix of shape (n, 13)
+        """
+        n_rows = len(data)
+        X = np.empty((n_rows, len(self.feature_columns) + len(self.engineered_columns)), dtype=dtype)
+        
+        for start in range(0, n_rows, chunk_size):
+            stop = min(start + chunk_size, n_rows)
+            raw = data.iloc[start:stop][self.feature_columns].to_numpy(dtype=float)
+            block = self.engineer_features(raw)
+            block[np.isnan(block)] = 0  # Handle any NaN values
+            if scale:
+                block = self.scaler.transform(block, copy=False)
+            
+            if row_order is None:
+                X[start:stop] = block
+            else:
+                X[row_order[start:stop]] = block
+        
+        return X
+    
     def prepare_training_data(
         self, 
         data: pd.DataFrame, 
         test_size: float = 0.2, 
-        random_state: int = 42
+        random_state: int = 42,
+        chunk_size: int = PROCESSING_CONFIG['chunk_size']
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
         Prepare training and testing datasets
         
+        Features are engineered in chunks and written straight to their
+        train or test position, then scaled in place.
+        
         Args:
             data: Input DataFrame
             test_size: Proportion of test data
             random_state: Random seed
+            chunk_size: Number of rows engineered at a time
             
         Returns:
             Tuple of (X_train, X_test, y_train, y_test)
         """
         logger.info("Preparing training data")
         
-        # Apply feature engineering
-        data_fe = self.feature_engineer(data)
-        
-        # Encode target labels
-        y_encoded = self.label_encoder.fit_transform(data_fe['label'])
+        # Encode target labels; sorted factorization matches LabelEncoder ordering
+        y_encoded, classes = pd.factorize(data['label'], sort=True)
+        self.label_encoder.fit(np.asarray(classes))
         
         # Store crop labels mapping
         self.crop_labels = {
             idx: label for idx, label in enumerate(self.label_encoder.classes_)
         }
         
-        # Prepare features
-        feature_cols = self.feature_columns + [
-            'NPK', 'THI', 'rainfall_level', 'ph_category',
-            'temp_rain_interaction', 'ph_rain_interaction'
-        ]
-        
-        X = data_fe[feature_cols].fillna(0)  # Handle any NaN values
-        
-        # Split the data
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y_encoded, test_size=test_size, random_state=random_state
+        # Split row positions, then place train rows first and test rows after
+        n_rows = len(data)
+        train_idx, test_idx = train_test_split(
+            np.arange(n_rows), test_size=test_size, random_state=random_state
         )
+        n_train = len(train_idx)
+        row_order = np.empty(n_rows, dtype=np.intp)
+        row_order[train_idx] = np.arange(n_train)
+        row_order[test_idx] = np.arange(n_train, n_rows)
+        
+        logger.info("Applying feature engineering")
+        X = self.build_feature_matrix(data, chunk_size=chunk_size, row_order=row_order)
+        X_train, X_test = X[:n_train], X[n_train:]
+        y_train, y_test = y_encoded[train_idx], y_encoded[test_idx]
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        # Fit the scaler chunk by chunk to bound temporaries, then scale in place
+        self.scaler = StandardScaler()
+        for start in range(0, n_train, chunk_size):
+            self.scaler.partial_fit(X_train[start:start + chunk_size])
+        X_train_scaled = self.scaler.transform(X_train, copy=False)
+        X_test_scaled = self.scaler.transform(X_test, copy=False)
         
         return X_train_scaled, X_test_scaled, y_train, y_test
     
@@ -128,21 +213,47 @@ class DataProcessor:
         # Create DataFrame from input
         df = pd.DataFrame([input_data])
         
-        # Apply feature engineering
-        df_fe = self.feature_engineer(df)
+        return self.transform_features(df)
+    
+    def transform_features(self, data: pd.DataFrame, dtype: str = None) -> np.ndarray:
+        """
+        Engineer and scale features with the fitted scaler
         
-        # Select features in correct order
-        feature_cols = self.feature_columns + [
-            'NPK', 'THI', 'rainfall_level', 'ph_category',
-            'temp_rain_interaction', 'ph_rain_interaction'
-        ]
+        The model evaluates its splits in single precision, so a ``float32``
+        matrix gives the same predictions as a ``float64`` one at half the
+        memory and bandwidth.
         
-        X = df_fe[feature_cols].fillna(0)
+        Args:
+            data: DataFrame with raw feature columns
+            dtype: ``float64`` or ``float32`` (default: ``INFERENCE_DTYPE``)
+            
+        Returns:
+            Scaled feature array ready for prediction
+        """
+        return self.build_feature_matrix(
+            data, scale=True, dtype=np.dtype(dtype or PROCESSING_CONFIG['inference_dtype'])
+        )
+    
+    def encode_labels(self, labels: pd.Series) -> np.ndarray:
+        """
+        Encode crop labels with the fitted label mapping
         
-        # Scale features
-        X_scaled = self.scaler.transform(X)
+        Args:
+            labels: Series of crop names
+            
+        Returns:
+            Encoded label array
+            
+        Raises:
+            ValueError: If a label was not seen during training
+        """
+        unseen = sorted(set(labels.unique()) - set(self.label_encoder.classes_))
+        if unseen:
+            raise ValueError(
+                f"Unseen crop labels {unseen}; a full retrain is required to add new crops"
+            )
         
-        return X_scaled
+        return self.label_encoder.transform(labels)
     
     def decode_prediction(self, prediction: int) -> str:
         """
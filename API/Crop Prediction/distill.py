@@ -0,0 +1,281 @@
+"""
+Distill the crop recommendation model into a compact decision tree for on-device inference
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.tree import DecisionTreeClassifier
+
+from model_training import ModelTrainer
+from synthetic_data import generate_dataset
+from config import DISTILL_CONFIG, TRAINING_DATA_PATH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Identifies the exported file format; bump the version on incompatible changes
+ARTIFACT_FORMAT = "crop-recommendation-student-tree"
+ARTIFACT_VERSION = 1
+
+# How a client evaluates the exported tree, shipped inside the artifact
+EVALUATION = (
+    "Start at node 0. While left[node] is not -1, go to left[node] if the "
+    "input value of features[feature[node]] is <= threshold[node], else to "
+    "right[node]. At the leaf, the crop is classes[leaf_class[node]] with "
+    "confidence leaf_confidence[node]."
+)
+
+
+class StudentTree:
+    """
+    Decision tree over the raw input features, stored as flat node arrays
+
+    Node ``i`` is a leaf when ``left[i] == -1``; internal nodes send inputs
+    with ``features[feature[i]] <= threshold[i]`` left. The raw features are
+    used so that a client needs neither the scaler nor the engineered
+    features to evaluate it.
+    """
+
+    def __init__(
+        self,
+        features: List[str],
+        classes: List[str],
+        feature: List[int],
+        threshold: List[float],
+        left: List[int],
+        right: List[int],
+        leaf_class: List[int],
+        leaf_confidence: List[float],
+        model_version: Optional[str] = None
+    ):
+        self.features = list(features)
+        self.classes = list(classes)
+        self.feature = list(feature)
+        self.threshold = list(threshold)
+        self.left = list(left)
+        self.right = list(right)
+        self.leaf_class = list(leaf_class)
+        self.leaf_confidence = list(leaf_confidence)
+        self.model_version = model_version
+
+    @classmethod
+    def from_sklearn(cls, model: DecisionTreeClassifier, features: List[str], model_version: str = None):
+        """Flatten a fitted scikit-learn tree"""
+        tree = model.tree_
+        distribution = tree.value[:, 0, :]
+        distribution = distribution / distribution.sum(axis=1, keepdims=True)
+        is_leaf = tree.children_left == -1
+        return cls(
+            features=features,
+            classes=[str(c) for c in model.classes_],
+            feature=np.where(is_leaf, -1, tree.feature).tolist(),
+            threshold=np.where(is_leaf, 0.0, tree.threshold).tolist(),
+            left=tree.children_left.tolist(),
+            right=tree.children_right.tolist(),
+            leaf_class=np.where(is_leaf, distribution.argmax(axis=1), -1).tolist(),
+            leaf_confidence=np.where(is_leaf, distribution.max(axis=1).round(4), 0.0).tolist(),
+            model_version=model_version
+        )
+
+    @property
+    def node_count(self) -> int:
+        return len(self.left)
+
+    @property
+    def depth(self) -> int:
+        depths = [0] * self.node_count
+        for node in range(self.node_count):
+            if self.left[node] != -1:
+                depths[self.left[node]] = depths[self.right[node]] = depths[node] + 1
+        return max(depths)
+
+    def predict(self, input_data: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Evaluate the tree for one input, as a client would
+
+        Args:
+            input_data: Dictionary with the raw features
+
+        Returns:
+            Dictionary with ``predicted_crop`` and ``confidence``
+        """
+        node = 0
+        while self.left[node] != -1:
+            if input_data[self.features[self.feature[node]]] <= self.threshold[node]:
+                node = self.left[node]
+            else:
+                node = self.right[node]
+        return {
+            'predicted_crop': self.classes[self.leaf_class[node]],
+            'confidence': self.leaf_confidence[node]
+        }
+
+    def predict_frame(self, data: pd.DataFrame) -> np.ndarray:
+        """Vectorized evaluation of the tree for a frame of inputs, returning crop names"""
+        X = data[self.features].to_numpy(dtype=float)
+        feature = np.asarray(self.feature)
+        threshold = np.asarray(self.threshold)
+        left = np.asarray(self.left)
+        right = np.asarray(self.right)
+        rows = np.arange(len(X))
+
+        node = np.zeros(len(X), dtype=int)
+        for _ in range(self.depth):
+            go_left = X[rows, feature[node]] <= threshold[node]
+            node = np.where(left[node] == -1, node, np.where(go_left, left[node], right[node]))
+        return np.asarray(self.classes, dtype=object)[np.asarray(self.leaf_class)[node]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Self-describing artifact for client-side evaluators"""
+        return {
+            'format': ARTIFACT_FORMAT,
+            'format_version': ARTIFACT_VERSION,
+            'model_version': self.model_version,
+            'evaluation': EVALUATION,
+            'features': self.features,
+            'classes': self.classes,
+            'nodes': {
+                'feature': self.feature,
+                'threshold': self.threshold,
+                'left': self.left,
+                'right': self.right,
+                'leaf_class': self.leaf_class,
+                'leaf_confidence': self.leaf_confidence
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, artifact: Dict[str, Any]) -> "StudentTree":
+        if artifact.get('format') != ARTIFACT_FORMAT or artifact.get('format_version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported student artifact: {artifact.get('format')} v{artifact.get('format_version')}")
+        return cls(
+            features=artifact['features'],
+            classes=artifact['classes'],
+            model_version=artifact.get('model_version'),
+            **artifact['nodes']
+        )
+
+    def save(self, filepath, parity: Dict[str, Any] = None):
+        """Save the artifact as compact JSON, replacing any saved one in a single step"""
+        artifact = self.to_dict()
+        if parity is not None:
+            artifact['parity'] = parity
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(artifact, f, separators=(',', ':'))
+        os.replace(tmp_path, filepath)
+        logger.info(f"Student model saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath) -> "StudentTree":
+        with open(filepath) as f:
+            return cls.from_dict(json.load(f))
+
+
+def distill(
+    trainer: ModelTrainer,
+    data: pd.DataFrame,
+    max_depth: int = DISTILL_CONFIG['max_depth'],
+    transfer_rows: int = DISTILL_CONFIG['transfer_rows'],
+    seed: int = DISTILL_CONFIG['transfer_seed']
+) -> StudentTree:
+    """
+    Train a student tree on the teacher's answers
+
+    The transfer set is the training data plus synthetic rows around each
+    crop's profile, all labelled by the teacher, so the student learns the
+    teacher's decision boundaries rather than the original labels.
+
+    Args:
+        trainer: ModelTrainer with the teacher model loaded
+        data: Training data with the raw feature columns
+        max_depth: Depth limit of the student tree
+        transfer_rows: Synthetic rows added to the transfer set
+        seed: Seed of the synthetic rows
+
+    Returns:
+        The student tree
+    """
+    features = trainer.data_processor.feature_columns
+    transfer = data[features]
+    if transfer_rows > 0:
+        transfer = pd.concat([transfer, generate_dataset(transfer_rows, seed=seed)[features]], ignore_index=True)
+
+    teacher_crops, _, _ = trainer.predict_frame(transfer)
+    model = DecisionTreeClassifier(max_depth=max_depth, random_state=42)
+    model.fit(transfer.to_numpy(dtype=float), teacher_crops)
+
+    student = StudentTree.from_sklearn(model, features, trainer.model_metrics.get('model_version'))
+    logger.info(f"Distilled student tree: {student.node_count} nodes, depth {student.depth}, {len(transfer)} transfer rows")
+    return student
+
+
+def parity_report(trainer: ModelTrainer, student: StudentTree, data: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Compare the student with the teacher on a dataset
+
+    Args:
+        trainer: ModelTrainer with the teacher model loaded
+        student: Student tree
+        data: Rows to compare on; accuracies are reported if it has ``label``
+
+    Returns:
+        Agreement overall and for the least faithful crops, accuracies,
+        size and single-input latency of the pure-Python evaluator
+    """
+    teacher_crops, _, _ = trainer.predict_frame(data)
+    student_crops = student.predict_frame(data)
+    agrees = student_crops == teacher_crops
+
+    by_crop = pd.Series(agrees).groupby(teacher_crops).mean().sort_values()
+    records = data[student.features].to_dict('records')
+    sample = records[:1000]
+    start = time.perf_counter()
+    for record in sample:
+        student.predict(record)
+    latency_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    report = {
+        'rows': len(data),
+        'agreement': float(agrees.mean()),
+        'disagreements': int((~agrees).sum()),
+        'lowest_crop_agreement': {crop: float(rate) for crop, rate in by_crop.head(5).items()},
+        'nodes': student.node_count,
+        'depth': student.depth,
+        'artifact_bytes': len(json.dumps(student.to_dict(), separators=(',', ':'))),
+        'python_latency_us': round(latency_us, 2),
+        'teacher_version': trainer.model_metrics.get('model_version')
+    }
+    if 'label' in data.columns:
+        report['teacher_accuracy'] = float((teacher_crops == data['label'].to_numpy()).mean())
+        report['student_accuracy'] = float((student_crops == data['label'].to_numpy()).mean())
+    return report
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Distill the crop model into a compact tree for on-device inference")
+    parser.add_argument("--data", default=str(TRAINING_DATA_PATH), help="Training CSV, also used for the parity report")
+    parser.add_argument("--output", default=str(DISTILL_CONFIG['output_path']), help="Exported student JSON file")
+    parser.add_argument("--max-depth", type=int, default=DISTILL_CONFIG['max_depth'], help="Student tree depth")
+    parser.add_argument("--transfer-rows", type=int, default=DISTILL_CONFIG['transfer_rows'], help="Synthetic transfer rows")
+    args = parser.parse_args()
+
+    trainer = ModelTrainer()
+    trainer.load_model()
+    data = pd.read_csv(args.data)
+
+    student = distill(trainer, data, args.max_depth, args.transfer_rows)
+    report = parity_report(trainer, student, data)
+    student.save(args.output, parity=report)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Rule-based fallback recommendations from per-crop feature ranges
+"""
+import json
+import logging
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_processing import DataProcessor
+from config import FALLBACK_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Reasons a request is answered by the fallback
+MODEL_UNAVAILABLE = "model_unavailable"
+OVERLOADED = "overloaded"
+
+
+class RuleFallback:
+    """
+    Approximate crop recommendations without the model
+
+    Each crop keeps the low and high quantile and the median of every raw
+    feature over its training samples. An input is scored against each crop
+    by how far its features fall outside the crop's ranges, in units of the
+    feature's standard deviation, with the distance to the crop's medians
+    as a tie-breaker. Scoring needs only a few small array operations, so
+    it answers in microseconds and works when the model cannot be loaded.
+    """
+
+    def __init__(
+        self,
+        crops: List[str],
+        features: List[str],
+        low: np.ndarray,
+        median: np.ndarray,
+        high: np.ndarray,
+        scale: np.ndarray,
+        accuracy: Optional[float] = None,
+        model_version: Optional[str] = None
+    ):
+        self.crops = list(crops)
+        self.features = list(features)
+        self.low = np.asarray(low, dtype=float)
+        self.median = np.asarray(median, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.accuracy = accuracy
+        self.model_version = model_version
+        self.served = Counter()
+
+    @classmethod
+    def build(
+        cls,
+        data: pd.DataFrame,
+        features: List[str],
+        model_version: Optional[str] = None,
+        quantiles: Tuple[float, float] = FALLBACK_CONFIG['quantiles']
+    ) -> "RuleFallback":
+        """
+        Compute the per-crop ranges from labelled training data
+
+        Args:
+            data: DataFrame with the raw feature columns and ``label``
+            features: Raw feature columns in input order
+            model_version: Version of the model trained on the same data
+            quantiles: Low and high quantile bounding each crop's range
+
+        Returns:
+            Fallback with its accuracy on ``data`` recorded
+        """
+        grouped = data.groupby('label')[features]
+        low = grouped.quantile(quantiles[0])
+        fallback = cls(
+            crops=low.index.tolist(),
+            features=features,
+            low=low.to_numpy(),
+            median=grouped.median().to_numpy(),
+            high=grouped.quantile(quantiles[1]).to_numpy(),
+            scale=data[features].std().replace(0, 1).to_numpy(),
+            model_version=model_version
+        )
+
+        predicted = fallback.scores(data[features].to_numpy(dtype=float)).argmin(axis=1)
+        fallback.accuracy = float((np.asarray(fallback.crops)[predicted] == data['label'].to_numpy()).mean())
+        logger.info(f"Built rule fallback for {len(fallback.crops)} crops, accuracy {fallback.accuracy:.4f}")
+        return fallback
+
+    def scores(self, raw: np.ndarray) -> np.ndarray:
+        """
+        Mismatch of each input with each crop, lower is better
+
+        Args:
+            raw: Array of shape (n, features) in ``features`` order
+
+        Returns:
+            Array of shape (n, crops)
+        """
+        x = raw[:, None, :]
+        outside = np.maximum(self.low - x, 0) + np.maximum(x - self.high, 0)
+        from_median = np.abs(x - self.median)
+        return ((outside + 0.1 * from_median) / self.scale).sum(axis=2)
+
+    @staticmethod
+    def _probabilities(scores: np.ndarray) -> np.ndarray:
+        weights = np.exp(scores.min(axis=1, keepdims=True) - scores)
+        return weights / weights.sum(axis=1, keepdims=True)
+
+    def _results(self, scores: np.ndarray) -> List[Dict[str, Any]]:
+        probabilities = self._probabilities(scores)
+        best = probabilities.argmax(axis=1)
+        return [
+            {
+                'predicted_crop': self.crops[index],
+                'confidence': float(probs[index]),
+                'all_probabilities': dict(zip(self.crops, probs.tolist())),
+                'degraded': True
+            }
+            for index, probs in zip(best, probabilities)
+        ]
+
+    def predict(self, input_data: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        """
+        Approximate recommendation for one input
+
+        Args:
+            input_data: Dictionary with the raw features
+            reason: Why the fallback is answering, for the served counters
+
+        Returns:
+            Prediction fields flagged as ``degraded``
+        """
+        raw = np.fromiter((input_data[name] for name in self.features), dtype=float, count=len(self.features))
+        self.served[reason] += 1
+        return self._results(self.scores(raw[None]))[0]
+
+    def batch_predict(self, input_batch: List[Dict[str, Any]], reason: str) -> List[Dict[str, Any]]:
+        """Approximate recommendations for a batch of inputs"""
+        raw = np.array([[inputs[name] for name in self.features] for inputs in input_batch], dtype=float)
+        self.served[reason] += len(input_batch)
+        return self._results(self.scores(raw))
+
+    def predict_frame(self, data: pd.DataFrame, reason: str) -> np.ndarray:
+        """Approximate probabilities for a frame of inputs, with columns in ``crops`` order"""
+        self.served[reason] += len(data)
+        return self._probabilities(self.scores(data[self.features].to_numpy(dtype=float)))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            'crops': len(self.crops),
+            'accuracy': self.accuracy,
+            'model_version': self.model_version,
+            'served': dict(self.served)
+        }
+
+    def save(self, filepath):
+        """Save the ranges as JSON, replacing any saved ones in a single step"""
+        rules = {
+            'crops': self.crops,
+            'features': self.features,
+            'low': self.low.tolist(),
+            'median': self.median.tolist(),
+            'high': self.high.tolist(),
+            'scale': self.scale.tolist(),
+            'accuracy': self.accuracy,
+            'model_version': self.model_version
+        }
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(rules, f)
+        os.replace(tmp_path, filepath)
+        logger.info(f"Rule fallback saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath) -> "RuleFallback":
+        """Load saved ranges"""
+        with open(filepath) as f:
+            rules = json.load(f)
+        logger.info(f"Rule fallback loaded from {filepath}")
+        return cls(**rules)
+
+
+def load_fallback(filepath: Path, data_path: Path = None) -> Optional[RuleFallback]:
+    """
+    Load the saved fallback, or build it from the training data if none is saved
+
+    The fallback does not depend on the model artifacts, so it is available
+    even when the model fails to load.
+
+    Args:
+        filepath: Saved fallback file
+        data_path: Training CSV file used when no fallback is saved
+
+    Returns:
+        The fallback, or None if it can be neither loaded nor built
+    """
+    try:
+        if Path(filepath).exists():
+            return RuleFallback.load(filepath)
+        if data_path is not None and Path(data_path).exists():
+            fallback = RuleFallback.build(pd.read_csv(data_path), DataProcessor().feature_columns)
+            fallback.save(filepath)
+            return fallback
+        logger.warning("No rule fallback saved and no training data to build it from")
+    except Exception as e:
+        logger.error(f"Failed to load rule fallback: {e}")
+    return None
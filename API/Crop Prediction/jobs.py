@@ -0,0 +1,398 @@
+"""
+File-backed asynchronous batch scoring jobs
+"""
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from config import BATCH_CONFIG, JOBS_DIR
+from model_training import ModelTrainer
+from streaming import validate_frame
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+INPUT_FORMATS = ("csv", "parquet")
+RESULT_COLUMNS = ["row", "predicted_crop", "confidence", "error"]
+
+
+class JobStore:
+    """
+    Job state kept on the local filesystem, one directory per job
+
+    Each job directory holds ``job.json`` with the job state, the uploaded
+    ``input.csv`` or ``input.parquet``, the ``results.csv`` written so far,
+    a ``cancel`` marker file once cancellation is requested, and a ``lock``
+    file held by the process running the job. The state file is replaced
+    atomically, so readers never see a partial write.
+    """
+
+    def __init__(self, root: Path = JOBS_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def job_dir(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def input_path(self, job: Dict[str, Any]) -> Path:
+        return self.job_dir(job['job_id']) / f"input.{job['input_format']}"
+
+    def results_path(self, job_id: str) -> Path:
+        return self.job_dir(job_id) / "results.csv"
+
+    def create(self, input_format: str) -> Dict[str, Any]:
+        """Create a queued job directory and return its state"""
+        job_id = uuid.uuid4().hex
+        self.job_dir(job_id).mkdir()
+        job = {
+            'job_id': job_id,
+            'status': QUEUED,
+            'input_format': input_format,
+            'total_rows': None,
+            'rows_done': 0,
+            'rows_failed': 0,
+            'output_bytes': 0,
+            'rows_per_second': None,
+            'model_version': None,
+            'error': None,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None
+        }
+        self.save(job)
+        return job
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        path = self.job_dir(job_id) / "job.json"
+        # Job ids are generated hex strings; anything else cannot name a job
+        if not job_id.isalnum() or not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def save(self, job: Dict[str, Any]):
+        path = self.job_dir(job['job_id']) / "job.json"
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(job))
+        os.replace(tmp_path, path)
+
+    def list(self) -> List[Dict[str, Any]]:
+        jobs = [self.load(path.name) for path in self.root.iterdir() if path.is_dir()]
+        return sorted((job for job in jobs if job), key=lambda job: job['created_at'])
+
+    def claim(self, job_id: str) -> Optional[IO]:
+        """
+        Take the job's lock, held until the returned file is closed
+
+        The lock is released when its holder exits, so a job left behind by
+        a crashed process can be claimed again. Without ``fcntl`` the lock
+        is not enforced and only one process may run jobs.
+
+        Returns:
+            The open lock file, or None if another live process holds it
+        """
+        lock = open(self.job_dir(job_id) / "lock", 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock.close()
+                return None
+        return lock
+
+    def claimed(self, job_id: str) -> bool:
+        """Whether another live process holds the job's lock"""
+        lock = self.claim(job_id)
+        if lock is None:
+            return True
+        lock.close()
+        return False
+
+    def request_cancel(self, job_id: str):
+        (self.job_dir(job_id) / "cancel").touch()
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return (self.job_dir(job_id) / "cancel").exists()
+
+    def delete(self, job_id: str):
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def read_results(self, job: Dict[str, Any], offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Read a page of results, limited to rows covered by the last checkpoint"""
+        limit = min(limit, job['rows_done'] - offset)
+        if limit <= 0:
+            return []
+
+        page = pd.read_csv(
+            self.results_path(job['job_id']),
+            skiprows=range(1, offset + 1),
+            nrows=limit,
+            keep_default_na=False,
+            dtype={'predicted_crop': str, 'error': str}
+        )
+        page['confidence'] = pd.to_numeric(page['confidence'])
+        records = page.astype(object).where(page.notna(), None).to_dict('records')
+        for record in records:
+            for key in ('predicted_crop', 'error'):
+                if record[key] == "":
+                    record[key] = None
+        return records
+
+
+def _init_worker():
+    """Lower the CPU priority of a job worker process"""
+    logging.getLogger("data_processing").setLevel(logging.WARNING)
+    if hasattr(os, "nice"):
+        os.nice(BATCH_CONFIG["job_nice"])
+
+
+def load_job_model() -> ModelTrainer:
+    """Load the currently saved model for a job"""
+    trainer = ModelTrainer()
+    trainer.load_model()
+    # Keep batch scoring from taking every core away from interactive requests
+    trainer.model.set_params(n_jobs=BATCH_CONFIG["job_threads"])
+    return trainer
+
+
+def score_job_chunk(trainer: ModelTrainer, chunk: pd.DataFrame) -> pd.DataFrame:
+    """Validate and score one chunk of job input, keeping invalid rows with an error"""
+    columns = trainer.data_processor.feature_columns
+    frame = chunk.reindex(columns=columns).apply(pd.to_numeric, errors="coerce")
+    invalid, reasons = validate_frame(frame)
+
+    results = pd.DataFrame({
+        'row': chunk.index,
+        'predicted_crop': None,
+        'confidence': None,
+        'error': [reason or None for reason in reasons]
+    }, columns=RESULT_COLUMNS)
+
+    valid = ~invalid
+    if valid.any():
+        crops, confidences, _ = trainer.predict_frame(frame[valid])
+        results.loc[valid, 'predicted_crop'] = crops
+        results.loc[valid, 'confidence'] = confidences.astype(float).round(6)
+
+    return results
+
+
+def run_job(root: str, job_id: str) -> str:
+    """
+    Score a job's input in a worker process, checkpointing after every chunk
+
+    The saved model is loaded when the job starts, so jobs pick up retrained
+    models. A job that was interrupted part way through resumes from its
+    last checkpoint. Cancellation is checked between chunks.
+
+    The job is claimed first, so when several API processes resume the
+    same unfinished jobs, only one of them runs each job and the others
+    return at once.
+
+    Returns:
+        Final job status
+    """
+    store = JobStore(root)
+    lock = store.claim(job_id)
+    if lock is None:
+        logger.info(f"Job {job_id} is running in another process")
+        return RUNNING
+
+    with lock:
+        job = store.load(job_id)
+        if job['status'] in FINISHED_STATES:
+            return job['status']
+        return _score_job(store, job)
+
+
+def _score_job(store: JobStore, job: Dict[str, Any]) -> str:
+    """Score a claimed job, saving its state after every chunk and when it ends"""
+    job_id = job['job_id']
+
+    try:
+        if store.cancel_requested(job_id):
+            job.update(status=CANCELLED, finished_at=datetime.now().isoformat())
+            return CANCELLED
+
+        trainer = load_job_model()
+        job.update(
+            status=RUNNING,
+            started_at=job['started_at'] or datetime.now().isoformat(),
+            model_version=trainer.model_metrics.get('model_version')
+        )
+        store.save(job)
+
+        results_path = store.results_path(job_id)
+        with open(results_path, 'ab') as out:
+            # Drop any partial write after the last checkpoint
+            out.truncate(job['output_bytes'])
+            out.seek(job['output_bytes'])
+
+            start = time.perf_counter()
+            rows_scored = 0
+            chunks = iter_input_chunks(
+                str(store.input_path(job)), BATCH_CONFIG["job_chunk_size"], skip_rows=job['rows_done']
+            )
+            for chunk in chunks:
+                if store.cancel_requested(job_id):
+                    job.update(status=CANCELLED, finished_at=datetime.now().isoformat())
+                    return CANCELLED
+
+                results = score_job_chunk(trainer, chunk)
+                out.write(results.to_csv(index=False, header=(job['output_bytes'] == 0)).encode())
+                out.flush()
+                os.fsync(out.fileno())
+
+                rows_scored += len(results)
+                job['rows_done'] += len(results)
+                job['rows_failed'] += int(results['error'].notna().sum())
+                job['output_bytes'] = out.tell()
+                job['rows_per_second'] = rows_scored / (time.perf_counter() - start)
+                store.save(job)
+
+        job.update(status=COMPLETED, total_rows=job['rows_done'], finished_at=datetime.now().isoformat())
+        return COMPLETED
+
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        job.update(status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+        return FAILED
+
+    finally:
+        store.save(job)
+
+
+def count_csv_rows(path: Path) -> int:
+    """Count data rows in a CSV file without parsing it"""
+    lines = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        while block := f.read(1 << 20):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def count_input_rows(path: Path, input_format: str) -> int:
+    """Count data rows in an uploaded job input"""
+    if input_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet input requires pyarrow (pip install pyarrow)")
+        return pq.ParquetFile(path).metadata.num_rows
+    return count_csv_rows(path)
+
+
+def iter_input_chunks(input_path: str, chunk_size: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV or Parquet file in chunks, indexed by input row number
+
+    Args:
+        input_path: Input ``.csv`` or ``.parquet`` file
+        chunk_size: Rows per chunk
+        skip_rows: Leading data rows to skip, used when resuming
+    """
+    start = skip_rows
+
+    if Path(input_path).suffix == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet input requires pyarrow (pip install pyarrow)")
+
+        seen = 0
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            seen += batch.num_rows
+            if seen <= skip_rows:
+                continue
+            chunk = batch.to_pandas()
+            chunk.index = range(seen - len(chunk), seen)
+            yield chunk
+    else:
+        reader = pd.read_csv(input_path, chunksize=chunk_size, skiprows=range(1, skip_rows + 1))
+        for chunk in reader:
+            chunk.index = range(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+
+
+class JobManager:
+    """
+    Runs batch jobs on a bounded pool of worker processes
+
+    Scoring happens in separate, lower-priority processes with a capped
+    thread count, so long jobs do not compete with the API process for the
+    GIL or take every core from interactive requests.
+    """
+
+    def __init__(self, store: JobStore = None, workers: int = None):
+        self.store = store or JobStore()
+        self.workers = workers or BATCH_CONFIG["job_workers"]
+        self.pool = None
+        self.futures: Dict[str, Future] = {}
+
+    def start(self):
+        """Start the worker pool and resume jobs left unfinished by a restart"""
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+        for job in self.store.list():
+            # With several API workers, each resumes the same jobs; run_job lets only one through
+            if job['status'] not in FINISHED_STATES and not self.store.claimed(job['job_id']):
+                logger.info(f"Resuming job {job['job_id']} from row {job['rows_done']}")
+                self.submit(job['job_id'])
+
+    def shutdown(self):
+        """Stop the pool; running jobs resume from their checkpoint on next start"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def submit(self, job_id: str):
+        """Queue a job whose input has been written"""
+        future = self.pool.submit(run_job, str(self.store.root), job_id)
+        self.futures[job_id] = future
+        future.add_done_callback(lambda _: self.futures.pop(job_id, None))
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """Cancel a queued or running job"""
+        self.store.request_cancel(job_id)
+        future = self.futures.get(job_id)
+        if future is not None and future.cancel():
+            # Never started here; another process may still be running it
+            lock = self.store.claim(job_id)
+            if lock is not None:
+                with lock:
+                    job = self.store.load(job_id)
+                    if job['status'] not in FINISHED_STATES:
+                        job.update(status=CANCELLED, finished_at=datetime.now().isoformat())
+                        self.store.save(job)
+        return self.store.load(job_id)
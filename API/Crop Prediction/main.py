@@ -1,24 +1,58 @@
 """
 FastAPI application for Crop Recommendation System
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, Response
 from contextlib import asynccontextmanager
+from pydantic import ValidationError
+import hashlib
+import json
 import logging
+import time
 import traceback
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+import numpy as np
 
 from schemas import (
     CropPredictionRequest,
     CropPredictionResponse,
     BatchPredictionRequest,
     BatchPredictionResponse,
+    ScenarioRequest,
+    ScenarioResponse,
+    NeighborsRequest,
+    NeighborsResponse,
     HealthResponse,
-    ModelInfoResponse
+    ModelInfoResponse,
+    JobResponse,
+    JobResultsResponse,
+    get_feature_bounds
+)
+from model_training import ModelTrainer, compute_training_fingerprint
+from streaming import BodyStreamingResponse, iter_records, validate_chunk, validate_frame
+from scenarios import score_scenarios
+from jobs import JobManager, FINISHED_STATES, INPUT_FORMATS, count_input_rows
+from serving.scheduler import INTERACTIVE, BATCH
+from serving.admission import AdmissionController, AdmissionControlMiddleware
+from serving.singleflight import singleflight
+from serving.responses import FastJSONResponse, make_etag, etag_matches, not_modified
+from serving.compression import CompressionMiddleware
+from serving.columnar import MEDIA_TYPE as COLUMNAR_MEDIA_TYPE, decode_frame, encode
+from scheduler import scheduler
+from result_cache import prediction_cache
+from fallback import RuleFallback, load_fallback, MODEL_UNAVAILABLE, OVERLOADED
+from responses import with_top_k
+from columnar import prediction_columns
+from config import (
+    API_CONFIG, MODEL_CONFIG, BATCH_CONFIG, FALLBACK_CONFIG, DISTILL_CONFIG, RESPONSE_CONFIG, ADMISSION_CONFIG,
+    MODELS_DIR, TRAINING_DATA_PATH
 )
-from model_training import ModelTrainer
-from config import API_CONFIG, MODEL_CONFIG
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,26 +61,44 @@ logger = logging.getLogger(__name__)
 # Global model instance
 model_trainer = None
 
+# Rule-based answers while the model is unavailable or overloaded
+fallback: RuleFallback = None
+
+# Batch job worker pool
+job_manager = JobManager()
+
+# Admission control for the prediction routes
+admission = AdmissionController(scheduler, ADMISSION_CONFIG)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup for the FastAPI app"""
-    global model_trainer
+    global model_trainer, fallback
     
     # Startup
     logger.info("Starting Crop Recommendation API")
     try:
         model_trainer = ModelTrainer()
-        model_trainer.load_model()
+        model_trainer.load_model(load_neighbors=True)
         logger.info("Model loaded successfully")
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         model_trainer = None
     
+    # Loaded on its own so it is there when the model is not
+    if FALLBACK_CONFIG["enabled"]:
+        fallback = load_fallback(MODELS_DIR / "fallback_rules.json", TRAINING_DATA_PATH)
+    
+    scheduler.start()
+    job_manager.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Crop Recommendation API")
+    job_manager.shutdown()
+    scheduler.shutdown()
 
 
 # Initialize FastAPI app
@@ -57,6 +109,15 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Shed load before it reaches the prediction routes; shed single and batch
+# predictions are answered by the rule fallback
+app.add_middleware(
+    AdmissionControlMiddleware,
+    controller=admission,
+    path_prefixes=("/predict",),
+    degraded_paths=("/predict", "/predict/batch") if FALLBACK_CONFIG["when_overloaded"] else ()
+)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -66,6 +127,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses for clients that accept gzip or brotli
+if RESPONSE_CONFIG["compression"]:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=RESPONSE_CONFIG["compression_min_bytes"],
+        gzip_level=RESPONSE_CONFIG["gzip_level"],
+        brotli_quality=RESPONSE_CONFIG["brotli_quality"]
+    )
+
 
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -90,6 +160,37 @@ async def health_check():
     )
 
 
+@app.get("/metrics")
+async def get_metrics():
+    """Inference scheduler, admission control, request coalescing and model cascade metrics"""
+    trainer = model_trainer
+    return {
+        "scheduler": scheduler.get_metrics(),
+        "admission": admission.get_metrics(),
+        "singleflight": singleflight.get_metrics(),
+        "cascade": trainer.get_cascade_metrics() if trainer is not None else None,
+        "fallback": fallback.get_metrics() if fallback is not None else None,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Prediction cache hit rates for this worker and shared cache size"""
+    return {
+        **await run_in_threadpool(prediction_cache.get_stats),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.delete("/cache")
+async def clear_cache():
+    """Drop all cached predictions"""
+    if not await run_in_threadpool(prediction_cache.clear):
+        return {"message": "Worker cache cleared; the shared cache is busy, retry later"}
+    return {"message": "Prediction cache cleared"}
+
+
 @app.get("/model/info", response_model=ModelInfoResponse)
 async def get_model_info():
     """Get information about the loaded model"""
@@ -98,7 +199,7 @@ async def get_model_info():
     
     return ModelInfoResponse(
         model_name="XGBoost Classifier",
-        model_version=API_CONFIG["version"],
+        model_version=model_trainer.model_metrics.get('model_version', API_CONFIG["version"]),
         features=[
             "N", "P", "K", "temperature", "humidity", "ph", "rainfall"
         ],
@@ -107,8 +208,55 @@ async def get_model_info():
     )
 
 
+def fallback_reason(http_request: Request) -> str:
+    """Why a request must be answered by the rule fallback, or None to use the model"""
+    overloaded = getattr(http_request.state, "overloaded", None)
+    if overloaded is not None:
+        if fallback is None:
+            raise HTTPException(status_code=503, detail="Service overloaded, retry later", headers={"Retry-After": "1"})
+        return OVERLOADED
+    
+    if model_trainer is None or model_trainer.model is None:
+        if fallback is None:
+            raise HTTPException(status_code=503, detail="Model not loaded")
+        return MODEL_UNAVAILABLE
+    
+    return None
+
+
+def prediction_response(content: Dict[str, Any], response_model, etag: Optional[str] = None):
+    """
+    Response for prediction content built by the service
+    
+    With ``FAST_RESPONSES`` the content is encoded once as it is;
+    otherwise it is validated through ``response_model`` and encoded with
+    FastAPI's encoder. ``etag`` is sent as the response's ETag.
+    """
+    headers = {"ETag": etag} if etag is not None else None
+    if RESPONSE_CONFIG["fast"]:
+        return FastJSONResponse(content, headers=headers)
+    return JSONResponse(jsonable_encoder(response_model(**content)), headers=headers)
+
+
+def model_etag(trainer: Optional[ModelTrainer], namespace: str, payload: Any, *extra: Any) -> Optional[str]:
+    """
+    ETag of a model answer, from the endpoint, the normalized input, the
+    model version and ``extra`` response options; None while no model is loaded
+    """
+    if trainer is None or trainer.model is None:
+        return None
+    return make_etag(singleflight.make_key(namespace, payload, trainer.model_metrics.get('model_version'), *extra))
+
+
+# Query parameter trimming all_probabilities to the most likely crops
+TOP_K_QUERY = Query(
+    None, ge=1, le=RESPONSE_CONFIG["max_top_k"],
+    description="Return only the k most likely crops in all_probabilities"
+)
+
+
 @app.post("/predict", response_model=CropPredictionResponse)
-async def predict_crop(request: CropPredictionRequest):
+async def predict_crop(request: CropPredictionRequest, http_request: Request, top_k: Optional[int] = TOP_K_QUERY):
     """
     Predict the best crop based on soil and climate conditions
     
@@ -119,21 +267,52 @@ async def predict_crop(request: CropPredictionRequest):
     - **humidity**: Relative humidity percentage (0-100)
     - **ph**: pH value of soil (0-14)
     - **rainfall**: Rainfall in mm (0-400)
+    
+    With `top_k`, `all_probabilities` holds only the k most likely crops.
+    While the model is not loaded or the service is overloaded, an
+    approximate answer from per-crop feature ranges is returned with
+    `degraded` set.
+    
+    Model answers carry an ETag of the input, `top_k` and the model
+    version; a request whose `If-None-Match` names it gets `304`.
     """
-    if model_trainer is None or model_trainer.model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    # Convert request to dictionary
+    input_data = request.dict()
+    
+    trainer = model_trainer
+    etag = model_etag(trainer, "predict", input_data, top_k)
+    if etag is not None and etag_matches(http_request, etag):
+        return not_modified(etag)
+    
+    reason = fallback_reason(http_request)
+    if reason is not None:
+        return prediction_response(
+            with_top_k(fallback.predict(input_data, reason), top_k), CropPredictionResponse
+        )
     
     try:
-        # Convert request to dictionary
-        input_data = request.dict()
+        key = singleflight.make_key("predict", input_data, trainer.model_metrics.get('model_version'))
+        prediction = await prediction_cache.aget(key)
         
-        # Make prediction
-        predicted_crop, confidence, all_probabilities = model_trainer.predict(input_data)
+        if prediction is None:
+            async def compute():
+                predicted_crop, confidence, all_probabilities = await scheduler.run(
+                    trainer.predict, input_data, priority=INTERACTIVE
+                )
+                result = {
+                    'predicted_crop': predicted_crop,
+                    'confidence': confidence,
+                    'all_probabilities': all_probabilities
+                }
+                await prediction_cache.aset(key, result)
+                return result
+            
+            # Make prediction ahead of any queued batch work, sharing it with
+            # identical requests already in flight
+            prediction = await singleflight.do(key, compute)
         
-        return CropPredictionResponse(
-            predicted_crop=predicted_crop,
-            confidence=confidence,
-            all_probabilities=all_probabilities
+        return prediction_response(
+            with_top_k({**prediction, 'degraded': False}, top_k), CropPredictionResponse, etag
         )
         
     except Exception as e:
@@ -142,32 +321,136 @@ async def predict_crop(request: CropPredictionRequest):
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@app.post("/predict/batch", response_model=BatchPredictionResponse)
-async def predict_batch(request: BatchPredictionRequest):
+async def parse_json_body(http_request: Request, model):
+    """Validate a JSON request body against ``model``, failing with a 422 as a body parameter would"""
+    body = await http_request.body()
+    try:
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)], body=body
+        )
+
+
+# /predict/batch reads its own body, so both accepted formats are documented here;
+# the request items refer to the CropPredictionRequest schema of /predict
+BATCH_REQUEST_SCHEMA = BatchPredictionRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+BATCH_REQUEST_SCHEMA.pop("$defs", None)
+BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": BATCH_REQUEST_SCHEMA},
+            COLUMNAR_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+}
+
+
+async def predict_batch_columnar(http_request: Request, top_k: Optional[int]) -> Response:
+    """
+    Score a columnar batch body, answering in the same format
+    
+    Feature columns are read in place from the body and scored in chunks of
+    ``STREAM_CHUNK_SIZE`` rows at batch priority. Model answers are tagged
+    with the body's hash, ``top_k`` and the model version.
+    """
+    body = await http_request.body()
+    trainer = model_trainer
+    etag = model_etag(trainer, "predict/batch/columnar", hashlib.sha256(body).hexdigest(), top_k)
+    if etag is not None and etag_matches(http_request, etag):
+        return not_modified(etag)
+    
+    try:
+        frame = decode_frame(body, BATCH_CONFIG["columnar_max_rows"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid columnar body: {e}")
+    
+    missing = [name for name in get_feature_bounds() if name not in frame.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Columnar body is missing columns: {missing}")
+    
+    invalid, reasons = validate_frame(frame)
+    if invalid.any():
+        raise HTTPException(
+            status_code=422,
+            detail=[{"row": int(row), "error": reasons[row]} for row in invalid.nonzero()[0][:10]]
+        )
+    
+    reason = fallback_reason(http_request)
+    
+    try:
+        chunk_size = BATCH_CONFIG["stream_chunk_size"]
+        parts = []
+        for start in range(0, len(frame), chunk_size):
+            chunk = frame.iloc[start:start + chunk_size]
+            if reason is not None:
+                parts.append(fallback.predict_frame(chunk, reason))
+            else:
+                _, _, probabilities = await scheduler.run(trainer.predict_frame, chunk, priority=BATCH)
+                parts.append(probabilities)
+        
+        class_names = fallback.crops if reason is not None else trainer.data_processor.get_all_crops()
+        probabilities = np.concatenate(parts) if parts else np.empty((0, len(class_names)))
+        columns = prediction_columns(class_names, probabilities, reason is not None, top_k)
+        headers = {"ETag": etag} if etag is not None and reason is None else None
+        return Response(content=encode(columns), media_type=COLUMNAR_MEDIA_TYPE, headers=headers)
+        
+    except Exception as e:
+        logger.error(f"Columnar batch prediction error: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+
+@app.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    openapi_extra=BATCH_OPENAPI,
+    responses={200: {"content": {COLUMNAR_MEDIA_TYPE: {}}}}
+)
+async def predict_batch(http_request: Request, top_k: Optional[int] = TOP_K_QUERY):
     """
     Predict crops for multiple inputs
     
-    Maximum 100 predictions per batch
+    Maximum 100 predictions per JSON batch. Accepts `top_k` and falls back to
+    approximate answers flagged as `degraded` like `/predict`.
+    
+    A body sent as `application/x-columnar` holds up to `COLUMNAR_MAX_ROWS`
+    rows with one column per feature, and is answered in the same format
+    with one column per output; see the Readme for the layout.
+    
+    Model answers carry an ETag and honour `If-None-Match` like `/predict`.
     """
-    if model_trainer is None or model_trainer.model is None:
-        raise HTTPException(status_code=503, detail="Model not loaded")
+    if http_request.headers.get("content-type", "").startswith(COLUMNAR_MEDIA_TYPE):
+        return await predict_batch_columnar(http_request, top_k)
     
+    request = await parse_json_body(http_request, BatchPredictionRequest)
     if len(request.predictions) > 100:
         raise HTTPException(status_code=400, detail="Maximum 100 predictions per batch")
     
+    # Convert requests to list of dictionaries
+    input_batch = [req.dict() for req in request.predictions]
+    
+    trainer = model_trainer
+    etag = model_etag(trainer, "predict/batch", input_batch, top_k)
+    if etag is not None and etag_matches(http_request, etag):
+        return not_modified(etag)
+    
+    reason = fallback_reason(http_request)
+    
     try:
-        # Convert requests to list of dictionaries
-        input_batch = [req.dict() for req in request.predictions]
+        if reason is not None:
+            results = fallback.batch_predict(input_batch, reason)
+        else:
+            # Make batch predictions in slices that yield to interactive requests
+            results = await scheduler.run_sliced(trainer.batch_predict, input_batch, priority=BATCH)
         
-        # Make batch predictions
-        results = model_trainer.batch_predict(input_batch)
+        predictions = [with_top_k({**result, 'degraded': reason is not None}, top_k) for result in results]
         
-        # Convert to response objects
-        predictions = [CropPredictionResponse(**result) for result in results]
-        
-        return BatchPredictionResponse(
-            predictions=predictions,
-            total_predictions=len(predictions)
+        return prediction_response(
+            {'predictions': predictions, 'total_predictions': len(predictions)},
+            BatchPredictionResponse,
+            etag if reason is None else None
         )
         
     except Exception as e:
@@ -176,6 +459,285 @@ async def predict_batch(request: BatchPredictionRequest):
         raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
 
 
+@app.post("/predict/scenarios", response_model=ScenarioResponse)
+async def predict_scenarios(request: ScenarioRequest):
+    """
+    Check how robust a recommendation is to changes in its inputs
+    
+    Each feature in `perturbations` is varied on its own over `steps` evenly
+    spaced changes from `low` to `high`, relative to the base value (e.g.
+    `-0.2` for 20% lower) or in feature units. All variants are scored in one
+    batched model call. Returns the probability curve of each likely crop
+    along each feature, the smallest change that alters the recommendation,
+    and the fraction of variants that keep it.
+    """
+    if model_trainer is None or model_trainer.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    try:
+        result = await scheduler.run(score_scenarios, model_trainer, request, priority=INTERACTIVE)
+        return ScenarioResponse(**result)
+        
+    except Exception as e:
+        logger.error(f"Scenario prediction error: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Scenario prediction failed: {str(e)}")
+
+
+def find_neighbors(trainer: ModelTrainer, input_batch: List[Dict[str, Any]], k: int) -> Dict[str, Any]:
+    """Nearest historical samples of each input, with the time spent searching"""
+    start = time.perf_counter()
+    results = trainer.nearest_samples(input_batch, k)
+    return {
+        'results': results,
+        'query_ms': round((time.perf_counter() - start) * 1000, 3)
+    }
+
+
+@app.post("/predict/neighbors", response_model=NeighborsResponse)
+async def predict_neighbors(request: NeighborsRequest):
+    """
+    Find the k nearest historical samples of each input
+    
+    Samples are compared on the seven input features, standardized with the
+    model's scaler. Returns each neighbor's distance, crop label and feature
+    values, closest first, and the number of neighbors per crop.
+    """
+    if model_trainer is None or model_trainer.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    if model_trainer.neighbor_index is None:
+        raise HTTPException(status_code=503, detail="Nearest neighbor index not loaded")
+    
+    try:
+        trainer = model_trainer
+        input_batch = [sample.dict() for sample in request.samples]
+        result = await scheduler.run(find_neighbors, trainer, input_batch, request.k, priority=INTERACTIVE)
+        
+        return NeighborsResponse(
+            **result,
+            k=min(request.k, len(trainer.neighbor_index)),
+            total_queries=len(input_batch),
+            index_size=len(trainer.neighbor_index),
+            model_version=trainer.neighbor_index.model_version
+        )
+        
+    except Exception as e:
+        logger.error(f"Neighbor lookup error: {e}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=f"Neighbor lookup failed: {str(e)}")
+
+
+def score_stream_chunk(
+    trainer: ModelTrainer,
+    records: List[Any],
+    offset: int,
+    include_probabilities: bool
+) -> str:
+    """Validate and score one chunk of streamed records, returning NDJSON lines in input order"""
+    frame, positions, errors = validate_chunk(records, trainer.data_processor.feature_columns)
+    
+    results = {position: {"row": offset + position, "error": message} for position, message in errors.items()}
+    
+    if len(frame):
+        crops, confidences, probabilities = trainer.predict_frame(frame)
+        class_names = trainer.data_processor.get_all_crops()
+        for i, position in enumerate(positions.tolist()):
+            result = {
+                "row": offset + position,
+                "predicted_crop": crops[i],
+                "confidence": float(confidences[i])
+            }
+            if include_probabilities:
+                result["all_probabilities"] = dict(zip(class_names, probabilities[i].tolist()))
+            results[position] = result
+    
+    return "".join(json.dumps(results[position]) + "\n" for position in range(len(records)))
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request, include_probabilities: bool = False):
+    """
+    Score an NDJSON or CSV body of any size, streaming results back as NDJSON
+    
+    - Send `Content-Type: application/x-ndjson` with one JSON object per line,
+      or `Content-Type: text/csv` with a header row
+    - Rows are validated and scored in fixed-size chunks as the body arrives
+    - Each output line has the input `row` number and either the prediction
+      or an `error` message for that row
+    """
+    if model_trainer is None or model_trainer.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    content_type = request.headers.get("content-type", "")
+    if "csv" in content_type:
+        fmt = "csv"
+    elif "ndjson" in content_type or "jsonl" in content_type:
+        fmt = "ndjson"
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Content-Type must be application/x-ndjson or text/csv"
+        )
+    
+    # Keep scoring with the same model even if a retrain swaps it mid-stream
+    trainer = model_trainer
+    chunk_size = BATCH_CONFIG["stream_chunk_size"]
+    
+    async def score_stream():
+        offset = 0
+        chunk = []
+        try:
+            async for record in iter_records(request, fmt):
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    yield await scheduler.run(
+                        score_stream_chunk, trainer, chunk, offset, include_probabilities, priority=BATCH
+                    )
+                    offset += len(chunk)
+                    chunk = []
+            if chunk:
+                yield await scheduler.run(
+                    score_stream_chunk, trainer, chunk, offset, include_probabilities, priority=BATCH
+                )
+        except ValueError as e:
+            logger.error(f"Stream prediction error: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+    
+    return BodyStreamingResponse(score_stream(), media_type="application/x-ndjson")
+
+
+def job_response(job: Dict[str, Any]) -> JobResponse:
+    """Build a job status response with its progress fraction"""
+    progress = None
+    if job['total_rows']:
+        progress = min(job['rows_done'] / job['total_rows'], 1.0)
+    elif job['status'] == "completed":
+        progress = 1.0
+    return JobResponse(progress=progress, **{
+        name: job[name] for name in JobResponse.model_fields if name in job
+    })
+
+
+def get_job_or_404(job_id: str) -> Dict[str, Any]:
+    job = job_manager.store.load(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: Request, format: str = None):
+    """
+    Submit a CSV or Parquet dataset for asynchronous scoring
+    
+    - Send the file as the request body with `Content-Type: text/csv` or
+      `application/vnd.apache.parquet`, or set `format` to `csv` or `parquet`
+    - Jobs run on a bounded pool of background worker processes; poll
+      `/jobs/{job_id}` for progress
+    """
+    if model_trainer is None or model_trainer.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "parquet" if "parquet" in content_type else "csv" if "csv" in content_type else None
+    if format not in INPUT_FORMATS:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/vnd.apache.parquet, or set format to csv or parquet"
+        )
+    
+    job = job_manager.store.create(format)
+    input_path = job_manager.store.input_path(job)
+    try:
+        with open(input_path, 'wb') as f:
+            async for chunk in request.stream():
+                f.write(chunk)
+        job['total_rows'] = await run_in_threadpool(count_input_rows, input_path, format)
+    except Exception as e:
+        job_manager.store.delete(job['job_id'])
+        logger.error(f"Job upload error: {e}")
+        raise HTTPException(status_code=400, detail=f"Could not read job input: {str(e)}")
+    
+    job_manager.store.save(job)
+    job_manager.submit(job['job_id'])
+    return job_response(job)
+
+
+@app.get("/jobs", response_model=List[JobResponse])
+async def list_jobs():
+    """List all batch jobs, oldest first"""
+    return [job_response(job) for job in job_manager.store.list()]
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the status, progress and throughput of a batch job"""
+    return job_response(get_job_or_404(job_id))
+
+
+@app.get("/jobs/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(job_id: str, offset: int = 0, limit: int = 1000):
+    """
+    Get a page of job results in input row order
+    
+    Rows already scored can be read while the job is still running.
+    """
+    job = get_job_or_404(job_id)
+    if offset < 0 or not 1 <= limit <= BATCH_CONFIG["job_page_limit"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset must be >= 0 and limit between 1 and {BATCH_CONFIG['job_page_limit']}"
+        )
+    
+    results = await run_in_threadpool(job_manager.store.read_results, job, offset, limit)
+    next_offset = offset + len(results)
+    if job['status'] in FINISHED_STATES and next_offset >= job['rows_done']:
+        next_offset = None
+    
+    return JobResultsResponse(
+        job_id=job_id,
+        status=job['status'],
+        offset=offset,
+        results=results,
+        next_offset=next_offset
+    )
+
+
+@app.get("/jobs/{job_id}/results/file")
+async def download_job_results(job_id: str):
+    """Download the results CSV of a completed job"""
+    job = get_job_or_404(job_id)
+    if job['status'] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}, results file not ready")
+    
+    return FileResponse(
+        job_manager.store.results_path(job_id),
+        media_type="text/csv",
+        filename=f"{job_id}_results.csv"
+    )
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; rows already scored stay readable"""
+    job = get_job_or_404(job_id)
+    if job['status'] in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job is already {job['status']}")
+    return job_response(job_manager.cancel(job_id))
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Delete a finished job and its files"""
+    job = get_job_or_404(job_id)
+    if job['status'] not in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail="Cancel the job before deleting it")
+    job_manager.store.delete(job_id)
+    return {"message": f"Job {job_id} deleted"}
+
+
 @app.get("/model/feature-importance")
 async def get_feature_importance():
     """Get feature importance from the trained model"""
@@ -192,26 +754,83 @@ async def get_feature_importance():
         raise HTTPException(status_code=500, detail=f"Failed to get feature importance: {str(e)}")
 
 
+@app.get("/model/student")
+async def get_student_model(http_request: Request, allow_stale: bool = False):
+    """
+    Download the distilled student tree for on-device inference
+    
+    The JSON artifact describes its own evaluation and carries a parity
+    report against the server model. Build it with `python distill.py`.
+    
+    A student distilled from another model version than the one being
+    served is answered with 409 Conflict, since its parity report no longer
+    holds, unless `allow_stale` is set; it is then served with
+    `X-Student-Stale: true`. The ETag is the student's model version.
+    """
+    student_path = DISTILL_CONFIG["output_path"]
+    if not student_path.exists():
+        raise HTTPException(status_code=404, detail="No student model exported, run distill.py")
+    
+    student = await run_in_threadpool(lambda: json.loads(student_path.read_bytes()))
+    student_version = student.get('model_version')
+    model_version = model_trainer.model_metrics.get('model_version') if model_trainer is not None else None
+    stale = model_version is not None and student_version != model_version
+    if stale and not allow_stale:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Student model was distilled from model version {student_version}, "
+                   f"the served model is {model_version}; re-run distill.py"
+        )
+    
+    headers = {"X-Student-Stale": "true" if stale else "false"}
+    if student_version:
+        etag = f'"{student_version}"'
+        if etag_matches(http_request, etag):
+            response = not_modified(etag)
+            response.headers.update(headers)
+            return response
+        headers["ETag"] = etag
+    
+    return FileResponse(student_path, media_type="application/json", filename="student_model.json", headers=headers)
+
+
 @app.post("/model/retrain")
-async def retrain_model(background_tasks: BackgroundTasks, data_path: str = None):
+async def retrain_model(background_tasks: BackgroundTasks, data_path: str = None, force: bool = False):
     """
     Retrain the model (background task)
     
-    This endpoint triggers model retraining in the background
+    This endpoint triggers model retraining in the background. If the data
+    file and training config match the loaded model's fingerprint the
+    existing model is kept and no retraining is scheduled, unless `force` is set.
     """
     if data_path is None:
-        data_path = "data/Crop_recommendation.csv"  # Default path
+        data_path = str(TRAINING_DATA_PATH)
+    
+    if not force:
+        try:
+            fingerprint = compute_training_fingerprint(data_path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Data file not found: {data_path}")
+        
+        if model_trainer is not None and model_trainer.model_metrics.get('fingerprint') == fingerprint:
+            return {
+                "message": "Model is up to date, retraining skipped",
+                "fingerprint": fingerprint
+            }
     
     def retrain_task():
         try:
-            global model_trainer
+            global model_trainer, fallback
             logger.info("Starting model retraining")
             new_trainer = ModelTrainer()
-            results = new_trainer.train_model(data_path)
-            new_trainer.save_model()
+            results = new_trainer.train_model(data_path, force=force)
+            if not results['cached']:
+                new_trainer.save_model()
             
             # Update global model
             model_trainer = new_trainer
+            if new_trainer.fallback is not None and FALLBACK_CONFIG["enabled"]:
+                fallback = new_trainer.fallback
             logger.info("Model retraining completed successfully")
             
         except Exception as e:
@@ -221,6 +840,57 @@ async def retrain_model(background_tasks: BackgroundTasks, data_path: str = None
     return {"message": "Model retraining started in background"}
 
 
+@app.post("/model/update")
+async def update_model(
+    background_tasks: BackgroundTasks,
+    data_path: str = None,
+    mode: str = None,
+    n_rounds: int = None,
+    window_size: int = None
+):
+    """
+    Incrementally update the model with newly appended rows (background task)
+    
+    - **mode**: `continue` adds boosting rounds to the current model, `window`
+      refits on the most recent rows
+    - New rows may only contain crops the current model already knows
+    
+    The updated model is published as a new model version.
+    """
+    if model_trainer is None or model_trainer.model is None:
+        raise HTTPException(status_code=503, detail="Model not loaded")
+    
+    if data_path is None:
+        data_path = str(TRAINING_DATA_PATH)
+    
+    if mode is not None and mode not in ("continue", "window"):
+        raise HTTPException(status_code=400, detail=f"Unsupported incremental mode: {mode}")
+    
+    def update_task():
+        try:
+            global model_trainer
+            logger.info("Starting incremental model update")
+            new_trainer = ModelTrainer()
+            new_trainer.load_model(load_neighbors=True)
+            results = new_trainer.update_model(
+                data_path, mode=mode, n_rounds=n_rounds, window_size=window_size
+            )
+            new_trainer.save_model()
+            
+            # Publish the new model version
+            model_trainer = new_trainer
+            logger.info(f"Model updated to version {results['metrics']['model_version']}")
+            
+        except Exception as e:
+            logger.error(f"Incremental model update failed: {e}")
+    
+    background_tasks.add_task(update_task)
+    return {
+        "message": "Incremental model update started in background",
+        "current_version": model_trainer.model_metrics.get('model_version')
+    }
+
+
 # Error handlers
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
@@ -3,20 +3,69 @@ Model training and evaluation utilities
 """
 import pandas as pd
 import numpy as np
+import xgboost
+import sklearn
 from xgboost import XGBClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 import joblib
+import hashlib
+import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Optional
 
 from data_processing import DataProcessor
-from config import MODELS_DIR, MODEL_CONFIG
+from neighbors import NeighborIndex
+from serving.cascade import CascadeStats, calibrate_cascade, top_two_margin
+from fallback import RuleFallback
+from config import MODELS_DIR, TRAINING_DATA_PATH, MODEL_CONFIG, NEIGHBORS_CONFIG, CASCADE_CONFIG, FALLBACK_CONFIG
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def compute_training_fingerprint(data_path: str) -> str:
+    """
+    Compute a content-addressed fingerprint for a training run
+    
+    The fingerprint covers the dataset bytes, the preprocessing and
+    hyperparameter config and the versions of the libraries that produce
+    the artifacts, so two runs with the same fingerprint yield the same model.
+    
+    Args:
+        data_path: Path to the training CSV file
+        
+    Returns:
+        Hex digest identifying the training inputs
+    """
+    digest = hashlib.sha256()
+    
+    with open(data_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    
+    processor = DataProcessor()
+    training_config = {
+        'model_config': MODEL_CONFIG,
+        'cascade': {
+            'first_stage_rounds': CASCADE_CONFIG['first_stage_rounds'],
+            'target_agreement': CASCADE_CONFIG['target_agreement']
+        },
+        'fallback_quantiles': FALLBACK_CONFIG['quantiles'],
+        'feature_columns': processor.feature_columns,
+        'engineered_columns': processor.engineered_columns,
+        'versions': {
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+            'xgboost': xgboost.__version__
+        }
+    }
+    digest.update(json.dumps(training_config, sort_keys=True).encode())
+    
+    return digest.hexdigest()
+
+
 class ModelTrainer:
     """Handle model training and evaluation"""
     
@@ -24,17 +73,31 @@ class ModelTrainer:
         self.model = None
         self.data_processor = DataProcessor()
         self.model_metrics = {}
+        self.neighbor_index = None
+        self.cascade_stats = CascadeStats()
+        self.fallback = None
         
-    def train_model(self, data_path: str) -> Dict[str, Any]:
+    def train_model(self, data_path: str, force: bool = False) -> Dict[str, Any]:
         """
         Train the XGBoost model
         
+        Training is skipped when the saved artifacts were produced from the
+        same training fingerprint, unless ``force`` is set.
+        
         Args:
             data_path: Path to the training CSV file
+            force: Retrain even if a matching artifact exists
             
         Returns:
             Dictionary with training metrics
         """
+        fingerprint = compute_training_fingerprint(data_path)
+        
+        if not force:
+            cached = self.load_cached_model(fingerprint)
+            if cached is not None:
+                return cached
+        
         logger.info("Starting model training")
         
         # Load data
@@ -69,8 +132,18 @@ class ModelTrainer:
             'train_samples': len(X_train),
             'test_samples': len(X_test),
             'features': len(X_train[0]),
-            'classes': len(np.unique(y_train))
+            'classes': len(np.unique(y_train)),
+            'trained_rows': len(data),
+            'fingerprint': fingerprint,
+            'model_version': fingerprint[:12]
         }
+        self.model_metrics['cascade'] = self.calibrate_cascade(X_test, y_test)
+        
+        # Index the historical samples for nearest neighbor lookups
+        self.neighbor_index = NeighborIndex.build(data, self.data_processor, fingerprint[:12])
+        
+        # Per-crop ranges answering requests while no model is available
+        self.fallback = RuleFallback.build(data, self.data_processor.feature_columns, fingerprint[:12])
         
         # Detailed classification report
         report = classification_report(
@@ -85,7 +158,205 @@ class ModelTrainer:
         
         return {
             'metrics': self.model_metrics,
-            'classification_report': report
+            'classification_report': report,
+            'cached': False
+        }
+    
+    def load_cached_model(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Load saved artifacts if they were trained from the given fingerprint
+        
+        Args:
+            fingerprint: Training fingerprint to match
+            
+        Returns:
+            Training results for the cached artifact, or None on a cache miss
+        """
+        metrics_path = MODELS_DIR / "model_metrics.joblib"
+        model_path = MODELS_DIR / "crop_recommendation_model.joblib"
+        processors_path = MODELS_DIR / "data_processors.joblib"
+        
+        if not (metrics_path.exists() and model_path.exists() and processors_path.exists()):
+            return None
+        
+        try:
+            saved_metrics = joblib.load(metrics_path)
+        except Exception as e:
+            logger.warning(f"Could not read saved model metrics: {e}")
+            return None
+        
+        if saved_metrics.get('fingerprint') != fingerprint:
+            return None
+        
+        self.load_model(model_path, load_neighbors=True)
+        logger.info(f"Training inputs unchanged (fingerprint {fingerprint[:12]}), reusing saved model")
+        
+        return {
+            'metrics': self.model_metrics,
+            'classification_report': None,
+            'cached': True
+        }
+    
+    def update_model(
+        self,
+        data_path: str,
+        mode: Optional[str] = None,
+        n_rounds: Optional[int] = None,
+        window_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Incrementally update the loaded model with rows appended to the data file
+        
+        Only rows after the ones the current model was trained on are read. The
+        fitted scaler and label mapping are reused, so new rows must only
+        contain known crops.
+        
+        The published model learns from all new rows. A random
+        ``holdout_fraction`` of them is left out of a candidate update that is
+        otherwise identical; the accuracy before and after the update is
+        measured on those rows, and the cascade is calibrated on them with the
+        candidate. With too few new rows for a holdout, the previous cascade
+        calibration is kept and no post-update accuracy is reported.
+        
+        Args:
+            data_path: Path to the training CSV file with newly appended rows
+            mode: "continue" to add boosting rounds to the current booster, or
+                "window" to refit on the most recent rows
+            n_rounds: Extra boosting rounds for "continue" mode
+            window_size: Number of most recent rows for "window" mode
+            
+        Returns:
+            Dictionary with update metrics
+        """
+        if self.model is None:
+            raise ValueError("Model not trained or loaded")
+        
+        incremental_config = MODEL_CONFIG['incremental']
+        mode = mode or incremental_config['mode']
+        n_rounds = n_rounds or incremental_config['n_rounds']
+        window_size = window_size or incremental_config['window_size']
+        
+        if mode not in ('continue', 'window'):
+            raise ValueError(f"Unsupported incremental mode: {mode}")
+        
+        trained_rows = self.model_metrics.get(
+            'trained_rows',
+            self.model_metrics.get('train_samples', 0) + self.model_metrics.get('test_samples', 0)
+        )
+        
+        # Read only the rows appended since the last training run
+        new_data = pd.read_csv(data_path, skiprows=range(1, trained_rows + 1))
+        if new_data.empty:
+            raise ValueError(f"No new rows in {data_path} after the {trained_rows} already trained on")
+        
+        logger.info(f"Incremental update ({mode}) with {len(new_data)} new samples")
+        
+        X_new = self.data_processor.transform_features(new_data)
+        y_new = self.data_processor.encode_labels(new_data['label'])
+        
+        # Rows kept out of the candidate update, so the update is judged on unseen rows
+        holdout_count = int(len(new_data) * incremental_config['holdout_fraction'])
+        holdout = np.zeros(len(new_data), dtype=bool)
+        rng = np.random.default_rng(MODEL_CONFIG['random_state'])
+        holdout[rng.choice(len(new_data), holdout_count, replace=False)] = True
+        X_eval, y_eval = (X_new[holdout], y_new[holdout]) if holdout_count else (X_new, y_new)
+        
+        # Score the current model on the unseen rows before learning from them
+        pre_update_accuracy = accuracy_score(y_eval, self.model.predict(X_eval))
+        
+        params = self.model.get_xgb_params()
+        params['num_class'] = len(self.data_processor.label_encoder.classes_)
+        
+        data = pd.read_csv(data_path) if mode == 'window' else None
+        
+        def boost(excluded: np.ndarray) -> Tuple[XGBClassifier, int]:
+            """Update the current model without the new rows flagged in ``excluded``"""
+            if mode == 'continue':
+                booster = xgboost.train(
+                    params,
+                    xgboost.DMatrix(X_new[~excluded], label=y_new[~excluded]),
+                    num_boost_round=n_rounds,
+                    xgb_model=self.model.get_booster()
+                )
+                rows = int((~excluded).sum())
+            else:
+                window = data.drop(index=trained_rows + np.flatnonzero(excluded)).tail(window_size)
+                booster = xgboost.train(
+                    params,
+                    xgboost.DMatrix(
+                        self.data_processor.transform_features(window),
+                        label=self.data_processor.encode_labels(window['label'])
+                    ),
+                    num_boost_round=MODEL_CONFIG['xgboost_params']['n_estimators']
+                )
+                rows = len(window)
+            
+            updated = XGBClassifier(**MODEL_CONFIG['xgboost_params'])
+            updated.load_model(bytearray(booster.save_raw('json')))
+            return updated, rows
+        
+        post_update_accuracy = None
+        cascade = None
+        if holdout_count:
+            candidate, _ = boost(holdout)
+            post_update_accuracy = accuracy_score(y_eval, candidate.predict(X_eval))
+            cascade = self.calibrate_cascade(X_eval, y_eval, candidate)
+        
+        model, train_rows = boost(np.zeros(len(new_data), dtype=bool))
+        
+        # Derive the new version from its parent and the rows it learned from
+        parent_fingerprint = self.model_metrics.get('fingerprint', '')
+        digest = hashlib.sha256(parent_fingerprint.encode())
+        digest.update(pd.util.hash_pandas_object(new_data, index=False).values.tobytes())
+        digest.update(json.dumps(
+            {
+                'mode': mode,
+                'n_rounds': n_rounds,
+                'window_size': window_size,
+                'holdout_fraction': incremental_config['holdout_fraction']
+            },
+            sort_keys=True
+        ).encode())
+        fingerprint = digest.hexdigest()
+        
+        self.model = model
+        self.model_metrics = {
+            **self.model_metrics,
+            'trained_rows': trained_rows + len(new_data),
+            'fingerprint': fingerprint,
+            'model_version': fingerprint[:12],
+            'parent_version': self.model_metrics.get('model_version'),
+            'incremental_updates': self.model_metrics.get('incremental_updates', 0) + 1
+        }
+        if cascade is not None:
+            self.model_metrics['cascade'] = cascade
+        else:
+            logger.warning("Too few new rows for a holdout, keeping the previous cascade calibration")
+        
+        if self.neighbor_index is not None:
+            self.neighbor_index = self.neighbor_index.extend(
+                new_data, self.data_processor, self.model_metrics['model_version']
+            )
+        
+        if holdout_count:
+            logger.info(
+                f"Incremental update completed - accuracy on {holdout_count} held-out new rows "
+                f"{pre_update_accuracy:.4f} -> {post_update_accuracy:.4f}"
+            )
+        else:
+            logger.info(f"Incremental update completed - accuracy on new rows before it {pre_update_accuracy:.4f}")
+        
+        return {
+            'metrics': self.model_metrics,
+            'update': {
+                'mode': mode,
+                'new_samples': len(new_data),
+                'train_samples': train_rows,
+                'holdout_samples': holdout_count,
+                'boosted_rounds': model.get_booster().num_boosted_rounds(),
+                'pre_update_accuracy': pre_update_accuracy,
+                'post_update_accuracy': post_update_accuracy
+            }
         }
     
     def predict(self, input_data: Dict[str, Any]) -> Tuple[str, float, Dict[str, float]]:
@@ -105,8 +376,8 @@ class ModelTrainer:
         X = self.data_processor.prepare_prediction_data(input_data)
         
         # Get prediction and probabilities
-        prediction = self.model.predict(X)[0]
-        probabilities = self.model.predict_proba(X)[0]
+        probabilities = self.predict_proba(X)[0]
+        prediction = int(probabilities.argmax())
         
         # Convert to crop names and probabilities
         predicted_crop = self.data_processor.decode_prediction(prediction)
@@ -129,16 +400,107 @@ class ModelTrainer:
         Returns:
             List of prediction results
         """
+        crops, confidences, probabilities = self.predict_frame(pd.DataFrame(input_batch))
+        class_names = self.data_processor.get_all_crops()
+        
         results = []
-        for input_data in input_batch:
-            crop, confidence, probs = self.predict(input_data)
+        for crop, confidence, probs in zip(crops, confidences, probabilities):
             results.append({
                 'predicted_crop': crop,
-                'confidence': confidence,
-                'all_probabilities': probs
+                'confidence': float(confidence),
+                'all_probabilities': dict(zip(class_names, probs.tolist()))
             })
         return results
     
+    def predict_frame(self, data: pd.DataFrame, dtype: str = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Make vectorized predictions for a frame of inputs
+        
+        Args:
+            data: DataFrame with the raw feature columns
+            dtype: Feature precision, ``float64`` or ``float32`` (default: ``INFERENCE_DTYPE``)
+            
+        Returns:
+            Tuple of (predicted_crops, confidences, probabilities) arrays, with
+            probability columns in ``get_all_crops()`` order
+        """
+        if self.model is None:
+            raise ValueError("Model not trained or loaded")
+        
+        X = self.data_processor.transform_features(data, dtype)
+        probabilities = self.predict_proba(X)
+        predictions = probabilities.argmax(axis=1)
+        
+        crops = np.asarray(self.data_processor.get_all_crops(), dtype=object)[predictions]
+        confidences = probabilities[np.arange(len(predictions)), predictions]
+        
+        return crops, confidences, probabilities
+    
+    def calibrate_cascade(self, X: np.ndarray, y: np.ndarray, model: XGBClassifier = None) -> Dict[str, Any]:
+        """
+        Calibrate the first-stage margin threshold on held-out rows
+        
+        The first stage is the model truncated to its first
+        ``CASCADE_FIRST_STAGE_ROUNDS`` boosting rounds.
+        
+        Args:
+            X: Scaled features of rows the model was not trained on
+            y: Encoded labels of those rows
+            model: Model to calibrate (default: the loaded model)
+            
+        Returns:
+            Calibration report, stored in the model metrics
+        """
+        model = model or self.model
+        rounds = min(CASCADE_CONFIG['first_stage_rounds'], model.get_booster().num_boosted_rounds())
+        calibration = calibrate_cascade(
+            model.predict_proba(X, iteration_range=(0, rounds)),
+            model.predict_proba(X),
+            y,
+            CASCADE_CONFIG['target_agreement']
+        )
+        calibration['first_stage_rounds'] = rounds
+        
+        logger.info(
+            f"Cascade calibrated - escalation rate {calibration['escalation_rate']:.3f}, "
+            f"accuracy delta {calibration['accuracy_delta']:+.4f}"
+        )
+        return calibration
+    
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities, from the cascade first stage where it is confident
+        
+        With ``CASCADE_ENABLED`` and a calibrated model, rows whose
+        first-stage margin reaches the calibrated threshold keep the
+        first-stage probabilities and only the rest are scored by the full
+        model. Otherwise every row is scored by the full model.
+        
+        Args:
+            X: Scaled feature array
+            
+        Returns:
+            Probabilities with columns in ``get_all_crops()`` order
+        """
+        calibration = self.model_metrics.get('cascade')
+        if not CASCADE_CONFIG['enabled'] or not calibration or calibration['threshold'] is None:
+            return self.model.predict_proba(X)
+        
+        probabilities = self.model.predict_proba(X, iteration_range=(0, calibration['first_stage_rounds']))
+        escalate = top_two_margin(probabilities) < calibration['threshold']
+        if escalate.any():
+            probabilities[escalate] = self.model.predict_proba(X[escalate])
+        
+        self.cascade_stats.record(len(X), int(escalate.sum()))
+        return probabilities
+    
+    def get_cascade_metrics(self) -> Dict[str, Any]:
+        """Cascade calibration and rows answered by each stage since the model was loaded"""
+        return {
+            'enabled': CASCADE_CONFIG['enabled'],
+            **self.cascade_stats.get_metrics(self.model_metrics.get('cascade'))
+        }
+    
     def save_model(self, model_path: str = None):
         """Save trained model and processors"""
         if model_path is None:
@@ -158,11 +520,29 @@ class ModelTrainer:
         metrics_path = MODELS_DIR / "model_metrics.joblib"
         joblib.dump(self.model_metrics, metrics_path)
         
+        # Save nearest neighbor index
+        if self.neighbor_index is not None:
+            self.neighbor_index.save(MODELS_DIR / "neighbors_index.joblib")
+        
+        # Save rule fallback
+        if self.fallback is not None:
+            self.fallback.save(MODELS_DIR / "fallback_rules.json")
+        
         logger.info(f"Model saved to {model_path}")
         logger.info(f"Processors saved to {processors_path}")
         
-    def load_model(self, model_path: str = None):
-        """Load trained model and processors"""
+    def load_model(self, model_path: str = None, load_neighbors: bool = False):
+        """
+        Load trained model and processors
+        
+        Args:
+            model_path: Saved model file (default: the model in MODELS_DIR)
+            load_neighbors: Also load the nearest neighbor index, rebuilding
+                and saving it if it belongs to another model version. Only
+                the API process serves neighbor lookups; scoring processes
+                leave it off, so they neither read the training data nor
+                write the index file.
+        """
         if model_path is None:
             model_path = MODELS_DIR / "crop_recommendation_model.joblib"
         
@@ -179,29 +559,76 @@ class ModelTrainer:
             self.model_metrics = joblib.load(metrics_path)
         except FileNotFoundError:
             logger.warning("Model metrics not found")
+        
+        # Nearest neighbor lookups are optional, the model works without them
+        self.neighbor_index = None
+        if load_neighbors:
+            try:
+                self.load_neighbor_index()
+            except Exception as e:
+                logger.warning(f"Nearest neighbor index not available: {e}")
             
         logger.info(f"Model loaded from {model_path}")
     
+    def load_neighbor_index(self, data_path: str = None):
+        """
+        Load the saved nearest neighbor index, or rebuild it for the loaded model
+        
+        A saved index built for another model version is rebuilt from the
+        rows of the data file the model was trained on, and saved.
+        
+        Args:
+            data_path: Training CSV file (default: NEIGHBORS_DATA_PATH)
+        """
+        index_path = MODELS_DIR / "neighbors_index.joblib"
+        model_version = self.model_metrics.get('model_version')
+        
+        if index_path.exists():
+            index = NeighborIndex.load(index_path)
+            if index.model_version == model_version:
+                self.neighbor_index = index
+                return
+            logger.info(f"Nearest neighbor index is for model version {index.model_version}, rebuilding")
+        
+        data_path = data_path or NEIGHBORS_CONFIG['data_path']
+        data = pd.read_csv(data_path, nrows=self.model_metrics.get('trained_rows'))
+        self.neighbor_index = NeighborIndex.build(data, self.data_processor, model_version)
+        self.neighbor_index.save(index_path)
+    
+    def nearest_samples(self, input_batch: list, k: int) -> list:
+        """
+        Find the k nearest historical samples of each input
+        
+        Args:
+            input_batch: List of input dictionaries
+            k: Number of neighbors per query
+            
+        Returns:
+            One dict per query with its ``neighbors`` and ``label_counts``
+        """
+        if self.neighbor_index is None:
+            raise ValueError("Nearest neighbor index not loaded")
+        
+        return self.neighbor_index.neighbors(self.data_processor, input_batch, k)
+    
     def get_feature_importance(self) -> Dict[str, float]:
         """Get feature importance from trained model"""
         if self.model is None:
             raise ValueError("Model not trained or loaded")
         
-        feature_names = self.data_processor.feature_columns + [
-            'NPK', 'THI', 'rainfall_level', 'ph_category',
-            'temp_rain_interaction', 'ph_rain_interaction'
-        ]
+        feature_names = self.data_processor.feature_columns + self.data_processor.engineered_columns
         
         importance_scores = self.model.feature_importances_
         
         return dict(zip(feature_names, importance_scores.tolist()))
 
 
-def train_and_save_model(data_path: str):
+def train_and_save_model(data_path: str, force: bool = False):
     """Utility function to train and save model"""
     trainer = ModelTrainer()
-    results = trainer.train_model(data_path)
-    trainer.save_model()
+    results = trainer.train_model(data_path, force=force)
+    if not results['cached']:
+        trainer.save_model()
     
     logger.info("Model training completed and saved")
     return results
@@ -209,6 +636,6 @@ def train_and_save_model(data_path: str):
 
 if __name__ == "__main__":
     # Example usage
-    data_path = "data/Crop_recommendation.csv"  # Update path as needed
+    data_path = str(TRAINING_DATA_PATH)  # Set TRAINING_DATA_PATH to train on another file
     results = train_and_save_model(data_path)
     print("Training Results:", results['metrics'])
\ No newline at end of file
@@ -0,0 +1,175 @@
+"""
+Nearest historical samples index over the crop training data
+"""
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from data_processing import DataProcessor
+from config import NEIGHBORS_CONFIG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class NeighborIndex:
+    """
+    KD-tree over the scaled raw features of the historical samples
+
+    Samples are compared on the seven raw inputs, standardized with the
+    model's fitted scaler so every feature weighs the same. The engineered
+    columns are left out since they only recombine the raw ones. The index
+    records the model version it was built for and is rebuilt whenever the
+    model changes.
+    """
+
+    def __init__(
+        self,
+        tree: KDTree,
+        rows: np.ndarray,
+        label_codes: np.ndarray,
+        labels: List[str],
+        model_version: Optional[str] = None
+    ):
+        self.tree = tree
+        self.rows = rows
+        self.label_codes = label_codes
+        self.labels = np.asarray(labels, dtype=object)
+        self.model_version = model_version
+
+    @staticmethod
+    def _scale(processor: DataProcessor, raw: np.ndarray) -> np.ndarray:
+        """Standardize raw features with the raw-column part of the fitted scaler"""
+        n_raw = len(processor.feature_columns)
+        return (raw - processor.scaler.mean_[:n_raw]) / processor.scaler.scale_[:n_raw]
+
+    @classmethod
+    def build(
+        cls,
+        data: pd.DataFrame,
+        processor: DataProcessor,
+        model_version: Optional[str] = None,
+        leaf_size: int = NEIGHBORS_CONFIG['leaf_size']
+    ) -> "NeighborIndex":
+        """
+        Build the index from labelled samples
+
+        Args:
+            data: DataFrame with the raw feature columns and ``label``
+            processor: Data processor with a fitted scaler and label mapping
+            model_version: Version of the model the index belongs to
+            leaf_size: KD-tree leaf size
+
+        Returns:
+            Index over every row of ``data``
+        """
+        rows = data[processor.feature_columns].to_numpy(dtype=float)
+        label_codes = processor.encode_labels(data['label']).astype(np.int16)
+        tree = KDTree(cls._scale(processor, rows), leaf_size=leaf_size)
+
+        logger.info(f"Built nearest neighbor index over {len(rows)} samples")
+        return cls(tree, rows, label_codes, processor.get_all_crops(), model_version)
+
+    def extend(
+        self,
+        data: pd.DataFrame,
+        processor: DataProcessor,
+        model_version: Optional[str] = None
+    ) -> "NeighborIndex":
+        """
+        New index with the given samples appended to the ones already indexed
+
+        Args:
+            data: DataFrame with the raw feature columns and ``label``
+            processor: Data processor the index was built with
+            model_version: Version of the model the new index belongs to
+
+        Returns:
+            Index over the current and the new samples
+        """
+        rows = np.concatenate([self.rows, data[processor.feature_columns].to_numpy(dtype=float)])
+        label_codes = np.concatenate([
+            self.label_codes, processor.encode_labels(data['label']).astype(np.int16)
+        ])
+        tree = KDTree(self._scale(processor, rows), leaf_size=NEIGHBORS_CONFIG['leaf_size'])
+
+        logger.info(f"Extended nearest neighbor index to {len(rows)} samples")
+        return NeighborIndex(tree, rows, label_codes, list(self.labels), model_version)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def query(self, processor: DataProcessor, raw: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest samples of each query
+
+        Args:
+            processor: Data processor the index was built with
+            raw: Array of shape (n, 7) in ``feature_columns`` order
+            k: Number of neighbors per query, capped at the index size
+
+        Returns:
+            Tuple of (distances, sample indices), each of shape (n, k) and
+            sorted by distance
+        """
+        k = min(k, len(self))
+        return self.tree.query(self._scale(processor, raw), k=k)
+
+    def neighbors(self, processor: DataProcessor, input_batch: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """
+        Nearest samples of each input with their labels and feature values
+
+        Args:
+            processor: Data processor the index was built with
+            input_batch: List of input dictionaries with the raw features
+            k: Number of neighbors per query
+
+        Returns:
+            One dict per query with its ``neighbors`` and ``label_counts``
+        """
+        columns = processor.feature_columns
+        raw = np.array([[inputs[name] for name in columns] for inputs in input_batch], dtype=float)
+        distances, indices = self.query(processor, raw, k)
+
+        results = []
+        for query_distances, query_indices in zip(distances, indices):
+            labels = self.labels[self.label_codes[query_indices]]
+            names, counts = np.unique(labels, return_counts=True)
+            results.append({
+                'neighbors': [
+                    {
+                        'index': int(index),
+                        'distance': float(distance),
+                        'label': label,
+                        'features': dict(zip(columns, self.rows[index].tolist()))
+                    }
+                    for index, distance, label in zip(query_indices, query_distances, labels)
+                ],
+                'label_counts': dict(zip(names.tolist(), counts.tolist()))
+            })
+        return results
+
+    def save(self, filepath):
+        """Save the index, replacing any saved one in a single step"""
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        joblib.dump({
+            'tree': self.tree,
+            'rows': self.rows,
+            'label_codes': self.label_codes,
+            'labels': list(self.labels),
+            'model_version': self.model_version
+        }, tmp_path)
+        os.replace(tmp_path, filepath)
+        logger.info(f"Nearest neighbor index saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath) -> "NeighborIndex":
+        """Load a saved index"""
+        saved = joblib.load(filepath)
+        logger.info(f"Nearest neighbor index loaded from {filepath}")
+        return cls(saved['tree'], saved['rows'], saved['label_codes'], saved['labels'], saved['model_version'])
@@ -0,0 +1,82 @@
+"""
+Check that float32 inference matches float64 inference on the training data
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from model_training import ModelTrainer
+from config import PROCESSING_CONFIG, TRAINING_DATA_PATH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def precision_parity(
+    trainer: ModelTrainer,
+    data: pd.DataFrame,
+    tolerance: float = PROCESSING_CONFIG['float32_tolerance']
+) -> Dict[str, Any]:
+    """
+    Compare float32 and float64 inference on every row of ``data``
+
+    Args:
+        trainer: ModelTrainer with the model loaded
+        data: Rows with the raw feature columns
+        tolerance: Largest accepted absolute probability difference
+
+    Returns:
+        Report with label mismatches, the largest probability difference,
+        the feature matrix size and scoring time in each precision, and
+        ``passed``
+    """
+    processor = trainer.data_processor
+    n_features = len(processor.feature_columns) + len(processor.engineered_columns)
+
+    report = {'rows': len(data), 'tolerance': tolerance}
+    results = {}
+    for dtype in ('float64', 'float32'):
+        start = time.perf_counter()
+        results[dtype] = trainer.predict_frame(data, dtype=dtype)
+        report[f'{dtype}_seconds'] = time.perf_counter() - start
+        report[f'{dtype}_feature_mb'] = np.dtype(dtype).itemsize * len(data) * n_features / 2 ** 20
+
+    crops64, _, probabilities64 = results['float64']
+    crops32, _, probabilities32 = results['float32']
+    difference = np.abs(probabilities64.astype(np.float64) - probabilities32.astype(np.float64))
+
+    report['label_mismatches'] = int((crops64 != crops32).sum())
+    report['max_probability_difference'] = float(difference.max())
+    report['mean_probability_difference'] = float(difference.mean())
+    report['passed'] = report['label_mismatches'] == 0 and report['max_probability_difference'] <= tolerance
+    return report
+
+
+def main():
+    """Command line entry point; exits with status 1 if the check fails"""
+    parser = argparse.ArgumentParser(description="Check float32 inference against float64 on the training data")
+    parser.add_argument("--data", default=str(TRAINING_DATA_PATH), help="CSV with the raw feature columns")
+    parser.add_argument(
+        "--tolerance", type=float, default=PROCESSING_CONFIG['float32_tolerance'],
+        help="Largest accepted probability difference"
+    )
+    args = parser.parse_args()
+
+    trainer = ModelTrainer()
+    trainer.load_model()
+
+    report = precision_parity(trainer, pd.read_csv(args.data), args.tolerance)
+    print(json.dumps(report, indent=2))
+    if not report['passed']:
+        logger.error("float32 inference does not match float64 within tolerance")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Top-k trimming of crop prediction results
+"""
+import heapq
+from operator import itemgetter
+from typing import Any, Dict
+
+
+def top_k_probabilities(probabilities: Dict[str, float], k: int) -> Dict[str, float]:
+    """The ``k`` most likely crops and their probabilities, most likely first"""
+    return dict(heapq.nlargest(k, probabilities.items(), key=itemgetter(1)))
+
+
+def with_top_k(result: Dict[str, Any], k: int = None) -> Dict[str, Any]:
+    """Copy of a prediction result keeping only the top ``k`` probabilities; unchanged if ``k`` is None"""
+    if k is None:
+        return result
+    return {**result, 'all_probabilities': top_k_probabilities(result['all_probabilities'], k)}
@@ -0,0 +1,12 @@
+"""
+Prediction result cache of the API workers, configured from CACHE_CONFIG
+"""
+from config import CACHE_CONFIG
+from serving.result_cache import PredictionCache
+
+# Global prediction cache instance
+prediction_cache = PredictionCache(
+    memory_entries=CACHE_CONFIG["memory_entries"],
+    shared_path=CACHE_CONFIG["shared_path"] if CACHE_CONFIG["shared_enabled"] else None,
+    shared_max_bytes=int(CACHE_CONFIG["shared_max_mb"] * 1024 * 1024)
+)
@@ -0,0 +1,100 @@
+"""
+Sensitivity and scenario sweeps around a single crop prediction
+"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from model_training import ModelTrainer
+from schemas import ScenarioRequest, get_feature_bounds
+
+
+def build_scenarios(request: ScenarioRequest) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Build the base input and its one-at-a-time variants as one frame
+
+    Args:
+        request: Base input and per-feature perturbation ranges
+
+    Returns:
+        Tuple of (frame with the base input in row 0 followed by every
+        variant, one dict per perturbed feature with its ``changes``,
+        ``values`` and ``rows`` slice into the frame)
+    """
+    base = request.base.model_dump()
+    bounds = get_feature_bounds()
+
+    curves = []
+    start = 1
+    for feature, spec in request.perturbations.items():
+        changes = np.linspace(spec.low, spec.high, spec.steps).round(9)
+        if spec.mode == "relative":
+            values = base[feature] * (1 + changes)
+        else:
+            values = base[feature] + changes
+        values = np.clip(values, *bounds[feature])
+        curves.append({
+            'feature': feature,
+            'changes': changes,
+            'values': values,
+            'rows': slice(start, start + len(values))
+        })
+        start += len(values)
+
+    frame = pd.DataFrame([base] * start)
+    for curve in curves:
+        frame.iloc[curve['rows'], frame.columns.get_loc(curve['feature'])] = curve['values']
+
+    return frame, curves
+
+
+def score_scenarios(trainer: ModelTrainer, request: ScenarioRequest) -> Dict[str, Any]:
+    """
+    Score a base input and all of its variants in one vectorized pass
+
+    Returns:
+        ``ScenarioResponse`` fields: the base recommendation, a probability
+        curve per crop along each perturbed feature, and the fraction of
+        variants that keep the base recommendation
+    """
+    frame, curves = build_scenarios(request)
+    crops, confidences, probabilities = trainer.predict_frame(frame)
+    class_names = trainer.data_processor.get_all_crops()
+
+    base_crop = crops[0]
+    results = []
+    for curve in curves:
+        rows = curve['rows']
+        curve_crops = crops[rows]
+        curve_probabilities = probabilities[rows]
+        flipped = curve_crops != base_crop
+
+        shown = curve_probabilities.max(axis=0) >= request.min_probability
+        smallest_flip = None
+        if flipped.any():
+            flip_changes = curve['changes'][flipped]
+            smallest_flip = float(flip_changes[np.abs(flip_changes).argmin()])
+
+        results.append({
+            'feature': curve['feature'],
+            'changes': curve['changes'].tolist(),
+            'values': curve['values'].round(6).tolist(),
+            'predicted_crops': curve_crops.tolist(),
+            'probabilities': {
+                class_names[i]: curve_probabilities[:, i].astype(float).round(6).tolist()
+                for i in np.flatnonzero(shown)
+            },
+            'stability': float(1 - flipped.mean()),
+            'smallest_flip': smallest_flip
+        })
+
+    variants = crops[1:]
+    return {
+        'predicted_crop': base_crop,
+        'confidence': float(confidences[0]),
+        'stability': float((variants == base_crop).mean()),
+        'total_variants': len(variants),
+        'curves': results,
+        'model_version': trainer.model_metrics.get('model_version')
+    }
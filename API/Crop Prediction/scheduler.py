@@ -0,0 +1,12 @@
+"""
+Inference scheduler shared by the prediction endpoints, configured from SCHEDULER_CONFIG
+"""
+from config import SCHEDULER_CONFIG
+from serving.scheduler import InferenceScheduler
+
+# Global scheduler instance
+scheduler = InferenceScheduler(
+    workers=SCHEDULER_CONFIG["workers"],
+    slice_size=SCHEDULER_CONFIG["slice_size"],
+    window=SCHEDULER_CONFIG["metrics_window"]
+)
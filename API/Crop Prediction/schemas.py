@@ -1,8 +1,10 @@
 """
 Pydantic schemas for request and response validation
 """
-from typing import List, Optional
-from pydantic import BaseModel, Field, validator
+from typing import Dict, List, Literal, Optional, Tuple
+from pydantic import BaseModel, Field, field_validator, model_validator, validator
+
+from config import NEIGHBORS_CONFIG
 
 
 class CropPredictionRequest(BaseModel):
@@ -30,12 +32,25 @@ class CropPredictionRequest(BaseModel):
         }
 
 
+def get_feature_bounds() -> Dict[str, Tuple[float, float]]:
+    """Get the (min, max) bounds of each CropPredictionRequest feature"""
+    bounds = {}
+    for name, field in CropPredictionRequest.model_fields.items():
+        low = next(m.ge for m in field.metadata if hasattr(m, 'ge'))
+        high = next(m.le for m in field.metadata if hasattr(m, 'le'))
+        bounds[name] = (low, high)
+    return bounds
+
+
 class CropPredictionResponse(BaseModel):
     """Response schema for crop prediction"""
     
     predicted_crop: str = Field(..., description="Recommended crop")
     confidence: float = Field(..., ge=0, le=1, description="Prediction confidence (0-1)")
     all_probabilities: dict = Field(..., description="Probabilities for all crops")
+    degraded: bool = Field(
+        False, description="Approximate answer from the rule fallback while the model is unavailable or overloaded"
+    )
     
     class Config:
         json_schema_extra = {
@@ -69,6 +84,132 @@ class BatchPredictionResponse(BaseModel):
     total_predictions: int
     
     
+class PerturbationRange(BaseModel):
+    """Range of changes applied to one feature in a scenario sweep"""
+    
+    low: float = Field(..., description="Smallest change, e.g. -0.2 for 20% lower")
+    high: float = Field(..., description="Largest change, e.g. 0.2 for 20% higher")
+    steps: int = Field(9, ge=2, le=101, description="Evenly spaced changes from low to high")
+    mode: Literal["relative", "absolute"] = Field(
+        "relative", description="Changes as a fraction of the base value, or in feature units"
+    )
+    
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.low > self.high:
+            raise ValueError("low must not be greater than high")
+        return self
+
+
+class ScenarioRequest(BaseModel):
+    """Request schema for scenario sweeps around one input"""
+    
+    base: CropPredictionRequest
+    perturbations: Dict[str, PerturbationRange] = Field(
+        ..., min_length=1, description="Changes to try per feature, one feature at a time"
+    )
+    min_probability: float = Field(
+        0.01, ge=0, le=1, description="Omit crops whose probability stays below this along a curve"
+    )
+    
+    @field_validator("perturbations")
+    @classmethod
+    def check_features(cls, v):
+        unknown = sorted(set(v) - set(CropPredictionRequest.model_fields))
+        if unknown:
+            raise ValueError(f"Unknown features {unknown}, expected: {list(CropPredictionRequest.model_fields)}")
+        return v
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "base": CropPredictionRequest.Config.json_schema_extra["example"],
+                "perturbations": {
+                    "rainfall": {"low": -0.3, "high": 0.3, "steps": 7},
+                    "temperature": {"low": -3, "high": 3, "steps": 7, "mode": "absolute"}
+                }
+            }
+        }
+
+
+class ScenarioCurve(BaseModel):
+    """Predictions along the changes of one feature"""
+    
+    feature: str
+    changes: List[float] = Field(..., description="Changes applied, in the requested mode")
+    values: List[float] = Field(..., description="Resulting feature values, clipped to the valid range")
+    predicted_crops: List[str]
+    probabilities: Dict[str, List[float]] = Field(..., description="Probability curve per crop")
+    stability: float = Field(..., ge=0, le=1, description="Fraction of changes keeping the base recommendation")
+    smallest_flip: Optional[float] = Field(
+        None, description="Change of smallest magnitude that alters the recommendation"
+    )
+
+
+class ScenarioResponse(BaseModel):
+    """Response schema for scenario sweeps"""
+    
+    predicted_crop: str = Field(..., description="Recommendation for the base input")
+    confidence: float = Field(..., ge=0, le=1)
+    stability: float = Field(..., ge=0, le=1, description="Fraction of all variants keeping the base recommendation")
+    total_variants: int
+    curves: List[ScenarioCurve]
+    model_version: Optional[str] = None
+    
+    class Config:
+        protected_namespaces = ()
+
+
+class NeighborsRequest(BaseModel):
+    """Request schema for nearest historical samples lookups"""
+    
+    samples: List[CropPredictionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=NEIGHBORS_CONFIG["max_queries"],
+        description=f"Inputs to look up (max {NEIGHBORS_CONFIG['max_queries']})"
+    )
+    k: int = Field(5, ge=1, le=NEIGHBORS_CONFIG["max_k"], description="Neighbors per input")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "samples": [CropPredictionRequest.Config.json_schema_extra["example"]],
+                "k": 5
+            }
+        }
+
+
+class Neighbor(BaseModel):
+    """One historical sample near a query"""
+    
+    index: int = Field(..., description="Row of the sample in the training data")
+    distance: float = Field(..., ge=0, description="Euclidean distance in standardized feature units")
+    label: str = Field(..., description="Crop grown in the sample")
+    features: Dict[str, float]
+
+
+class NeighborResult(BaseModel):
+    """Nearest historical samples of one input, closest first"""
+    
+    neighbors: List[Neighbor]
+    label_counts: Dict[str, int] = Field(..., description="Number of neighbors per crop")
+
+
+class NeighborsResponse(BaseModel):
+    """Response schema for nearest historical samples lookups"""
+    
+    results: List[NeighborResult]
+    k: int
+    total_queries: int
+    index_size: int = Field(..., description="Historical samples in the index")
+    query_ms: float = Field(..., description="Time spent searching the index")
+    model_version: Optional[str] = None
+    
+    class Config:
+        protected_namespaces = ()
+
+
 class HealthResponse(BaseModel):
     """Health check response schema"""
     
@@ -91,4 +232,42 @@ class ModelInfoResponse(BaseModel):
     accuracy: Optional[float] = None
     
     class Config:
-        protected_namespaces = ()
\ No newline at end of file
+        protected_namespaces = ()
+
+class JobResponse(BaseModel):
+    """Batch job status response schema"""
+    
+    job_id: str
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    total_rows: Optional[int] = None
+    rows_done: int
+    rows_failed: int
+    progress: Optional[float] = Field(None, ge=0, le=1, description="Fraction of rows scored (0-1)")
+    rows_per_second: Optional[float] = None
+    model_version: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    
+    class Config:
+        protected_namespaces = ()
+
+
+class JobResultRow(BaseModel):
+    """One scored row of a batch job"""
+    
+    row: int
+    predicted_crop: Optional[str] = None
+    confidence: Optional[float] = None
+    error: Optional[str] = None
+
+
+class JobResultsResponse(BaseModel):
+    """Page of batch job results"""
+    
+    job_id: str
+    status: str
+    offset: int
+    results: List[JobResultRow]
+    next_offset: Optional[int] = Field(None, description="Offset of the next page, if more rows are available")
@@ -0,0 +1,213 @@
+"""
+Admission control and load shedding for the prediction routes
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .scheduler import InferenceScheduler, INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+# Shed reasons, reported in the counters and the error detail
+CONCURRENCY = "concurrency"
+QUEUE_DEPTH = "queue_depth"
+QUEUE_WAIT = "queue_wait"
+CLIENT_SHARE = "client_share"
+
+
+class Rejected(Exception):
+    """A request refused by admission control"""
+
+    def __init__(self, reason: str, status_code: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Decides whether a request may start, and tracks what was shed
+
+    A request is refused when the inference queue is already too deep or
+    its interactive wait over the last few seconds is too long, when the
+    client already holds its fair share of the in-flight slots, or when no
+    slot frees up within the allowed wait. Refusing at the door keeps queued work bounded, so
+    the requests that are admitted still finish in time.
+    """
+
+    def __init__(self, scheduler: InferenceScheduler, config: Dict[str, Any]):
+        self.scheduler = scheduler
+        self.config = config
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.per_client = defaultdict(int)
+        self.admitted = 0
+        self.shed = {reason: 0 for reason in (CONCURRENCY, QUEUE_DEPTH, QUEUE_WAIT, CLIENT_SHARE)}
+        self._queue_wait = (0.0, 0.0)
+
+    def _recent_queue_wait(self) -> float:
+        """
+        p95 interactive queue wait in seconds over the last
+        ``queue_wait_window_seconds``, refreshed at most every 250 ms
+
+        Shed requests never reach the queue, so only a time window lets the
+        measurement fall back, to 0 once no call has waited recently, and
+        admission resume after the load drops.
+        """
+        checked_at, wait = self._queue_wait
+        now = time.monotonic()
+        if now - checked_at > 0.25:
+            wait = self.scheduler.recent_wait(INTERACTIVE, 95, self.config["queue_wait_window_seconds"])
+            self._queue_wait = (now, wait)
+        return wait
+
+    def _retry_after(self) -> int:
+        """Seconds a client should wait before retrying, from the current queue wait"""
+        return max(1, math.ceil(self._recent_queue_wait() + self.config["max_wait_seconds"]))
+
+    def _client_limit(self) -> int:
+        share = self.config["client_share"]
+        return max(1, int(self.config["max_in_flight"] * share)) if share else 0
+
+    def _reject(self, reason: str, status_code: int) -> Rejected:
+        self.shed[reason] += 1
+        return Rejected(reason, status_code, self._retry_after())
+
+    async def acquire(self, client: str):
+        """Admit a request or raise ``Rejected``"""
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.config["max_in_flight"])
+
+        if self.scheduler.queue_depth() >= self.config["max_queue_depth"]:
+            raise self._reject(QUEUE_DEPTH, 503)
+        if self._recent_queue_wait() * 1000 >= self.config["max_queue_wait_ms"]:
+            raise self._reject(QUEUE_WAIT, 503)
+
+        client_limit = self._client_limit()
+        if client_limit and self.per_client[client] >= client_limit:
+            raise self._reject(CLIENT_SHARE, 429)
+
+        if self.slots.locked():
+            if self.waiting >= self.config["max_waiting"]:
+                raise self._reject(CONCURRENCY, 503)
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self.slots.acquire(), self.config["max_wait_seconds"])
+            except asyncio.TimeoutError:
+                raise self._reject(CONCURRENCY, 503)
+            finally:
+                self.waiting -= 1
+        else:
+            await self.slots.acquire()
+
+        self.in_flight += 1
+        self.per_client[client] += 1
+        self.admitted += 1
+
+    def release(self, client: str):
+        self.in_flight -= 1
+        self.per_client[client] -= 1
+        if not self.per_client[client]:
+            del self.per_client[client]
+        self.slots.release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Admission counters and current load"""
+        return {
+            'enabled': self.config["enabled"],
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'max_in_flight': self.config["max_in_flight"],
+            'active_clients': len(self.per_client),
+            'admitted': self.admitted,
+            'shed': dict(self.shed),
+            'shed_total': sum(self.shed.values())
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware applying an ``AdmissionController`` to the prediction routes
+
+    Requests to ``degraded_paths``, or to paths starting with one of
+    ``degraded_prefixes``, that are shed for load rather than refused for
+    their client's share still reach the route, without a
+    slot and with the shed reason in ``request.state.overloaded``, so the
+    route can answer them degraded.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        path_prefixes: Tuple[str, ...],
+        degraded_paths: Tuple[str, ...] = (),
+        degraded_prefixes: Tuple[str, ...] = ()
+    ):
+        self.app = app
+        self.controller = controller
+        self.path_prefixes = path_prefixes
+        self.degraded_paths = degraded_paths
+        self.degraded_prefixes = degraded_prefixes
+
+    def degrades(self, path: str) -> bool:
+        """Whether shed requests to ``path`` reach the route to be answered degraded"""
+        return path in self.degraded_paths or path.startswith(self.degraded_prefixes)
+
+    @staticmethod
+    def client_key(scope: Scope) -> str:
+        """Fair-share key: the X-Client-Id header, else the client address"""
+        for name, value in scope.get("headers", []):
+            if name == b"x-client-id":
+                return "id:" + value.decode("latin-1")
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.controller.config["enabled"]
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        client = self.client_key(scope)
+        try:
+            await self.controller.acquire(client)
+        except Rejected as e:
+            if e.status_code == 503 and self.degrades(scope["path"]):
+                scope.setdefault("state", {})["overloaded"] = e.reason
+                await self.app(scope, receive, send)
+            else:
+                await self._send_rejection(send, e)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(client)
+
+    @staticmethod
+    async def _send_rejection(send: Send, rejection: Rejected):
+        detail = "Too many requests from this client" if rejection.status_code == 429 else "Service overloaded"
+        body = json.dumps({"detail": f"{detail}, retry later", "reason": rejection.reason}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": rejection.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rejection.retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,142 @@
+"""
+Negotiated gzip and brotli compression of responses
+"""
+import gzip
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def choose_encoding(accept_encoding: str, codings: Tuple[str, ...]) -> Optional[str]:
+    """
+    Content coding to use for an ``Accept-Encoding`` header
+
+    Args:
+        accept_encoding: Header value, e.g. ``"gzip, br;q=0.8"``
+        codings: Codings the server offers, most preferred first
+
+    Returns:
+        The offered coding with the highest q-value, ties going to the
+        server's preference, or None if the client accepts none of them
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, *params = [part.strip() for part in item.split(";")]
+        weight = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    weight = float(param[2:])
+                except ValueError:
+                    weight = 0.0
+        if name:
+            weights[name.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in codings:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses for clients that accept it
+
+    Brotli is offered when the ``brotli`` package is installed, then gzip.
+    A body sent in one message of at least ``minimum_size`` bytes is
+    compressed; streamed responses, smaller bodies and bodies that already
+    have a ``Content-Encoding`` pass through unchanged. A compressed
+    response's ETag gets the coding as a suffix, e.g. ``"abc-gzip"``, so
+    each representation keeps a distinct strong validator.
+
+    A ``304 Not Modified`` has no body to measure, so its ETag gets the
+    suffix of the coding negotiated for this request when the client
+    revalidates a tag that carries a coding suffix: the body was then large
+    enough to compress, and the 200 would be sent compressed again. A
+    client revalidating an unsuffixed tag gets the ETag unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.codings = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def compress(self, coding: str, body: bytes) -> bytes:
+        if coding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def not_modified_start(self, start: Message, coding: str, if_none_match: str) -> Message:
+        """Start of a 304 carrying the ETag the 200 for this ``Accept-Encoding`` would carry"""
+        headers = MutableHeaders(raw=list(start["headers"]))
+        etag = headers.get("etag")
+        if etag is None or not etag.endswith('"'):
+            return start
+        opaque = etag.removeprefix("W/").strip('"')
+        suffixed = any(
+            tag.strip().removeprefix("W/").strip('"').startswith(f"{opaque}-")
+            for tag in if_none_match.split(",")
+        )
+        if not suffixed:
+            return start
+        headers["ETag"] = f'{etag[:-1]}-{coding}"'
+        headers.add_vary_header("Accept-Encoding")
+        return {**start, "headers": headers.raw}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.codings)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match", "")
+        start: Optional[Message] = None
+        decided = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, decided
+            if decided:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    decided = True
+                    await send(self.not_modified_start(message, coding, if_none_match))
+                    return
+                start = message
+                return
+
+            # First body message: compress it if it is the whole, large enough body
+            decided = True
+            headers = MutableHeaders(raw=list(start["headers"]))
+            body = message.get("body", b"")
+            if message.get("more_body", False) or "content-encoding" in headers or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            body = self.compress(coding, body)
+            headers["Content-Encoding"] = coding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag is not None and etag.endswith('"'):
+                headers["ETag"] = f'{etag[:-1]}-{coding}"'
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
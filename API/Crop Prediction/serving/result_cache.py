@@ -0,0 +1,278 @@
+"""
+Two-tier prediction result cache shared by the API workers on a host
+"""
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries BEGIN
+    UPDATE usage SET entries = entries + 1, bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_update AFTER UPDATE OF size ON entries BEGIN
+    UPDATE usage SET bytes = bytes + NEW.size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries BEGIN
+    UPDATE usage SET entries = entries - 1, bytes = bytes - OLD.size;
+END;
+"""
+
+# Entries removed per statement while evicting
+EVICT_BATCH = 64
+
+# Entries are evicted down to this fraction of the size limit
+EVICT_TARGET = 0.9
+
+# Access times are refreshed at most this often, to keep reads read-only
+TOUCH_INTERVAL = 60.0
+
+
+class PredictionCache:
+    """
+    Prediction results cached in process and in a SQLite file shared by all workers
+
+    The first tier is a small LRU dictionary private to the worker. The
+    second tier is a SQLite database in WAL mode, so every uvicorn worker
+    on the host reads the results any of them computed, and readers never
+    block the writer. Once the shared tier grows past its size limit the
+    least recently used entries are evicted. Values must be JSON
+    serializable.
+
+    The cache never fails a request: a locked or unreadable database is
+    treated as a miss and logged. Coroutines use ``aget`` and ``aset``,
+    which serve the memory tier inline and run the shared tier on a worker
+    thread, so a worker waiting for another worker's write lock never
+    stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = 0,
+        shared_path: Optional[Path] = None,
+        shared_max_bytes: int = 0,
+        busy_timeout: float = 0.05
+    ):
+        self.memory_entries = memory_entries
+        self.shared_path = Path(shared_path) if shared_path else None
+        self.shared_max_bytes = shared_max_bytes
+        self.busy_timeout = busy_timeout
+
+        self.memory: OrderedDict = OrderedDict()
+        # Guards the memory tier and the counters; held only briefly
+        self.lock = threading.Lock()
+        # Serializes use of the shared connection, which may block on other workers
+        self.shared_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+
+        self.stats = {
+            'memory_hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection to the shared tier, opened once per process"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self.shared_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.shared_path), timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _count(self, stat: str, n: int = 1):
+        with self.lock:
+            self.stats[stat] += n
+
+    def _remember(self, key: str, value: Any):
+        if not self.memory_entries:
+            return
+        with self.lock:
+            self.memory[key] = value
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_entries:
+                self.memory.popitem(last=False)
+
+    def _memory_get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self.memory[key]
+        return None
+
+    def _shared_get(self, key: str) -> Optional[Any]:
+        """Shared tier lookup, counted as a shared hit or a miss"""
+        if self.shared_path:
+            try:
+                with self.shared_lock:
+                    conn = self._connection()
+                    row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+                    now = time.time()
+                    if row is not None and now - row[1] > TOUCH_INTERVAL:
+                        try:
+                            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                        except sqlite3.OperationalError:
+                            # Another worker holds the write lock; the next hit retries
+                            pass
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self._count('shared_hits')
+                    return value
+            except sqlite3.Error as e:
+                self._count('errors')
+                logger.warning(f"Shared cache read failed: {e}")
+
+        self._count('misses')
+        return None
+
+    def _shared_set(self, key: str, value: Any):
+        """Store a value in the shared tier, evicting when it is full"""
+        if not self.shared_path:
+            return
+
+        encoded = json.dumps(value, separators=(",", ":")).encode()
+        try:
+            with self.shared_lock:
+                conn = self._connection()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        "INSERT INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET "
+                        "value = excluded.value, size = excluded.size, accessed = excluded.accessed",
+                        (key, encoded, len(encoded), time.time())
+                    )
+                    self._count('writes')
+                    self._evict(conn)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            self._count('errors')
+            logger.warning(f"Shared cache write failed: {e}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for a key, or None on a miss"""
+        value = self._memory_get(key)
+        return value if value is not None else self._shared_get(key)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """``get`` for coroutines, reading the shared tier on a worker thread"""
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        if not self.shared_path:
+            # Only counts the miss
+            return self._shared_get(key)
+        return await run_in_threadpool(self._shared_get, key)
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers, evicting from the shared tier when it is full"""
+        self._remember(key, value)
+        self._shared_set(key, value)
+
+    async def aset(self, key: str, value: Any):
+        """``set`` for coroutines, writing the shared tier on a worker thread"""
+        self._remember(key, value)
+        if self.shared_path:
+            await run_in_threadpool(self._shared_set, key, value)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Remove least recently used entries until the shared tier is under its target size"""
+        if not self.shared_max_bytes:
+            return
+        entries, size = conn.execute("SELECT entries, bytes FROM usage").fetchone()
+        if size <= self.shared_max_bytes:
+            return
+        target = self.shared_max_bytes * EVICT_TARGET
+        while size > target and entries:
+            # Enough entries of average size to reach the target, at most a batch at a time
+            count = min(EVICT_BATCH, math.ceil((size - target) / (size / entries)))
+            removed = conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                (count,)
+            ).rowcount
+            if not removed:
+                break
+            self._count('evictions', removed)
+            entries, size = conn.execute("SELECT entries, bytes FROM usage").fetchone()
+
+    def clear(self) -> bool:
+        """
+        Drop every cached result, in this worker and in the shared tier
+
+        Returns:
+            False if the shared tier could not be cleared, e.g. because
+            another worker held its write lock
+        """
+        with self.lock:
+            self.memory.clear()
+        if not self.shared_path:
+            return True
+        try:
+            with self.shared_lock:
+                self._connection().execute("DELETE FROM entries")
+            return True
+        except sqlite3.Error as e:
+            self._count('errors')
+            logger.warning(f"Shared cache clear failed: {e}")
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rates for this worker and the size of the shared tier"""
+        with self.lock:
+            stats = dict(self.stats)
+            memory_size = len(self.memory)
+        lookups = stats['memory_hits'] + stats['shared_hits'] + stats['misses']
+        stats['lookups'] = lookups
+        stats['hit_ratio'] = (
+            round((stats['memory_hits'] + stats['shared_hits']) / lookups, 4) if lookups else 0.0
+        )
+        stats['memory'] = {'entries': memory_size, 'max_entries': self.memory_entries}
+
+        shared = {'enabled': self.shared_path is not None}
+        if self.shared_path:
+            shared.update(path=str(self.shared_path), max_bytes=self.shared_max_bytes)
+            try:
+                with self.shared_lock:
+                    entries, size = self._connection().execute("SELECT entries, bytes FROM usage").fetchone()
+                shared.update(entries=entries, bytes=size)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared cache stats failed: {e}")
+        stats['shared'] = shared
+        stats['pid'] = os.getpid()
+        return stats
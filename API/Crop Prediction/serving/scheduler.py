@@ -0,0 +1,182 @@
+"""
+Priority-aware inference scheduler shared by the prediction endpoints
+"""
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Lower values run first
+INTERACTIVE = 0
+BATCH = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+class InferenceScheduler:
+    """
+    Runs model calls on a fixed set of worker threads in priority order
+
+    Interactive requests are always taken from the queue before batch work.
+    Batches are split into slices that are queued one after another, so a
+    large batch yields to interactive requests between slices instead of
+    holding a worker for its whole duration.
+    """
+
+    def __init__(self, workers: int = 1, slice_size: int = 16, window: int = 2048):
+        self.workers = workers
+        self.slice_size = slice_size
+        self.queue = queue.PriorityQueue()
+        self.threads: List[threading.Thread] = []
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+
+        self.stats = {
+            priority: {
+                'submitted': 0,
+                'completed': 0,
+                'failed': 0,
+                'queued': 0,
+                'waits': deque(maxlen=window),
+                'max_wait': 0.0
+            }
+            for priority in PRIORITY_NAMES
+        }
+
+    def start(self):
+        """Start the worker threads if they are not running"""
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def shutdown(self):
+        """Stop the worker threads once the queued work has run"""
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for _ in threads:
+            # Sorts after every real task
+            self.queue.put((float("inf"), next(self.sequence), 0.0, None, None, None))
+        for thread in threads:
+            thread.join()
+
+    def _worker(self):
+        while True:
+            priority, _, enqueued_at, fn, args, future = self.queue.get()
+            if fn is None:
+                return
+
+            stats = self.stats[priority]
+            wait = time.perf_counter() - enqueued_at
+            with self.lock:
+                stats['queued'] -= 1
+                stats['waits'].append((time.monotonic(), wait))
+                stats['max_wait'] = max(stats['max_wait'], wait)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+                with self.lock:
+                    stats['completed'] += 1
+            except BaseException as e:
+                future.set_exception(e)
+                with self.lock:
+                    stats['failed'] += 1
+
+    def submit(self, fn: Callable, *args, priority: int = INTERACTIVE) -> Future:
+        """Queue a call and return a future for its result"""
+        if not self.threads:
+            self.start()
+
+        future = Future()
+        with self.lock:
+            self.stats[priority]['submitted'] += 1
+            self.stats[priority]['queued'] += 1
+        self.queue.put((priority, next(self.sequence), time.perf_counter(), fn, args, future))
+        return future
+
+    async def run(self, fn: Callable, *args, priority: int = INTERACTIVE) -> Any:
+        """Run a call through the scheduler and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, priority=priority))
+
+    async def run_sliced(
+        self,
+        fn: Callable[[list], list],
+        items: list,
+        priority: int = BATCH,
+        slice_size: int = None
+    ) -> list:
+        """
+        Run a batch call in slices, queueing each slice after the previous one finishes
+
+        Args:
+            fn: Function taking a list of items and returning a list of results
+            items: Items to process
+            priority: Queue priority of every slice
+            slice_size: Items per slice (default: the scheduler's slice size)
+
+        Returns:
+            Concatenated results in item order
+        """
+        slice_size = slice_size or self.slice_size
+        results = []
+        for start in range(0, len(items), slice_size):
+            results.extend(await self.run(fn, items[start:start + slice_size], priority=priority))
+        return results
+
+    def queue_depth(self) -> int:
+        """Calls waiting for a worker, over all priorities"""
+        return self.queue.qsize()
+
+    def recent_wait(self, priority: int, percentile: float, max_age: Optional[float] = None) -> float:
+        """
+        Percentile of recent queue waits for a priority, in seconds
+
+        Args:
+            priority: Priority whose waits are measured
+            percentile: Percentile to return, 0 to 100
+            max_age: Only count calls that left the queue within this many
+                seconds; with none, the result is 0.0
+        """
+        oldest = time.monotonic() - max_age if max_age is not None else float("-inf")
+        with self.lock:
+            waits = [wait for taken_at, wait in self.stats[priority]['waits'] if taken_at >= oldest]
+        return float(np.percentile(waits, percentile)) if waits else 0.0
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput and queue wait percentiles per priority"""
+        metrics = {}
+        with self.lock:
+            for priority, stats in self.stats.items():
+                waits_ms = np.array([wait for _, wait in stats['waits']]) * 1000
+                metrics[PRIORITY_NAMES[priority]] = {
+                    'submitted': stats['submitted'],
+                    'completed': stats['completed'],
+                    'failed': stats['failed'],
+                    'queue_depth': stats['queued'],
+                    'wait_ms': {
+                        'mean': round(float(waits_ms.mean()), 3) if len(waits_ms) else None,
+                        'p50': round(float(np.percentile(waits_ms, 50)), 3) if len(waits_ms) else None,
+                        'p95': round(float(np.percentile(waits_ms, 95)), 3) if len(waits_ms) else None,
+                        'p99': round(float(np.percentile(waits_ms, 99)), 3) if len(waits_ms) else None,
+                        'max': round(stats['max_wait'] * 1000, 3)
+                    }
+                }
+        return {
+            'workers': self.workers,
+            'slice_size': self.slice_size,
+            'priorities': metrics
+        }
@@ -33,7 +33,8 @@ def create_directories():
 
 def check_data_file():
     """Check if data file exists"""
-    data_file = Path("data/Crop_recommendation.csv")
+    from config import TRAINING_DATA_PATH
+    data_file = TRAINING_DATA_PATH
     if not data_file.exists():
         print("⚠️  Warning: Crop_recommendation.csv not found in data/ directory")
         print("   Please place your dataset in data/Crop_recommendation.csv")
@@ -62,7 +63,8 @@ def train_initial_model():
     print("🚀 Training initial model...")
     try:
         from model_training import train_and_save_model
-        results = train_and_save_model("data/Crop_recommendation.csv")
+        from config import TRAINING_DATA_PATH
+        results = train_and_save_model(str(TRAINING_DATA_PATH))
         print("✓ Model trained successfully")
         print(f"  - Test Accuracy: {results['metrics']['test_accuracy']:.4f}")
         print(f"  - Training Samples: {results['metrics']['train_samples']}")
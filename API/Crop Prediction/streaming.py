@@ -0,0 +1,133 @@
+"""
+Incremental NDJSON/CSV parsing and streaming responses for bulk scoring
+"""
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from schemas import get_feature_bounds
+
+# Longest accepted input line; guards memory against unterminated input
+MAX_LINE_BYTES = 64 * 1024
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    Streaming response that may keep reading the request body while it sends
+
+    ``StreamingResponse`` listens for client disconnects by consuming
+    ``receive`` messages, which would swallow request body chunks that have
+    not been read yet. Disconnects are detected by ``Request.stream()``
+    instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(request: Request) -> AsyncIterator[str]:
+    """Yield decoded, non-empty lines from the request body as it arrives"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValueError(f"Input line longer than {MAX_LINE_BYTES} bytes")
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield line.decode("utf-8")
+
+    buffer = buffer.strip()
+    if buffer:
+        yield buffer.decode("utf-8")
+
+
+async def iter_records(request: Request, fmt: str) -> AsyncIterator[Any]:
+    """
+    Yield raw input records from an NDJSON or CSV request body
+
+    NDJSON lines yield dictionaries; CSV rows yield dictionaries keyed by the
+    header row. Lines that cannot be parsed yield the parse error message.
+    """
+    header = None
+    async for line in iter_lines(request):
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f"Invalid JSON: {e}"
+                continue
+            yield record if isinstance(record, dict) else "Each line must be a JSON object"
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield f"Expected {len(header)} CSV fields, got {len(values)}"
+                continue
+            yield dict(zip(header, values))
+
+
+def validate_frame(frame: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+    """
+    Check a numeric frame against the request schema bounds
+
+    Args:
+        frame: Frame with the raw feature columns, NaN where a value is
+            missing or not a number
+
+    Returns:
+        Tuple of (invalid row mask, error message per row, empty for valid rows)
+    """
+    invalid = np.zeros(len(frame), dtype=bool)
+    reasons = [[] for _ in range(len(frame))]
+    for name, (low, high) in get_feature_bounds().items():
+        values = frame[name].to_numpy(dtype=float)
+        missing = np.isnan(values)
+        out_of_range = ~missing & ((values < low) | (values > high))
+        for i in np.flatnonzero(missing):
+            reasons[i].append(f"{name} is missing or not a number")
+        for i in np.flatnonzero(out_of_range):
+            reasons[i].append(f"{name} must be between {low} and {high}")
+        invalid |= missing | out_of_range
+
+    return invalid, ["; ".join(reason) for reason in reasons]
+
+
+def validate_chunk(
+    records: List[Any],
+    feature_columns: List[str]
+) -> Tuple[pd.DataFrame, np.ndarray, Dict[int, str]]:
+    """
+    Validate a chunk of records against the request schema bounds
+
+    Args:
+        records: Parsed records, or error messages for unparseable lines
+        feature_columns: Raw feature columns the model expects
+
+    Returns:
+        Tuple of (valid rows frame, positions of valid rows within the chunk,
+        error message by position for invalid rows)
+    """
+    errors = {i: record for i, record in enumerate(records) if isinstance(record, str)}
+    positions = np.array([i for i in range(len(records)) if i not in errors], dtype=int)
+
+    frame = pd.DataFrame(
+        [records[i] for i in positions], columns=feature_columns
+    ).apply(pd.to_numeric, errors="coerce")
+
+    invalid, reasons = validate_frame(frame)
+    for i in np.flatnonzero(invalid):
+        errors[int(positions[i])] = reasons[i]
+
+    return frame[~invalid], positions[~invalid], errors
@@ -0,0 +1,172 @@
+"""
+Seeded synthetic dataset generator for load and scale testing
+"""
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from schemas import get_feature_bounds
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEATURES = ['N', 'P', 'K', 'temperature', 'humidity', 'ph', 'rainfall']
+
+# Per-crop feature means and standard deviations, in FEATURES order,
+# estimated from Crop_recommendation.csv
+CROP_PROFILES = {
+    'apple': ((20.8, 134.2, 199.9, 22.6, 92.3, 5.93, 112.7), (11.9, 8.1, 3.3, 0.8, 1.5, 0.27, 7.1)),
+    'banana': ((100.2, 82.0, 50.0, 27.4, 80.4, 5.98, 104.6), (11.1, 7.7, 3.4, 1.4, 2.8, 0.27, 9.4)),
+    'blackgram': ((40.0, 67.5, 19.2, 30.0, 65.1, 7.13, 67.9), (12.7, 7.2, 3.2, 2.7, 2.8, 0.37, 4.2)),
+    'chickpea': ((40.1, 67.8, 79.9, 18.9, 16.9, 7.34, 80.1), (12.2, 7.5, 3.3, 1.2, 1.7, 0.80, 7.9)),
+    'coconut': ((22.0, 16.9, 30.6, 27.4, 94.8, 5.98, 175.7), (11.8, 8.4, 3.0, 1.4, 2.7, 0.29, 29.5)),
+    'coffee': ((101.2, 28.7, 29.9, 25.5, 58.9, 6.79, 158.1), (12.3, 7.3, 3.2, 1.5, 5.8, 0.42, 25.7)),
+    'cotton': ((117.8, 46.2, 19.6, 24.0, 79.8, 6.91, 80.4), (11.6, 7.3, 3.2, 1.1, 3.1, 0.63, 11.2)),
+    'grapes': ((23.2, 132.5, 200.1, 23.8, 81.9, 6.03, 69.6), (12.5, 7.6, 3.3, 9.7, 1.2, 0.30, 3.0)),
+    'jute': ((78.4, 46.9, 40.0, 25.0, 79.6, 6.73, 174.8), (11.0, 7.2, 3.3, 1.2, 5.5, 0.45, 15.1)),
+    'kidneybeans': ((20.8, 67.5, 20.1, 20.1, 21.6, 5.75, 105.9), (10.8, 7.6, 3.1, 2.6, 2.2, 0.15, 26.1)),
+    'lentil': ((18.8, 68.4, 19.4, 24.5, 64.8, 6.93, 45.7), (12.2, 7.3, 3.0, 3.3, 2.9, 0.55, 5.6)),
+    'maize': ((77.8, 48.4, 19.8, 22.4, 65.1, 6.25, 84.8), (11.9, 8.0, 2.9, 2.7, 5.4, 0.41, 15.5)),
+    'mango': ((20.1, 27.2, 29.9, 31.2, 50.2, 5.77, 94.7), (12.3, 7.7, 3.1, 2.7, 2.8, 0.70, 3.3)),
+    'mothbeans': ((21.4, 48.0, 20.2, 28.2, 53.2, 6.83, 51.2), (11.3, 7.5, 3.0, 2.2, 7.0, 1.86, 13.8)),
+    'mungbean': ((21.0, 47.3, 19.9, 28.5, 85.5, 6.72, 48.4), (11.5, 7.9, 3.1, 0.8, 2.9, 0.29, 7.1)),
+    'muskmelon': ((100.3, 17.7, 50.1, 28.7, 92.3, 6.36, 24.7), (12.2, 7.2, 3.2, 0.9, 1.5, 0.23, 2.8)),
+    'orange': ((19.6, 16.6, 10.0, 22.8, 92.2, 7.02, 110.5), (11.9, 7.7, 3.1, 7.3, 1.4, 0.58, 5.7)),
+    'papaya': ((49.9, 59.0, 50.0, 33.7, 92.4, 6.74, 142.6), (12.2, 7.1, 3.1, 6.3, 1.4, 0.15, 64.4)),
+    'pigeonpeas': ((20.7, 67.7, 20.3, 27.7, 48.1, 5.79, 149.5), (11.8, 7.3, 2.8, 5.7, 11.0, 0.83, 33.0)),
+    'pomegranate': ((18.9, 18.8, 40.2, 21.8, 90.1, 6.43, 107.5), (12.6, 7.4, 3.0, 2.2, 2.8, 0.49, 2.9)),
+    'rice': ((79.9, 47.6, 39.9, 23.7, 82.3, 6.43, 236.2), (11.9, 7.9, 2.9, 2.0, 1.4, 0.77, 34.3)),
+    'watermelon': ((99.4, 17.0, 50.2, 25.6, 85.2, 6.50, 50.8), (12.6, 7.5, 3.3, 0.9, 3.0, 0.28, 5.9)),
+}
+
+# Within-crop correlation of the feature deviations, in FEATURES order:
+# fertilised soils are richer in all of N, P and K, wet spells raise
+# humidity and rainfall together and lower temperature
+FEATURE_CORRELATION = np.array([
+    # N     P     K     temp  hum   ph    rain
+    [1.00, 0.25, 0.20, 0.00, 0.00, 0.00, 0.00],
+    [0.25, 1.00, 0.25, 0.00, 0.00, 0.00, 0.00],
+    [0.20, 0.25, 1.00, 0.00, 0.00, 0.00, 0.00],
+    [0.00, 0.00, 0.00, 1.00, -0.30, 0.00, -0.20],
+    [0.00, 0.00, 0.00, -0.30, 1.00, 0.00, 0.50],
+    [0.00, 0.00, 0.00, 0.00, 0.00, 1.00, 0.00],
+    [0.00, 0.00, 0.00, -0.20, 0.50, 0.00, 1.00],
+])
+
+
+def generate_chunk(n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """
+    Generate one chunk of labelled crop recommendation rows
+
+    Args:
+        n_rows: Number of rows to generate
+        rng: Random generator
+
+    Returns:
+        DataFrame with the Crop_recommendation.csv columns
+    """
+    crops = np.array(list(CROP_PROFILES), dtype=object)
+    means = np.array([CROP_PROFILES[c][0] for c in crops])
+    stds = np.array([CROP_PROFILES[c][1] for c in crops])
+
+    crop_idx = rng.integers(0, len(crops), n_rows)
+    deviations = rng.standard_normal((n_rows, len(FEATURES))) @ np.linalg.cholesky(FEATURE_CORRELATION).T
+    values = means[crop_idx] + stds[crop_idx] * deviations
+
+    # Keep every row valid for CropPredictionRequest
+    bounds = get_feature_bounds()
+    low = np.array([bounds[f][0] for f in FEATURES])
+    high = np.array([bounds[f][1] for f in FEATURES])
+    np.clip(values, low, high, out=values)
+
+    data = pd.DataFrame(values, columns=FEATURES)
+    data['label'] = crops[crop_idx]
+    return data
+
+
+def generate_chunks(n_rows: int, chunk_size: int = 100_000, seed: int = 42) -> Iterator[pd.DataFrame]:
+    """
+    Generate a dataset as a stream of chunks
+
+    Args:
+        n_rows: Total number of rows
+        chunk_size: Rows per chunk
+        seed: Random seed; the same seed and chunk size give the same data
+
+    Yields:
+        DataFrame chunks
+    """
+    seeds = np.random.SeedSequence(seed).spawn((n_rows + chunk_size - 1) // chunk_size)
+    for chunk_seed, start in zip(seeds, range(0, n_rows, chunk_size)):
+        yield generate_chunk(min(chunk_size, n_rows - start), np.random.default_rng(chunk_seed))
+
+
+def generate_dataset(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Generate a dataset in memory"""
+    return pd.concat(generate_chunks(n_rows, seed=seed), ignore_index=True)
+
+
+def write_dataset(chunks: Iterator[pd.DataFrame], output_path: str) -> int:
+    """
+    Stream chunks to a CSV or Parquet file, chosen by file extension
+
+    Args:
+        chunks: DataFrame chunks to write
+        output_path: Destination ``.csv`` or ``.parquet`` file
+
+    Returns:
+        Number of rows written
+    """
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    total = 0
+
+    if path.suffix == '.parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                total += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif path.suffix == '.csv':
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            total += len(chunk)
+    else:
+        raise ValueError(f"Unsupported output format: {path.suffix} (use .csv or .parquet)")
+
+    return total
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Generate a synthetic crop recommendation dataset")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows (default: 100000)")
+    parser.add_argument("--output", default="data/synthetic_crop_data.csv", help="Output .csv or .parquet file")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows generated per chunk")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    total = write_dataset(generate_chunks(args.rows, args.chunk_size, args.seed), args.output)
+    logger.info(f"Wrote {total} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
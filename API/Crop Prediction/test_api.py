@@ -6,6 +6,10 @@ import json
 import time
 from typing import Dict, Any
 
+import numpy as np
+
+from serving.columnar import MEDIA_TYPE as COLUMNAR_MEDIA_TYPE, decode, encode
+
 
 class CropAPITester:
     """Test the Crop Recommendation API endpoints"""
@@ -129,6 +133,157 @@ class CropAPITester:
         except Exception as e:
             print(f"Batch prediction test failed: {e}")
     
+    def test_stream_prediction(self):
+        """Test streaming bulk prediction endpoint"""
+        rows = [
+            {"N": 90, "P": 42, "K": 43, "temperature": 20.87, "humidity": 82.0, "ph": 6.5, "rainfall": 202.9},
+            {"N": 85, "P": 58, "K": 41, "temperature": 21.77, "humidity": 80.32, "ph": 7.04, "rainfall": 226.66},
+            {"N": -10, "P": 42, "K": 43, "temperature": 20.87, "humidity": 82.0, "ph": 6.5, "rainfall": 202.9}
+        ]
+        body = "\n".join(json.dumps(row) for row in rows)
+        
+        try:
+            response = requests.post(
+                f"{self.base_url}/predict/stream",
+                data=body,
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+            print(f"Stream Prediction: {response.status_code}")
+            if response.status_code == 200:
+                for line in response.text.splitlines():
+                    result = json.loads(line)
+                    if "error" in result:
+                        print(f"Row {result['row']}: error - {result['error']}")
+                    else:
+                        print(f"Row {result['row']}: {result['predicted_crop']} "
+                              f"(confidence: {result['confidence']:.4f})")
+            else:
+                print(f"Error: {response.text}")
+        except Exception as e:
+            print(f"Stream prediction test failed: {e}")
+    
+    def test_columnar_batch(self):
+        """Test batch prediction with columnar binary bodies"""
+        columns = {
+            "N": [90, 85, 60], "P": [42, 58, 55], "K": [43, 41, 44],
+            "temperature": [20.87, 21.77, 23.0], "humidity": [82.0, 80.32, 82.32],
+            "ph": [6.5, 7.04, 7.84], "rainfall": [202.9, 226.66, 263.96]
+        }
+        body = encode({name: np.asarray(values, dtype="<f4") for name, values in columns.items()})
+        
+        try:
+            response = requests.post(
+                f"{self.base_url}/predict/batch",
+                params={"top_k": 3},
+                data=body,
+                headers={"Content-Type": COLUMNAR_MEDIA_TYPE}
+            )
+            print(f"Columnar Batch Prediction: {response.status_code} ({len(body)} bytes sent)")
+            if response.status_code == 200:
+                results = decode(response.content)
+                for i, (crop, confidence) in enumerate(zip(results["predicted_crop"], results["confidence"])):
+                    print(f"Sample {i+1}: {crop} (confidence: {confidence:.4f}, "
+                          f"runner-up: {results['top_2_crop'][i]})")
+            else:
+                print(f"Error: {response.text}")
+        except Exception as e:
+            print(f"Columnar batch prediction test failed: {e}")
+    
+    def test_scenarios(self):
+        """Test scenario sweep endpoint"""
+        body = {
+            "base": {
+                "N": 90, "P": 42, "K": 43,
+                "temperature": 20.87, "humidity": 82.0,
+                "ph": 6.5, "rainfall": 202.9
+            },
+            "perturbations": {
+                "rainfall": {"low": -0.3, "high": 0.3, "steps": 7},
+                "temperature": {"low": -3, "high": 3, "steps": 7, "mode": "absolute"}
+            }
+        }
+        
+        try:
+            response = requests.post(f"{self.base_url}/predict/scenarios", json=body)
+            print(f"Scenarios: {response.status_code}")
+            if response.status_code == 200:
+                data = response.json()
+                print(f"Base: {data['predicted_crop']} (stability: {data['stability']:.2f} "
+                      f"over {data['total_variants']} variants)")
+                for curve in data["curves"]:
+                    print(f"{curve['feature']}: {curve['predicted_crops']} "
+                          f"(smallest flip: {curve['smallest_flip']})")
+            else:
+                print(f"Error: {response.text}")
+        except Exception as e:
+            print(f"Scenario test failed: {e}")
+    
+    def test_neighbors(self):
+        """Test nearest historical samples endpoint"""
+        body = {
+            "samples": [
+                {"N": 90, "P": 42, "K": 43, "temperature": 20.87, "humidity": 82.0, "ph": 6.5, "rainfall": 202.9},
+                {"N": 20, "P": 67, "K": 20, "temperature": 27.3, "humidity": 48.1, "ph": 6.6, "rainfall": 161.0}
+            ],
+            "k": 5
+        }
+        
+        try:
+            response = requests.post(f"{self.base_url}/predict/neighbors", json=body)
+            print(f"Neighbors: {response.status_code}")
+            if response.status_code == 200:
+                data = response.json()
+                print(f"{data['total_queries']} queries over {data['index_size']} samples "
+                      f"in {data['query_ms']:.3f} ms")
+                for result in data["results"]:
+                    nearest = result["neighbors"][0]
+                    print(f"Nearest: {nearest['label']} (distance: {nearest['distance']:.3f}), "
+                          f"labels: {result['label_counts']}")
+            else:
+                print(f"Error: {response.text}")
+        except Exception as e:
+            print(f"Neighbor test failed: {e}")
+    
+    def test_batch_job(self):
+        """Test asynchronous batch job endpoints"""
+        body = "N,P,K,temperature,humidity,ph,rainfall\n" + "\n".join([
+            "90,42,43,20.87,82.0,6.5,202.9",
+            "85,58,41,21.77,80.32,7.04,226.66",
+            "-10,42,43,20.87,82.0,6.5,202.9"
+        ])
+        
+        try:
+            response = requests.post(
+                f"{self.base_url}/jobs",
+                data=body,
+                headers={"Content-Type": "text/csv"}
+            )
+            print(f"Job Submit: {response.status_code}")
+            if response.status_code != 202:
+                print(f"Error: {response.text}")
+                return
+            
+            job_id = response.json()["job_id"]
+            for _ in range(60):
+                job = requests.get(f"{self.base_url}/jobs/{job_id}").json()
+                if job["status"] in ("completed", "failed", "cancelled"):
+                    break
+                time.sleep(1)
+            print(f"Job {job_id}: {job['status']} ({job['rows_done']}/{job['total_rows']} rows)")
+            
+            if job["status"] == "completed":
+                page = requests.get(f"{self.base_url}/jobs/{job_id}/results", params={"limit": 10}).json()
+                for result in page["results"]:
+                    if result["error"]:
+                        print(f"Row {result['row']}: error - {result['error']}")
+                    else:
+                        print(f"Row {result['row']}: {result['predicted_crop']} "
+                              f"(confidence: {result['confidence']:.4f})")
+            
+            requests.delete(f"{self.base_url}/jobs/{job_id}")
+        except Exception as e:
+            print(f"Batch job test failed: {e}")
+    
     def test_feature_importance(self):
         """Test feature importance endpoint"""
         try:
@@ -143,6 +298,21 @@ class CropAPITester:
         except Exception as e:
             print(f"Feature importance test failed: {e}")
     
+    def test_student_model(self):
+        """Test distilled student model download"""
+        try:
+            response = requests.get(f"{self.base_url}/model/student")
+            print(f"Student Model: {response.status_code}")
+            if response.status_code == 200:
+                artifact = response.json()
+                parity = artifact.get('parity', {})
+                print(f"{len(artifact['nodes']['left'])} nodes, {len(response.content)} bytes, "
+                      f"agreement with model: {parity.get('agreement')}")
+            else:
+                print(f"Error: {response.text}")
+        except Exception as e:
+            print(f"Student model test failed: {e}")
+    
     def test_invalid_input(self):
         """Test with invalid input data"""
         invalid_data = {
@@ -242,18 +412,48 @@ class CropAPITester:
         self.test_batch_prediction()
         print()
         
+        # Stream prediction
+        print("6. Testing Stream Prediction...")
+        self.test_stream_prediction()
+        print()
+        
+        # Columnar batch prediction
+        print("7. Testing Columnar Batch Prediction...")
+        self.test_columnar_batch()
+        print()
+        
+        # Scenario sweep
+        print("8. Testing Scenarios...")
+        self.test_scenarios()
+        print()
+        
+        # Nearest historical samples
+        print("9. Testing Neighbors...")
+        self.test_neighbors()
+        print()
+        
+        # Batch job
+        print("10. Testing Batch Job...")
+        self.test_batch_job()
+        print()
+        
         # Feature importance
-        print("6. Testing Feature Importance...")
+        print("11. Testing Feature Importance...")
         self.test_feature_importance()
         print()
         
+        # Student model
+        print("12. Testing Student Model...")
+        self.test_student_model()
+        print()
+        
         # Invalid input
-        print("7. Testing Input Validation...")
+        print("13. Testing Input Validation...")
         self.test_invalid_input()
         print()
         
         # Performance test
-        print("8. Performance Test...")
+        print("14. Performance Test...")
         self.performance_test()
         print()
         
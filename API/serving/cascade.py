@@ -0,0 +1,91 @@
+"""
+Confidence-gated cascade from a cheaper first stage to the full model
+"""
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def top_two_margin(probabilities: np.ndarray) -> np.ndarray:
+    """Gap between the two most likely classes of each row"""
+    top_two = np.partition(probabilities, -2, axis=1)[:, -2:]
+    return top_two[:, 1] - top_two[:, 0]
+
+
+def calibrate_cascade(
+    first_probabilities: np.ndarray,
+    full_probabilities: np.ndarray,
+    y: np.ndarray,
+    target_agreement: float
+) -> Dict[str, Any]:
+    """
+    Pick the lowest first-stage margin that keeps agreement with the full model
+
+    Rows are ranked by first-stage margin, most confident first. The
+    threshold is the margin of the last row of the longest prefix whose
+    first-stage predictions agree with the full model on at least
+    ``target_agreement`` of rows; rows below it are escalated.
+
+    Args:
+        first_probabilities: First-stage class probabilities on held-out rows
+        full_probabilities: Full-model class probabilities on the same rows
+        y: True labels as column positions of the probabilities
+        target_agreement: Required agreement of first-stage answers (0-1)
+
+    Returns:
+        Calibration report with the ``threshold`` (None if the first stage
+        never meets the target), the escalation rate and the accuracy of the
+        cascade against always using the full model
+    """
+    first_predictions = first_probabilities.argmax(axis=1)
+    full_predictions = full_probabilities.argmax(axis=1)
+    margins = top_two_margin(first_probabilities)
+
+    order = np.argsort(-margins, kind='stable')
+    agreement = np.cumsum(first_predictions[order] == full_predictions[order]) / np.arange(1, len(y) + 1)
+    meets_target = np.flatnonzero(agreement >= target_agreement)
+    threshold = float(margins[order[meets_target[-1]]]) if meets_target.size else None
+
+    if threshold is None:
+        escalate = np.ones(len(y), dtype=bool)
+    else:
+        escalate = margins < threshold
+    cascade_predictions = np.where(escalate, full_predictions, first_predictions)
+
+    full_accuracy = float((full_predictions == y).mean())
+    cascade_accuracy = float((cascade_predictions == y).mean())
+    return {
+        'threshold': threshold,
+        'target_agreement': target_agreement,
+        'calibration_samples': len(y),
+        'escalation_rate': float(escalate.mean()),
+        'agreement': float((cascade_predictions == full_predictions).mean()),
+        'full_accuracy': full_accuracy,
+        'cascade_accuracy': cascade_accuracy,
+        'accuracy_delta': cascade_accuracy - full_accuracy
+    }
+
+
+class CascadeStats:
+    """Thread-safe count of rows answered by the first stage and rows escalated"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.first_stage = 0
+        self.escalated = 0
+
+    def record(self, rows: int, escalated: int):
+        with self.lock:
+            self.first_stage += rows - escalated
+            self.escalated += escalated
+
+    def get_metrics(self, calibration: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        with self.lock:
+            total = self.first_stage + self.escalated
+            return {
+                'first_stage_rows': self.first_stage,
+                'escalated_rows': self.escalated,
+                'escalation_rate': self.escalated / total if total else None,
+                'calibration': calibration
+            }
@@ -0,0 +1,67 @@
+"""
+Fast JSON responses and ETags for prediction results built by the service
+"""
+import json
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for content the service built itself
+
+    Returning it from an endpoint skips FastAPI's re-validation of the
+    content against the ``response_model`` and its ``jsonable_encoder``
+    pass; the content is encoded once, with orjson when it is installed
+    and the standard json module otherwise. The ``response_model`` still
+    documents the endpoint.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def make_etag(key: str) -> str:
+    """
+    Strong ETag for a prediction response
+
+    Args:
+        key: ``singleflight.make_key`` of the endpoint, the validated input,
+            the model version and any options that shape the body, so the
+            tag changes whenever the model version does
+    """
+    return f'"{key[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether ``If-None-Match`` names ``etag``, also as a weak tag or with a content-coding suffix"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.strip('"')
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.split("-", 1)[0] == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """
+    ``304 Not Modified`` answer for a client that already has the response tagged ``etag``
+
+    ``etag`` is the uncompressed representation's tag; ``CompressionMiddleware``
+    adds the content-coding suffix the compressed 200 would carry.
+    """
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Copy the shared serving package into each service
+
+Both services are built from their own directories, so each keeps a copy
+of ``serving/`` in its tree. Edit the package here and run this script to
+update the copies; ``--check`` changes nothing and exits with status 1 if a
+copy differs from the package.
+"""
+import argparse
+import filecmp
+import shutil
+import sys
+from pathlib import Path
+from typing import List
+
+API_DIR = Path(__file__).parent
+SOURCE = API_DIR / "serving"
+COPIES = (
+    API_DIR / "Crop Prediction" / "serving",
+    API_DIR / "AgroPals Suggester" / "app" / "serving",
+)
+
+
+def modules(directory: Path) -> List[str]:
+    """Python module file names in a package directory"""
+    return sorted(path.name for path in directory.glob("*.py")) if directory.is_dir() else []
+
+
+def differences(copy: Path) -> List[str]:
+    """Module files of ``copy`` that are missing, changed or not in the package"""
+    source, copied = set(modules(SOURCE)), set(modules(copy))
+    changed = [
+        name for name in sorted(source & copied)
+        if not filecmp.cmp(SOURCE / name, copy / name, shallow=False)
+    ]
+    return sorted(source - copied) + changed + sorted(copied - source)
+
+
+def sync(copy: Path):
+    """Make ``copy`` an exact copy of the package's modules"""
+    copy.mkdir(parents=True, exist_ok=True)
+    for name in modules(copy):
+        if name not in modules(SOURCE):
+            (copy / name).unlink()
+    for name in modules(SOURCE):
+        shutil.copyfile(SOURCE / name, copy / name)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Copy API/serving into each service")
+    parser.add_argument("--check", action="store_true", help="Only report copies that differ, exit 1 if any does")
+    args = parser.parse_args()
+
+    stale = False
+    for copy in COPIES:
+        changed = differences(copy)
+        if not changed:
+            continue
+        if args.check:
+            stale = True
+            print(f"{copy.relative_to(API_DIR)} differs from serving/: {', '.join(changed)}")
+        else:
+            sync(copy)
+            print(f"Updated {copy.relative_to(API_DIR)}: {', '.join(changed)}")
+
+    if stale:
+        print("Run python API/sync_serving.py to update the copies")
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())